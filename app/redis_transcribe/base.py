@@ -1,17 +1,20 @@
-"""Module for basic work with radishes (get value, put value, check connection)."""
-import json
+"""Module for basic work with radishes (get value, put value, check connection).
+
+Notes:
+    The bulk primitives come from the shared ``shared_lib.redis.dals.base.BaseDAL``, only the signatures and errors
+    expected by the transcriber's DALs are kept here.
+
+"""
 import logging
-from collections import defaultdict
 from typing import Any
 
-from redis.asyncio.client import Redis
-
 from app.redis_transcribe.exceptions import DataNotFoundError
+from shared_lib.redis.dals.base import BaseDAL as SharedBaseDAL
 
 logger = logging.getLogger(__name__)
 
 
-class BaseDAL:
+class BaseDAL(SharedBaseDAL):
     """Class for basic work with Redis (get or put value).
 
     Attributes:
@@ -19,33 +22,19 @@ class BaseDAL:
 
     """
 
-    def __init__(self, client: Redis):
-        self._redis_client = client
-
     async def rpop_many(self, key: str, limit: int = 1, raise_exception: bool = False) -> Any:
-        """Retrieves a specified number of audio chunks from this connection's queue in a FIFO manner using RPOP.
+        """Retrieves a specified number of items from the list in a FIFO manner with a single ``RPOP key count``.
 
         Args:
             key: Key for getting data.
-            limit: ToDo.
-            raise_exception: ToDo.
+            limit: Maximum number of items to pop.
+            raise_exception: Whether to raise if the list is empty.
 
         Returns:
-            Data from redis converted to JSON.
+            Data from redis converted to JSON, None if the list is empty.
 
         """
-        # ToDo:
-        #  if error put data in redis again
-        #  if error_count > 5 put data in difference
-        chunks = []
-
-        for _ in range(limit):
-            chunk = await self._redis_client.rpop(key)
-            if chunk:
-                chunks.append(json.loads(chunk))
-            else:
-                break
-
+        chunks = await super().rpop_many(key, limit, json_load=True)
         if chunks:
             return chunks
 
@@ -53,24 +42,8 @@ class BaseDAL:
             raise DataNotFoundError(f"Data for '{key}' not found")
 
     async def rpop_many_by_pattern(self, name: str, min_length: int = 1, limit: int = 1, pattern: str = "*") -> dict:
-        matching_queues = defaultdict(list)
-        unique_keys = set()
-        cursor = "0"
-
-        while cursor != 0:
-            cursor, matched_keys = await self._redis_client.scan(cursor, match=f"{name}{pattern}", count=min_length)
-            unique_keys.update(matched_keys)
-
-        logger.info(f"Found {len(unique_keys)} unique key(s)")
-
-        for key in unique_keys:
-            for _ in range(limit):
-                value = await self._redis_client.rpop(key)
-                if value:
-                    matching_queues[key].append(value)
-                else:
-                    break  # Exit if the list becomes empty before reaching num_items
-
+        matching_queues = await super().rpop_many_by_pattern(name, pattern, min_length, limit)
+        logger.info(f"Found {len(matching_queues)} non-empty key(s)")
         return matching_queues
 
     def delete_keys(self, name: str):
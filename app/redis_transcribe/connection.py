@@ -9,8 +9,17 @@ from app.redis_transcribe.exceptions import RedisConnectionError
 
 logger = logging.getLogger(__name__)
 
-async def get_redis_client(host: str, port: int, password: Optional[str] = None, db: int = 0) -> Redis:
-    """Create Redis client connection with detailed logging."""
+async def get_redis_client(
+    host: str,
+    port: int,
+    password: Optional[str] = None,
+    db: int = 0,
+    decode_responses: bool = True,
+) -> Redis:
+    """Create Redis client connection with detailed logging.
+
+    Pass ``decode_responses=False`` to get a binary-safe client for raw audio keys.
+    """
     logger.info(f"Attempting Redis connection to {host}:{port}")
     if password:
         logger.info("Redis password is configured")
@@ -19,7 +28,7 @@ async def get_redis_client(host: str, port: int, password: Optional[str] = None,
 
     try:
         logger.debug("Initializing Redis client")
-        redis_client = Redis(host=host, port=port, password=password, db=db, decode_responses=True)
+        redis_client = Redis(host=host, port=port, password=password, db=db, decode_responses=decode_responses)
         
         logger.debug("Attempting to ping Redis server")
         await redis_client.ping()
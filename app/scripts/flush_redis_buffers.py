@@ -19,6 +19,7 @@ import sys
 from pathlib import Path
 
 from app.redis_transcribe.connection import get_redis_client
+from app.services.audio.audio import decode_audio_buffer
 from app.settings import settings
 from shared_lib.redis.keys import AUDIO_BUFFER
 
@@ -35,7 +36,7 @@ async def list_buffers(redis_client):
     buffers = []
     
     async for key in redis_client.scan_iter(match=pattern):
-        connection_id = key.split(':')[1]
+        connection_id = key.decode().split(':')[1]
         size = await redis_client.strlen(key)
         ttl = await redis_client.ttl(key)
         
@@ -50,15 +51,14 @@ async def list_buffers(redis_client):
 async def flush_buffer(redis_client, connection_id, output_dir="/data/audio"):
     """Flush a specific audio buffer to disk."""
     redis_key = f"{AUDIO_BUFFER}:{connection_id}"
-    hex_encoded_data = await redis_client.get(redis_key)
+    raw_data = await redis_client.get(redis_key)
     
-    if not hex_encoded_data:
+    if not raw_data:
         logger.error(f"No audio buffer found for connection {connection_id}")
         return False
     
     try:
-        # Convert hex encoded string back to binary data
-        data = bytes.fromhex(hex_encoded_data)
+        data = decode_audio_buffer(raw_data)
         
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
@@ -72,7 +72,7 @@ async def flush_buffer(redis_client, connection_id, output_dir="/data/audio"):
         return True
     
     except ValueError as e:
-        logger.error(f"Failed to decode hex data from Redis for connection {connection_id}: {e}")
+        logger.error(f"Failed to decode legacy hex data from Redis for connection {connection_id}: {e}")
         return False
 
 async def flush_all_buffers(redis_client, output_dir="/data/audio"):
@@ -94,11 +94,12 @@ async def flush_all_buffers(redis_client, output_dir="/data/audio"):
 
 async def main(command, *args):
     """Main entry point."""
-    # Initialize Redis client
+    # Initialize binary-safe Redis client (audio buffers hold raw bytes)
     redis_client = await get_redis_client(
         settings.redis_host, 
         settings.redis_port,
-        settings.redis_password
+        settings.redis_password,
+        decode_responses=False,
     )
     
     if command == 'list':
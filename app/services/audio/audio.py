@@ -1,11 +1,15 @@
 import asyncio
 import io
-import json
 import logging
-import subprocess
+from typing import Optional
 
 from pydub import AudioSegment
 from redis.asyncio.client import Redis
+from app.services.audio.decoder import DecoderPool, get_decoder_pool
+from app.services.audio.file_writer import read_committed_length
+from app.services.audio.pcm import PCM_CHANNELS, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH, read_pcm_slice
+from app.services.audio.webm_index import SegmentRange, read_index, read_segments, segment_range
+from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
 from shared_lib.redis.keys import AUDIO_BUFFER
 
 
@@ -16,6 +20,28 @@ class AudioFileCorruptedError(Exception):
 
 logger = logging.getLogger(__name__)
 
+WEBM_MAGIC = b"\x1aE\xdf\xa3"  # EBML header id, first 4 bytes of every WebM file
+
+# Formats of the audio uploaded to the Whisper service: filename and content type of each. ``pcm`` (raw s16le), ``wav``
+# and ``flac`` are 16 kHz mono, as decoded, ``mp3`` is lossy and kept for services that require it.
+UPLOAD_FORMATS = {
+    "pcm": ("audio.pcm", f"audio/L16; rate={PCM_SAMPLE_RATE}; channels={PCM_CHANNELS}"),
+    "wav": ("audio.wav", "audio/wav"),
+    "flac": ("audio.flac", "audio/flac"),
+    "mp3": ("audio.mp3", "audio/mpeg"),
+}
+
+
+def decode_audio_buffer(data: bytes) -> bytes:
+    """Return raw audio bytes of an ``audio_buffer:*`` value.
+
+    Buffers are stored as raw bytes. Buffers written by older versions were hex encoded; they are recognised by the
+    hex-encoded WebM magic and decoded, so live meetings survive an upgrade.
+    """
+    if data[:8] == WEBM_MAGIC.hex().encode():
+        return bytes.fromhex(data.decode())
+    return data
+
 
 class AudioSlicer:
     def __init__(self, data=None, format="mp3"):
@@ -36,7 +62,7 @@ class AudioSlicer:
         """Create an AudioSlicer from audio data stored in Redis.
         
         Args:
-            redis_client: Redis client instance
+            redis_client: Binary-safe Redis client instance (``decode_responses=False``)
             connection_id: Connection ID to retrieve audio for
             format: Audio format (default: webm)
             
@@ -47,117 +73,146 @@ class AudioSlicer:
             AudioFileCorruptedError: If the audio data is corrupted
         """
         redis_key = f"{AUDIO_BUFFER}:{connection_id}"
-        hex_encoded_data = await redis_client.get(redis_key)
+        data = await redis_client.get(redis_key)
         
-        if not hex_encoded_data:
+        if not data:
             logger.error(f"No audio data found in Redis for connection {connection_id}")
             raise AudioFileCorruptedError(f"No audio data found in Redis for connection {connection_id}")
             
         try:
-            # Convert hex encoded string back to binary data
-            data = bytes.fromhex(hex_encoded_data)
-            return cls(data, format)
-        except ValueError as e:
-            logger.error(f"Failed to decode hex data from Redis: {e}")
-            raise AudioFileCorruptedError(f"Failed to decode hex data from Redis for connection {connection_id}") from e
+            return cls(decode_audio_buffer(data), format)
         except Exception as e:
             logger.error(f"Failed to create AudioSlicer from Redis data: {e}")
             raise AudioFileCorruptedError(f"Audio data in Redis for connection {connection_id} is corrupted") from e
 
     @classmethod
-    async def from_ffmpeg_slice(cls, path, start, duration, format="mp3"):
-        def slice_and_get_data(path, start, duration):
-            command = [
-                "ffmpeg",
-                # "-seekable",
-                # "0",  # Add the -seekable 0 option
-                "-ss",
-                str(start),
-                "-t",
-                str(duration),
-                "-i",
-                path,
-                "-f",
-                format,
-                "-acodec",
-                "libmp3lame",
-                "-rw_timeout",
-                "5000000",  # Increase cache size timeout
-                "-",
-            ]
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return result.stdout
-
-        data = await asyncio.to_thread(slice_and_get_data, path, start, duration)
+    async def from_pcm_slice(cls, path, start, duration, format="mp3"):
+        """Create an AudioSlicer from the PCM store of a connection (see ``pcm``), without decoding its WebM file.
+
+        Args:
+            path: Path of the connection's PCM file
+            start: Start time in seconds
+            duration: Duration in seconds
+            format: Format of ``export_data`` (default: mp3)
+
+        Returns:
+            AudioSlicer instance or None if the store does not have audio after ``start`` yet
+        """
+        data = await asyncio.to_thread(read_pcm_slice, path, start, duration)
+        if data is None:
+            return None
+
+        return cls.from_pcm(data, format)
+
+    @classmethod
+    def from_pcm(cls, data: bytes, format="mp3"):
+        """Create an AudioSlicer from 16 kHz mono s16le PCM (see ``pcm``), without decoding it."""
+        slicer = cls(format=format)
+        slicer.audio = AudioSegment(
+            data=data, sample_width=PCM_SAMPLE_WIDTH, frame_rate=PCM_SAMPLE_RATE, channels=PCM_CHANNELS
+        )
+        return slicer
+
+    @classmethod
+    async def from_ffmpeg_slice(cls, path, start, duration, format="mp3", decoder: Optional[DecoderPool] = None):
+        """Create an AudioSlicer from a slice of the audio file of a connection, decoded to PCM by the decoder pool.
+
+        Args:
+            path: Path of the audio file
+            start: Start time in seconds
+            duration: Duration in seconds
+            format: Format of ``export_data`` (default: mp3)
+            decoder: Decoder pool (default: the pool of the process)
+
+        Returns:
+            AudioSlicer instance with the sliced audio
+
+        Raises:
+            AudioFileCorruptedError: If the header of the file is corrupted
+        """
+        # Read only the length published by AudioFileWriter, never a tail that is being written
+        committed_length = read_committed_length(path)
+        source = f"subfile,,start,0,end,{committed_length},,:{path}" if committed_length else path
+
+        # Only the header and the segments of the slice are decoded if the file is indexed
+        segments = None
+        if committed_length:
+            segments = await asyncio.to_thread(read_segments, path, start, duration, committed_length)
+        if segments:
+            source, segments_start = segments
+            start = max(start - segments_start, 0)
 
         try:
-            return cls(data, format)
+            data = await (decoder or get_decoder_pool()).decode(source, start, duration)
+            return cls.from_pcm(data, format)
 
         except Exception as e:
             with open(path, "rb") as f:
-                starting_bytes = f.read()
+                starting_bytes = f.read(10)
                 if starting_bytes[:10] != b"\x1aE\xdf\xa3\x9fB\x86\x81\x01B":
                     logger.error(f"header is corrupted for audio file: {path}")
                     raise AudioFileCorruptedError(f"Audio File header {path} is corrupted") from e
             raise e
             
     @classmethod
-    async def from_redis_slice(cls, redis_client: Redis, connection_id: str, start: float, duration: float, format="mp3"):
+    async def from_redis_slice(
+        cls,
+        redis_client: Redis,
+        connection_id: str,
+        start: float,
+        duration: float,
+        format="mp3",
+        decoder: Optional[DecoderPool] = None,
+        path: Optional[str] = None,
+    ):
         """Create an AudioSlicer from a slice of audio data stored in Redis.
         
-        This method retrieves audio data from Redis and slices it in memory using pydub,
-        instead of using ffmpeg on a file.
+        If the audio file of the connection is indexed (see ``webm_index``), only the init header and the segments of
+        the slice are read from the buffer (``GETRANGE``), so memory is bounded by the slice and not by the meeting.
+        Otherwise the whole buffer is read. The decoder pool decodes only up to the end of the slice, off the event
+        loop.
         
         Args:
-            redis_client: Redis client instance
+            redis_client: Binary-safe Redis client instance (``decode_responses=False``)
             connection_id: Connection ID to retrieve audio for
             start: Start time in seconds
             duration: Duration in seconds
-            format: Output format (default: mp3)
+            format: Format of ``export_data`` (default: mp3)
+            decoder: Decoder pool (default: the pool of the process)
+            path: Audio file of the connection, its index locates the slice in the buffer
             
         Returns:
             AudioSlicer instance with the sliced audio data
         """
-        # Get the full audio from Redis
         redis_key = f"{AUDIO_BUFFER}:{connection_id}"
-        hex_encoded_data = await redis_client.get(redis_key)
-        
-        if not hex_encoded_data:
-            logger.error(f"No audio data found in Redis for connection {connection_id}")
-            raise AudioFileCorruptedError(f"No audio data found in Redis for connection {connection_id}")
-        
+        data = None
+        if path is not None:
+            segments = segment_range(await asyncio.to_thread(read_index, path), start, duration)
+            if segments is not None:
+                data = await _read_buffer_segments(redis_client, redis_key, segments)
+            if data is not None:
+                start = max(start - segments.start, 0)
+
+        if data is None:
+            raw_data = await redis_client.get(redis_key)
+
+            if not raw_data:
+                logger.error(f"No audio data found in Redis for connection {connection_id}")
+                raise AudioFileCorruptedError(f"No audio data found in Redis for connection {connection_id}")
+
+            data = decode_audio_buffer(raw_data)
+
         try:
-            # Convert hex encoded string back to binary data
-            data = bytes.fromhex(hex_encoded_data)
-            
-            # Load the full audio
-            full_audio = AudioSegment.from_file(io.BytesIO(data), format="webm")
-            
-            # Calculate start and end in milliseconds
-            start_ms = int(start * 1000)
-            end_ms = int((start + duration) * 1000)
-            
-            # Slice the audio
-            sliced_audio = full_audio[start_ms:end_ms]
-            
-            # Export to the requested format
-            buffer = io.BytesIO()
-            sliced_audio.export(buffer, format=format)
-            
-            # Create and return the AudioSlicer instance
-            return cls(buffer.getvalue(), format)
+            sliced = await (decoder or get_decoder_pool()).decode(data, start, duration)
+            return cls.from_pcm(sliced, format)
             
         except Exception as e:
             logger.error(f"Failed to slice audio from Redis: {e}")
-            logger.error(f"Data length: {len(data) if 'data' in locals() else 'N/A'}")
+            logger.error(f"Data length: {len(data)}")
             
             # Check if we can identify a common WebM header issue
-            if 'data' in locals() and len(data) > 10:
-                header_bytes = data[:10].hex()
-                expected_webm_header = "1a45dfa3".lower()  # First 4 bytes of a WebM file
-                logger.error(f"Header bytes: {header_bytes}, Expected WebM header starts with: {expected_webm_header}")
-                if not header_bytes.startswith(expected_webm_header):
-                    logger.error("WebM header is corrupted or missing")
+            if len(data) > 10 and not data.startswith(WEBM_MAGIC):
+                logger.error(f"WebM header is corrupted or missing, header bytes: {data[:10].hex()}")
             
             raise AudioFileCorruptedError(f"Failed to slice audio for connection {connection_id}. {str(e)}") from e
 
@@ -169,7 +224,16 @@ class AudioSlicer:
         await asyncio.to_thread(export, segment, export_path)
 
     async def export_data(self, start=None, end=None, format="mp3"):
+        """Encodes the audio (or its ``[start, end)`` seconds) to one of ``UPLOAD_FORMATS``.
+
+        ``pcm`` and ``wav`` are written without ffmpeg, ``flac`` is lossless; all three are 16 kHz mono s16le.
+        """
         def export(segment, buffer):
+            if format != "mp3":
+                segment = segment.set_frame_rate(PCM_SAMPLE_RATE).set_channels(PCM_CHANNELS)
+                segment = segment.set_sample_width(PCM_SAMPLE_WIDTH)
+            if format == "pcm":
+                return segment.raw_data
             segment.export(buffer, format=format)
             return buffer.getvalue()
 
@@ -198,14 +262,30 @@ class AudioSlicer:
         await asyncio.to_thread(append_, additional_data)
 
 
-async def writestream2file(conn_id, redis_client):
+async def _read_buffer_segments(redis_client: Redis, redis_key: str, segments: SegmentRange) -> Optional[bytes]:
+    """Reads the init header and the segments of a raw audio buffer, None if the buffer does not match the index."""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.getrange(redis_key, 0, segments.header_length - 1)
+        pipe.getrange(redis_key, segments.begin, -1 if segments.end is None else segments.end - 1)
+        header, data = await pipe.execute()
+
+    # Hex-encoded buffers of older versions (or buffers shorter than the file) are read as a whole
+    if not header.startswith(WEBM_MAGIC) or len(header) < segments.header_length or not data:
+        return None
+    return header + data
+
+
+async def writestream2file(conn_id, redis_client, consumer: str = "writestream2file"):
+    """Append all queued chunks of a connection to its file (``redis_client`` must be binary-safe)."""
     path = f"/audio/{conn_id}.webm"
-    item = True
-    while item:
-        item = await redis_client.rpop(f"initialFeed_audio:{conn_id}")
-        if item:
-            chunk = bytes.fromhex(json.loads(item)["chunk"])
+    audio_chunk_dal = AudioChunkDAL(redis_client)
+    entries = True
+    while entries:
+        entries = await audio_chunk_dal.read_chunks(conn_id, consumer, limit=100)
+        if entries:
             # Open the file in append mode
             with open(path, "ab") as file:
                 # Write data to the file
-                file.write(chunk)
+                for _, chunk in entries:
+                    file.write(chunk.chunk)
+            await audio_chunk_dal.ack_chunks(conn_id, [entry_id for entry_id, _ in entries])
@@ -0,0 +1,235 @@
+"""Memory-bounded audio buffers of the connections handled by parse_stream.
+
+Notes:
+    The audio of a connection is appended both to its in-memory buffer and to its audio file (``AudioFileWriter``).
+    When the in-memory buffers exceed the byte budget, the least recently updated ones are spilled: their file is
+    synced and the memory is dropped. A spilled buffer keeps receiving chunks (appended to the file only) and is read
+    back through ``mmap``, without loading it into memory.
+
+    Appends, spills and releases of a connection are serialised by its lock, so connections can be processed
+    concurrently; the budget is enforced outside of them (one lock held at a time).
+
+    Last updates are also kept in a heap, so inactive connections are found without scanning all of them.
+
+    After a restart the buffers left in Redis are only registered (length and last update, see ``register``). A
+    registered buffer is loaded (``restore``) when its connection next receives chunks, or dropped from the index
+    when it stays inactive.
+
+"""
+import asyncio
+import heapq
+import io
+import logging
+import mmap
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.audio.file_writer import AudioFileWriter
+
+logger = logging.getLogger(__name__)
+
+
+class AudioBuffer:
+    """Audio of one connection, in memory (hot) or only in its audio file (spilled)."""
+
+    def __init__(self, path: str, data: bytes = b""):
+        self.path = path
+        self._memory: Optional[io.BytesIO] = io.BytesIO(data)
+        self._memory.seek(0, io.SEEK_END)
+        self.length = len(data)
+
+    @property
+    def spilled(self) -> bool:
+        return self._memory is None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def write(self, data: bytes) -> None:
+        if self._memory is not None:
+            self._memory.write(data)
+        self.length += len(data)
+
+    def spill(self) -> None:
+        """Drops the memory copy (the audio file must hold all ``length`` bytes)."""
+        self._memory = None
+
+    @contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Zero-copy view of the buffer: of the memory copy or of an mmap of the audio file (valid inside the block)."""
+        if self._memory is not None:
+            with self._memory.getbuffer() as view:
+                yield view
+            return
+
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), self.length, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+
+    def getvalue(self) -> bytes:
+        if self._memory is not None:
+            return self._memory.getvalue()
+        with self.view() as view:
+            return bytes(view)
+
+
+class AudioBufferManager:
+    """Audio buffers of connections within a global memory budget.
+
+    Attributes:
+        memory_budget: Maximum bytes kept in memory by all buffers.
+        inactive_timeout: Seconds without chunks after which a connection is reported by ``pop_inactive``.
+
+    """
+
+    def __init__(self, file_writer: AudioFileWriter, memory_budget: int, inactive_timeout: float = 60):
+        self.memory_budget = memory_budget
+        self.inactive_timeout = inactive_timeout
+        self.__file_writer = file_writer
+        self.__buffers: Dict[str, AudioBuffer] = {}
+        self.__last_updated: Dict[str, datetime] = {}
+        self.__inactivity: List[Tuple[datetime, str]] = []  # heap, entries superseded by later updates are skipped
+        self.__hot: "OrderedDict[str, None]" = OrderedDict()  # in-memory buffers, least recently updated first
+        self.__pending: Dict[str, int] = {}  # registered buffers not loaded yet, their length in Redis
+        self.__locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.__memory_bytes = 0
+
+    def __contains__(self, connection_id: str) -> bool:
+        return connection_id in self.__buffers or connection_id in self.__pending
+
+    def __len__(self) -> int:
+        return len(self.__buffers)
+
+    def get(self, connection_id: str) -> Optional[AudioBuffer]:
+        return self.__buffers.get(connection_id)
+
+    def is_pending(self, connection_id: str) -> bool:
+        return connection_id in self.__pending
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.__memory_bytes
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": len(self.__buffers),
+            "in_memory": len(self.__hot),
+            "spilled": len(self.__buffers) - len(self.__hot),
+            "pending": len(self.__pending),
+            "memory_bytes": self.__memory_bytes,
+        }
+
+    def register(self, connection_id: str, length: int, last_updated: datetime) -> None:
+        """Indexes the buffer of a connection left in Redis by a previous run, without loading it."""
+        self.__pending[connection_id] = length
+        self._touch(connection_id, last_updated)
+
+    async def restore(self, connection_id: str, data: bytes, last_updated: datetime) -> AudioBuffer:
+        """Adds the buffer of a connection recovered after a restart."""
+        async with self._lock(connection_id):
+            self.__pending.pop(connection_id, None)
+            buffer = AudioBuffer(self.__file_writer.path(connection_id), data)
+            self.__buffers[connection_id] = buffer
+            self.__hot[connection_id] = None
+            self.__memory_bytes += len(buffer)
+            self._touch(connection_id, last_updated)
+
+        await self._enforce_budget()
+        return buffer
+
+    async def append(self, connection_id: str, data: bytes, updated: Optional[datetime] = None) -> AudioBuffer:
+        """Appends new audio of the connection to its buffer and its audio file.
+
+        Returns:
+            Buffer of the connection (``data`` included)
+        """
+        async with self._lock(connection_id):
+            buffer = self.__buffers.get(connection_id)
+            if buffer is None:
+                buffer = self.__buffers[connection_id] = AudioBuffer(self.__file_writer.path(connection_id))
+
+            buffer.write(data)
+            await self.__file_writer.append(connection_id, data, buffer)
+
+            if not buffer.spilled:
+                self.__memory_bytes += len(data)
+                self.__hot[connection_id] = None
+                self.__hot.move_to_end(connection_id)
+
+            self._touch(connection_id, updated or datetime.now(timezone.utc))
+
+        await self._enforce_budget()
+        return buffer
+
+    def pop_inactive(self, now: Optional[datetime] = None) -> List[str]:
+        """Returns the connections not updated within ``inactive_timeout`` (each one once)."""
+        deadline = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.inactive_timeout)
+        inactive = []
+        while self.__inactivity and self.__inactivity[0][0] < deadline:
+            last_updated, connection_id = heapq.heappop(self.__inactivity)
+            if self.__last_updated.get(connection_id) == last_updated:
+                inactive.append(connection_id)
+        return inactive
+
+    async def release(self, connection_id: str) -> int:
+        """Makes the audio file of the connection durable and forgets its buffer.
+
+        A registered buffer that was never loaded is only dropped from the index, its file was written by the
+        previous run.
+
+        Returns:
+            Length of the audio in bytes
+        """
+        async with self._lock(connection_id):
+            self.__last_updated.pop(connection_id, None)
+            if connection_id in self.__pending:
+                return self.__pending.pop(connection_id)
+
+            buffer = self.__buffers.pop(connection_id)
+            self.__hot.pop(connection_id, None)
+            if not buffer.spilled:
+                self.__memory_bytes -= len(buffer)
+
+            return await self.__file_writer.flush(connection_id, buffer)
+
+    async def discard(self, connection_id: str) -> None:
+        """Forgets the buffer of the connection without flushing it (it is processed by another process now)."""
+        async with self._lock(connection_id):
+            self.__last_updated.pop(connection_id, None)
+            self.__pending.pop(connection_id, None)
+            self.__hot.pop(connection_id, None)
+            buffer = self.__buffers.pop(connection_id, None)
+            if buffer is not None and not buffer.spilled:
+                self.__memory_bytes -= len(buffer)
+
+        self.__file_writer.forget(connection_id)
+
+    def _lock(self, connection_id: str) -> asyncio.Lock:
+        lock = self.__locks.get(connection_id)
+        if lock is None:
+            lock = self.__locks[connection_id] = asyncio.Lock()
+        return lock
+
+    def _touch(self, connection_id: str, updated: datetime) -> None:
+        if self.__last_updated.get(connection_id) == updated:
+            return  # already in the heap
+        self.__last_updated[connection_id] = updated
+        heapq.heappush(self.__inactivity, (updated, connection_id))
+
+    async def _enforce_budget(self) -> None:
+        while self.__memory_bytes > self.memory_budget and self.__hot:
+            connection_id, _ = self.__hot.popitem(last=False)
+            async with self._lock(connection_id):
+                buffer = self.__buffers.get(connection_id)
+                if buffer is None or buffer.spilled:
+                    continue  # released or spilled meanwhile
+
+                # The connection keeps appending to its file, the writer keeps its lock, fsync schedule and index
+                await self.__file_writer.sync(connection_id, buffer)
+                buffer.spill()
+                self.__hot.pop(connection_id, None)  # appended meanwhile
+                self.__memory_bytes -= len(buffer)
+            logger.info(f"Spilled audio buffer of connection {connection_id} to disk ({len(buffer)} bytes)")
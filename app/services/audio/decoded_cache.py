@@ -0,0 +1,160 @@
+"""Decoded audio of connections kept by the transcriber between iterations.
+
+Notes:
+    The transcriber reads ``[seek, seek + max_length)`` of its best connection every iteration, and the same window
+    again after a failure. Without the PCM store (see ``pcm``) each read decodes the connection's audio file. The
+    cache keeps, per connection, the PCM decoded so far and the committed length of the file it was decoded from:
+
+    - a window within the cached audio is served from memory (hit);
+    - a window past it is served after decoding only the audio after the cached end, if the file grew (extend);
+    - any other window is decoded from scratch (miss).
+
+    Audio more than ``REWIND_SEC`` before the last window is dropped (the seek only moves forward, minus overlaps)
+    and the least recently used connections are evicted beyond ``max_bytes``.
+
+"""
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict
+
+from app.services.audio.decoder import DecodeError
+from app.services.audio.pcm import PCM_BYTES_PER_SEC, PCM_CHANNELS, PCM_SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+REWIND_SEC = 5  # audio kept before the last window
+
+
+class DecodedAudio:
+    """PCM of one connection from ``start`` seconds, decoded from the first ``committed_length`` bytes of its file."""
+
+    def __init__(self, start: float, pcm: bytes, committed_length: int):
+        self.start = start
+        self.pcm = bytearray(pcm)
+        self.committed_length = committed_length
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.pcm) / PCM_BYTES_PER_SEC
+
+    def covers(self, start: float) -> bool:
+        return self.start <= start <= self.end
+
+    def slice(self, start: float, duration: float) -> bytes:
+        begin = _offset(start - self.start)
+        return bytes(self.pcm[begin:begin + _offset(duration)])
+
+    def trim(self, start: float) -> int:
+        """Drops the audio before ``start``, returns the number of bytes dropped."""
+        dropped = _offset(max(start - self.start, 0))
+        if dropped:
+            del self.pcm[:dropped]
+            self.start += dropped / PCM_BYTES_PER_SEC
+        return dropped
+
+
+class DecodedAudioCache:
+    """LRU cache of decoded audio by connection, bounded by ``max_bytes`` of PCM."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.__entries: "OrderedDict[str, DecodedAudio]" = OrderedDict()
+        self.__bytes = 0
+        self.hits = 0
+        self.extends = 0
+        self.misses = 0
+        self.evictions = 0
+        self.decoded_bytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of reads served without decoding the window from scratch."""
+        reads = self.hits + self.extends + self.misses
+        return (self.hits + self.extends) / reads if reads else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "connections": len(self.__entries),
+            "bytes": self.__bytes,
+            "hits": self.hits,
+            "extends": self.extends,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "decoded_bytes": self.decoded_bytes,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+    async def read(
+        self,
+        connection_id: str,
+        committed_length: int,
+        start: float,
+        duration: float,
+        decode: Callable[[float, float], Awaitable[bytes]],
+    ) -> bytes:
+        """Returns ``duration`` seconds of decoded audio of the connection from ``start``.
+
+        Args:
+            connection_id: The connection ID
+            committed_length: Current committed length of the connection's audio file
+            start: Start of the window in seconds
+            duration: Duration of the window in seconds
+            decode: Decodes ``(start, duration)`` of the connection's audio to PCM
+
+        Returns:
+            PCM bytes, shorter than ``duration`` if the connection has no more audio yet
+        """
+        entry = self.__entries.get(connection_id)
+        if entry is not None and entry.covers(start):
+            if start + duration > entry.end and committed_length > entry.committed_length:
+                self.extends += 1
+                await self._extend(entry, committed_length, start + duration, decode)
+            else:
+                self.hits += 1
+            self.__entries.move_to_end(connection_id)
+        else:
+            self.misses += 1
+            pcm = await decode(start, duration)
+            self.decoded_bytes += len(pcm)
+            entry = DecodedAudio(start, pcm, committed_length)
+            self._drop(connection_id)
+            self.__entries[connection_id] = entry
+            self.__bytes += len(entry.pcm)
+
+        data = entry.slice(start, duration)
+        self.__bytes -= entry.trim(start - REWIND_SEC)
+        self._evict()
+        return data
+
+    def forget(self, connection_id: str) -> None:
+        self._drop(connection_id)
+
+    async def _extend(
+        self, entry: DecodedAudio, committed_length: int, end: float, decode: Callable[[float, float], Awaitable[bytes]]
+    ) -> None:
+        try:
+            pcm = await decode(entry.end, end - entry.end)
+        except DecodeError:
+            pcm = b""  # nothing decodable after the cached end yet
+
+        pcm = pcm[:len(pcm) - len(pcm) % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)]
+        entry.pcm += pcm
+        entry.committed_length = committed_length
+        self.decoded_bytes += len(pcm)
+        self.__bytes += len(pcm)
+
+    def _drop(self, connection_id: str) -> None:
+        entry = self.__entries.pop(connection_id, None)
+        if entry is not None:
+            self.__bytes -= len(entry.pcm)
+
+    def _evict(self) -> None:
+        # The connection just read is kept, even beyond the budget
+        while self.__bytes > self.max_bytes and len(self.__entries) > 1:
+            self._drop(next(iter(self.__entries)))
+            self.evictions += 1
+
+
+def _offset(seconds: float) -> int:
+    length = int(seconds * PCM_BYTES_PER_SEC)
+    return length - length % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)
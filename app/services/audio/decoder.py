@@ -0,0 +1,148 @@
+"""Pool of audio decoders of the transcriber, returning 16 kHz mono s16le PCM (see ``pcm``).
+
+Notes:
+    With PyAV installed (optional, ``pip install av``) slices are decoded in-process by a pool of
+    ``AUDIO_DECODER_POOL_SIZE`` threads; libav releases the GIL while decoding. Without it each slice is decoded by an
+    ffmpeg process, at most ``AUDIO_DECODER_POOL_SIZE`` at a time. Either way the decoder outputs PCM, so slices are
+    no longer encoded to MP3 by ffmpeg and decoded again by pydub.
+
+    Every job is bounded by ``AUDIO_DECODER_TIMEOUT_SEC``: a timed-out ffmpeg process is killed, a timed-out PyAV job
+    is abandoned (its thread finishes on its own) and ``DecodeError`` is raised.
+
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from app.services.audio.pcm import PCM_BYTES_PER_SEC, PCM_CHANNELS, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+from app.settings import settings
+
+try:
+    import av
+except ImportError:  # optional, slices are decoded by ffmpeg processes
+    av = None
+
+logger = logging.getLogger(__name__)
+
+
+class DecodeError(Exception):
+    def __init__(self, message="Audio could not be decoded"):
+        super().__init__(message)
+
+
+class DecoderPool:
+    """Decodes slices of encoded audio, ``size`` at a time.
+
+    Attributes:
+        size: Maximum number of concurrent decode jobs.
+        timeout_sec: Maximum duration of a decode job.
+        in_process: Slices are decoded with PyAV instead of ffmpeg processes.
+
+    """
+
+    def __init__(self, size: int = 4, timeout_sec: float = 30, in_process: Optional[bool] = None):
+        self.size = size
+        self.timeout_sec = timeout_sec
+        self.in_process = av is not None if in_process is None else in_process
+        self.__semaphore = asyncio.Semaphore(size)
+        self.__executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="decoder") if self.in_process else None
+
+    async def decode(self, source: Union[bytes, str], start: float, duration: float) -> bytes:
+        """Decodes ``[start, start + duration)`` seconds of the audio.
+
+        Args:
+            source: Encoded audio, or the path (or ffmpeg input URL) of an audio file
+            start: Start of the slice in seconds from the start of the audio
+            duration: Duration of the slice in seconds
+
+        Returns:
+            PCM bytes
+
+        Raises:
+            DecodeError: If the audio could not be decoded within ``timeout_sec`` or has no audio in the slice
+        """
+        async with self.__semaphore:
+            if self.in_process:
+                job = asyncio.get_running_loop().run_in_executor(
+                    self.__executor, _decode_in_process, source, start, duration
+                )
+            else:
+                job = _decode_with_ffmpeg(source, start, duration)
+
+            try:
+                data = await asyncio.wait_for(job, self.timeout_sec)
+            except asyncio.TimeoutError as e:
+                raise DecodeError(f"Decoding timed out after {self.timeout_sec} seconds") from e
+
+        if not data:
+            raise DecodeError("No audio decoded")
+        return data
+
+
+async def _decode_with_ffmpeg(source: Union[bytes, str], start: float, duration: float) -> bytes:
+    command = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-ss", str(start), "-t", str(duration),
+        "-i", "pipe:0" if isinstance(source, bytes) else source,
+        "-vn", "-ac", str(PCM_CHANNELS), "-ar", str(PCM_SAMPLE_RATE), "-f", "s16le", "pipe:1",
+    ]
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE if isinstance(source, bytes) else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate(source if isinstance(source, bytes) else None)
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    if process.returncode:
+        logger.warning(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+def _decode_in_process(source: Union[bytes, str], start: float, duration: float) -> bytes:
+    resampler = av.AudioResampler(format="s16", layout="mono", rate=PCM_SAMPLE_RATE)
+    pcm = bytearray()
+    first_time = None
+    skip = 0  # bytes of the first decoded frame before ``start``
+
+    with av.open(io.BytesIO(source) if isinstance(source, bytes) else source) as container:
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            time = frame.time or 0
+            if first_time is None:
+                first_time = time
+            if time - first_time >= start + duration:
+                break
+            if time - first_time + frame.samples / frame.sample_rate <= start:
+                continue
+
+            if not pcm:
+                skip = int(max(start - (time - first_time), 0) * PCM_BYTES_PER_SEC)
+            for resampled in resampler.resample(frame):
+                pcm += bytes(resampled.planes[0])[:resampled.samples * PCM_SAMPLE_WIDTH * PCM_CHANNELS]
+
+        for resampled in resampler.resample(None):
+            pcm += bytes(resampled.planes[0])[:resampled.samples * PCM_SAMPLE_WIDTH * PCM_CHANNELS]
+
+    skip -= skip % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)
+    length = int(duration * PCM_BYTES_PER_SEC)
+    length -= length % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)
+    return bytes(pcm[skip:skip + length])
+
+
+_decoder_pool: Optional[DecoderPool] = None
+
+
+def get_decoder_pool() -> DecoderPool:
+    """Returns the decoder pool of the process, configured by the settings."""
+    global _decoder_pool
+    if _decoder_pool is None:
+        _decoder_pool = DecoderPool(settings.audio_decoder_pool_size, settings.audio_decoder_timeout_sec)
+    return _decoder_pool
@@ -0,0 +1,193 @@
+"""Append-only writer of the audio files of connections (``/data/audio/{connection_id}.webm``).
+
+Notes:
+    Every tick only the new bytes are appended, off the event loop. After each write the readable length is published
+    in the ``{file}.committed`` sidecar (replaced atomically), readers (ffmpeg in the transcriber) read up to that
+    offset only (see ``read_committed_length``) and never see a half-written tail.
+
+    The file is rewritten as a whole (to a temporary file, then ``os.replace``) only if it does not match the in-memory
+    buffer of the connection, e.g. it was deleted or the processor restarted from a Redis buffer. The file of a buffer
+    spilled from memory (see ``AudioBufferManager``) is its only copy and is never rewritten.
+
+    ``fsync_policy``: ``always`` - after every append, ``interval`` - at most every ``fsync_interval_sec`` per file,
+    ``never`` - left to the OS. Rewrites and flushes of inactive connections are always synced.
+
+    Every file is indexed by time as it is written (``{file}.index``, see ``webm_index``), so readers decode only the
+    segments of a slice.
+
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.services.audio.webm_index import TimeIndexWriter
+
+if TYPE_CHECKING:
+    from app.services.audio.buffer_manager import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+COMMITTED_SUFFIX = ".committed"
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+def read_committed_length(path: str) -> Optional[int]:
+    """Returns the published readable length of the audio file or None if it was not published."""
+    try:
+        with open(f"{path}{COMMITTED_SUFFIX}") as file:
+            return int(file.read())
+    except (OSError, ValueError):
+        return None
+
+
+def publish_committed_length(path: str, length: int) -> None:
+    """Publishes the readable length of the file (the sidecar is replaced atomically)."""
+    tmp_path = f"{path}{COMMITTED_SUFFIX}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(str(length))
+    os.replace(tmp_path, f"{path}{COMMITTED_SUFFIX}")
+
+
+class AudioFileWriter:
+    def __init__(
+        self,
+        output_dir: str = "/data/audio",
+        fsync_policy: str = "interval",
+        fsync_interval_sec: float = 5,
+        index_segment_sec: float = 5,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync_policy!r}, expected one of {FSYNC_POLICIES}")
+
+        self.output_dir = output_dir
+        self.fsync_policy = fsync_policy
+        self.fsync_interval_sec = fsync_interval_sec
+        self.index_segment_sec = index_segment_sec
+        self.__locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.__last_fsync: Dict[str, float] = {}
+        self.__indexes: Dict[str, TimeIndexWriter] = {}  # by path
+
+    def path(self, connection_id: str) -> str:
+        return os.path.join(self.output_dir, f"{connection_id}.webm")
+
+    async def append(self, connection_id: str, data: bytes, buffer: "AudioBuffer") -> int:
+        """Appends new bytes to the connection's file and publishes its new length.
+
+        Args:
+            connection_id: The connection ID
+            data: Bytes just appended to ``buffer``
+            buffer: In-memory buffer of the connection (``data`` included), written as a whole if the file is out of sync
+
+        Returns:
+            Committed length of the file in bytes
+        """
+        async with self.__locks[connection_id]:
+            return await asyncio.to_thread(self._append, connection_id, data, buffer)
+
+    async def sync(self, connection_id: str, buffer: "AudioBuffer") -> int:
+        """Makes the file durable and equal to the buffer, the connection keeps appending (e.g. its buffer is spilled).
+
+        Returns:
+            Committed length of the file in bytes
+        """
+        async with self.__locks[connection_id]:
+            return await asyncio.to_thread(self._flush, connection_id, buffer)
+
+    async def flush(self, connection_id: str, buffer: "AudioBuffer") -> int:
+        """Makes the file durable and equal to the buffer (the connection is about to be dropped from memory).
+
+        Returns:
+            Committed length of the file in bytes
+        """
+        length = await self.sync(connection_id, buffer)
+        self.forget(connection_id)
+        return length
+
+    def forget(self, connection_id: str) -> None:
+        """Drops the state kept for the connection's file, once the connection is released or discarded."""
+        self.__locks.pop(connection_id, None)
+        self.__last_fsync.pop(connection_id, None)
+        self.__indexes.pop(self.path(connection_id), None)
+
+    def _append(self, connection_id: str, data: bytes, buffer: "AudioBuffer") -> int:
+        path = self.path(connection_id)
+        length = len(buffer)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(path, "ab") as file:
+            file_length = file.tell()
+            if file_length == length - len(data) or buffer.spilled:
+                file.write(data)
+                file.flush()
+                if self._fsync_due(connection_id):
+                    os.fsync(file.fileno())
+                self._index(path, file_length).append(data)
+
+        if file_length != length - len(data) and buffer.spilled:
+            # The file is the only copy of the audio, the buffer follows it
+            logger.error(f"Audio file {path} of a spilled buffer has {file_length} bytes, expected {length - len(data)}")
+            buffer.length = file_length + len(data)
+            length = buffer.length
+
+        elif file_length != length - len(data):
+            logger.warning(f"Audio file {path} out of sync ({file_length} + {len(data)} != {length} bytes), rewriting it")
+            return self._rewrite(path, buffer)
+
+        self._publish(path, length)
+        return length
+
+    def _flush(self, connection_id: str, buffer: "AudioBuffer") -> int:
+        path = self.path(connection_id)
+        length = len(buffer)
+
+        try:
+            with open(path, "rb+") as file:
+                if os.fstat(file.fileno()).st_size == length:
+                    os.fsync(file.fileno())
+                    self._publish(path, length)
+                    return length
+        except FileNotFoundError:
+            pass
+
+        return self._rewrite(path, buffer)
+
+    def _rewrite(self, path: str, buffer: "AudioBuffer") -> int:
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Readers keep the old file open until they are done, new readers get the complete new one
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file, buffer.view() as data:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+        self._index(path, len(buffer))
+        self._publish(path, len(buffer))
+        return len(buffer)
+
+    def _index(self, path: str, length: int) -> TimeIndexWriter:
+        """Returns the index writer of the file, indexing its first ``length`` bytes first if they are not indexed."""
+        index = self.__indexes.get(path)
+        if index is None or index.length != length:
+            index = self.__indexes[path] = TimeIndexWriter(path, self.index_segment_sec)
+            index.rebuild(length)
+        return index
+
+    def _publish(self, path: str, length: int) -> None:
+        publish_committed_length(path, length)
+
+    def _fsync_due(self, connection_id: str) -> bool:
+        if self.fsync_policy == "always":
+            return True
+        if self.fsync_policy == "never":
+            return False
+
+        now = time.monotonic()
+        if now - self.__last_fsync.get(connection_id, 0) >= self.fsync_interval_sec:
+            self.__last_fsync[connection_id] = now
+            return True
+        return False
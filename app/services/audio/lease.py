@@ -0,0 +1,146 @@
+"""Leases of connections between parse_stream processes.
+
+Notes:
+    A connection is processed only by the holder of ``audio_connection_lease:{connection_id}`` (the consumer name of
+    the process, with a TTL of ``AUDIO_LEASE_TTL_MS``). The holder renews its leases on every tick (``heartbeat``)
+    and releases them once the connection is flushed; a lease of a dead process expires and the next process that
+    gets the connection takes it over.
+
+    Writes of the shared state of a connection (its Redis audio buffer) are fenced: they are applied in a transaction
+    that also checks and renews the lease, so a process that lost its lease (e.g. it stalled longer than the TTL)
+    can not write over the new holder.
+
+"""
+import logging
+from typing import Callable, List, NamedTuple, Optional, Set
+
+from redis.asyncio.client import Pipeline, Redis
+from redis.exceptions import WatchError
+
+from shared_lib.redis.keys import AUDIO_CONNECTION_LEASE
+
+logger = logging.getLogger(__name__)
+
+
+class Lease(NamedTuple):
+    holder: Optional[str]  # consumer holding the lease, None if it expired meanwhile
+    taken_over: bool  # acquired by this call, the connection may have been processed elsewhere since
+
+
+class ConnectionLeases:
+    def __init__(self, redis_client: Redis, owner: str, ttl_ms: int):
+        self.__redis_client = redis_client
+        self.owner = owner
+        self.ttl_ms = ttl_ms
+        self.owned: Set[str] = set()
+
+    @staticmethod
+    def key(connection_id: str) -> str:
+        return f"{AUDIO_CONNECTION_LEASE}:{connection_id}"
+
+    def owns(self, connection_id: str) -> bool:
+        return connection_id in self.owned
+
+    async def acquire(self, connection_id: str) -> Lease:
+        """Acquires the lease of the connection or renews it if it is held already."""
+        key = self.key(connection_id)
+        if await self.__redis_client.set(key, self.owner, nx=True, px=self.ttl_ms):
+            self.owned.add(connection_id)
+            return Lease(self.owner, taken_over=True)
+
+        async with self.__redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                holder = _decode(await pipe.get(key))
+                if holder != self.owner:
+                    self.owned.discard(connection_id)
+                    return Lease(holder, taken_over=False)
+
+                pipe.multi()
+                pipe.pexpire(key, self.ttl_ms)
+                await pipe.execute()
+
+            except WatchError:
+                self.owned.discard(connection_id)
+                return Lease(None, taken_over=False)
+
+        taken_over = connection_id not in self.owned  # held by this process under an earlier run of the same name
+        self.owned.add(connection_id)
+        return Lease(self.owner, taken_over=taken_over)
+
+    async def heartbeat(self) -> List[str]:
+        """Renews all leases held by the process.
+
+        Returns:
+            Connections whose lease was lost (expired or taken over), they are no longer owned
+        """
+        if not self.owned:
+            return []
+
+        connection_ids = list(self.owned)
+        keys = [self.key(connection_id) for connection_id in connection_ids]
+        async with self.__redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(*keys)
+                holders = await pipe.mget(keys)
+                held = [key for key, holder in zip(keys, holders) if _decode(holder) == self.owner]
+
+                pipe.multi()
+                for key in held:
+                    pipe.pexpire(key, self.ttl_ms)
+                await pipe.execute()
+                held = set(held)
+
+            except WatchError:
+                # A lease changed meanwhile, each one is checked on its own
+                held = {self.key(c) for c in connection_ids if (await self.acquire(c)).holder == self.owner}
+
+        lost = [c for c, key in zip(connection_ids, keys) if key not in held]
+        self.owned.difference_update(lost)
+        if lost:
+            logger.warning(f"Lost the lease of {len(lost)} connection(s): {lost}")
+        return lost
+
+    async def fenced(self, connection_id: str, queue: Callable[[Pipeline], None]) -> Optional[list]:
+        """Executes the commands queued by ``queue`` in a transaction only if the lease is still held (and renews it).
+
+        Returns:
+            Results of the queued commands or None if the lease is lost
+        """
+        key = self.key(connection_id)
+        async with self.__redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if _decode(await pipe.get(key)) != self.owner:
+                    self.owned.discard(connection_id)
+                    return None
+
+                pipe.multi()
+                queue(pipe)
+                pipe.pexpire(key, self.ttl_ms)
+                return (await pipe.execute())[:-1]
+
+            except WatchError:
+                self.owned.discard(connection_id)
+                return None
+
+    async def release(self, connection_id: str) -> None:
+        """Releases the lease of the connection if it is still held by the process."""
+        self.owned.discard(connection_id)
+        key = self.key(connection_id)
+        async with self.__redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if _decode(await pipe.get(key)) != self.owner:
+                    return
+
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+
+            except WatchError:
+                pass
+
+
+def _decode(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,165 @@
+"""Decoded audio of connections, kept next to their WebM files (``/data/audio/{connection_id}.pcm``).
+
+Notes:
+    parse_stream runs one ffmpeg decoder per connection for as long as the connection is active. Every appended WebM
+    chunk is piped to it and the decoded 16 kHz mono s16le PCM is appended to the connection's ``.pcm`` file, whose
+    readable length is published like the WebM one (``{file}.committed``, see ``file_writer``).
+
+    The PCM file is indexed by time: the sample at ``t`` seconds is at byte ``t * PCM_BYTES_PER_SEC``, so the
+    transcriber reads ``[seek, seek + length)`` with a single ``pread`` (``read_pcm_slice``) instead of decoding the
+    whole WebM file up to ``seek``. A decoder started for a connection that already has audio (after a restart or a
+    handover) is fed the whole buffer and rewrites the PCM file from its beginning.
+
+    Without ffmpeg (or with ``AUDIO_PCM_DECODE`` off) no PCM is written and the transcriber decodes the WebM file.
+
+"""
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.services.audio.file_writer import publish_committed_length, read_committed_length
+
+if TYPE_CHECKING:
+    from app.services.audio.buffer_manager import AudioBuffer
+
+logger = logging.getLogger(__name__)
+
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2  # s16le
+PCM_CHANNELS = 1
+PCM_BYTES_PER_SEC = PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH * PCM_CHANNELS
+READ_SIZE = 64 * 1024
+
+
+def pcm_path(output_dir: str, connection_id: str) -> str:
+    return os.path.join(output_dir, f"{connection_id}.pcm")
+
+
+def read_pcm_slice(path: str, start: float, duration: float) -> Optional[bytes]:
+    """Reads ``duration`` seconds of decoded audio from ``start`` (both in seconds), up to the committed length.
+
+    Returns:
+        PCM bytes or None if the file does not have audio after ``start`` yet (the WebM file has to be decoded)
+    """
+    committed_length = read_committed_length(path)
+    offset = _align(int(max(start, 0) * PCM_BYTES_PER_SEC))
+    if not committed_length or committed_length <= offset:
+        return None
+
+    length = min(_align(int(duration * PCM_BYTES_PER_SEC)), committed_length - offset)
+    try:
+        with open(path, "rb") as file:
+            data = os.pread(file.fileno(), length, offset)
+    except FileNotFoundError:
+        return None
+
+    return data if len(data) == length else None  # rewritten meanwhile
+
+
+def _align(length: int) -> int:
+    return length - length % (PCM_SAMPLE_WIDTH * PCM_CHANNELS)
+
+
+class PcmDecoder:
+    """ffmpeg process decoding the WebM stream of one connection into its PCM file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.length = 0
+        self.__process: Optional[asyncio.subprocess.Process] = None
+        self.__reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await asyncio.to_thread(os.makedirs, os.path.dirname(self.path), exist_ok=True)
+        self.__process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", "-ac", str(PCM_CHANNELS), "-ar", str(PCM_SAMPLE_RATE), "-f", "s16le", "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        publish_committed_length(self.path, 0)
+        self.__reader = asyncio.create_task(self._read())
+
+    async def feed(self, data: bytes) -> None:
+        self.__process.stdin.write(data)
+        await self.__process.stdin.drain()
+
+    async def close(self) -> None:
+        """Lets ffmpeg decode what it was fed and waits for its output to be written."""
+        if self.__process.stdin.can_write_eof():
+            self.__process.stdin.write_eof()
+        await self.__reader
+        await self.__process.wait()
+
+    async def _read(self) -> None:
+        file = await asyncio.to_thread(open, self.path, "wb")
+        try:
+            pending = b""
+            while data := await self.__process.stdout.read(READ_SIZE):
+                # Only whole samples are published
+                data, pending = pending + data, b""
+                whole = _align(len(data))
+                data, pending = data[:whole], data[whole:]
+                await asyncio.to_thread(self._append, file, data)
+        finally:
+            await asyncio.to_thread(file.close)
+
+    def _append(self, file, data: bytes) -> None:
+        file.write(data)
+        file.flush()
+        self.length += len(data)
+        publish_committed_length(self.path, self.length)
+
+
+class PcmDecoders:
+    """Decoders of the active connections of the process."""
+
+    def __init__(self, output_dir: str = "/data/audio", enabled: bool = True):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.__decoders: Dict[str, PcmDecoder] = {}
+
+    async def feed(self, connection_id: str, data: bytes, buffer: "AudioBuffer") -> None:
+        """Decodes the bytes just appended to the buffer of the connection.
+
+        Args:
+            connection_id: The connection ID
+            data: Bytes just appended to ``buffer``
+            buffer: Buffer of the connection (``data`` included), fed as a whole to a new decoder
+        """
+        if not self.enabled:
+            return
+
+        decoder = self.__decoders.get(connection_id)
+        try:
+            if decoder is None:
+                decoder = PcmDecoder(pcm_path(self.output_dir, connection_id))
+                await decoder.start()
+                self.__decoders[connection_id] = decoder
+                data = await asyncio.to_thread(buffer.getvalue)  # the decoder needs the stream from its header
+
+            await decoder.feed(data)
+
+        except FileNotFoundError:
+            logger.error("ffmpeg not found, audio is not decoded to PCM")
+            self.enabled = False
+        except (BrokenPipeError, ConnectionResetError) as ex:
+            # ffmpeg quit (e.g. corrupted input): a new decoder is started from the buffer with the next chunks
+            logger.error(f"PCM decoder of connection {connection_id} failed: {ex}")
+            await self.close(connection_id)
+
+    async def close(self, connection_id: str) -> None:
+        decoder = self.__decoders.pop(connection_id, None)
+        if decoder is None:
+            return
+        try:
+            await decoder.close()
+        except Exception as ex:
+            logger.error(f"Error closing PCM decoder of connection {connection_id}: {ex}")
+
+    async def close_all(self) -> None:
+        for connection_id in list(self.__decoders):
+            await self.close(connection_id)
@@ -1,98 +1,198 @@
 from app.redis_transcribe.connection import get_redis_client
 from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import List, Tuple, Optional, Dict
 import os
-import io
+import socket
+import time
+import weakref
 
 from redis.asyncio.client import Redis
 
-from app.services.audio.audio import AudioSlicer
+from app.services.audio.audio import AudioSlicer, decode_audio_buffer
+from app.services.audio.buffer_manager import AudioBuffer, AudioBufferManager
+from app.services.audio.file_writer import AudioFileWriter
+from app.services.audio.lease import ConnectionLeases
+from app.services.audio.pcm import PcmDecoders
 from app.services.audio.redis_models import Connection, Meeting, Transcriber
 from app.settings import settings
 
-from shared_lib.redis.models import AudioChunkModel, SpeakerDataModel
-from shared_lib.redis.keys import AUDIO_BUFFER, AUDIO_BUFFER_LAST_UPDATED
+from shared_lib.redis.models import AudioChunkEnvelope, SpeakerDataModel
+from shared_lib.redis.keys import AUDIO_BUFFER, AUDIO_BUFFER_LAST_ENTRY, AUDIO_BUFFER_LAST_UPDATED
 
 logger = logging.getLogger(__name__)
 
+AUDIO_BUFFER_TTL_SEC = 86400  # 24 hours, safety net: buffers are flushed after inactivity
+RECOVERY_BATCH_SIZE = 500  # audio buffer keys indexed per pipeline on startup
+READ_BATCH_SIZE = 100  # chunks read per connection and tick
+READY_BATCH_SIZE = 100  # ready connections popped per tick
+
 
 class Processor:
-    def __init__(self):
+    def __init__(
+        self,
+        redis_client: Optional[Redis] = None,
+        audio_redis_client: Optional[Redis] = None,
+        leases: Optional[ConnectionLeases] = None,
+        output_dir: str = "/data/audio",
+    ):
+        """Clients and leases not given are created in ``setup``.
+
+        Args:
+            redis_client: Redis client
+            audio_redis_client: Binary-safe client (decode_responses=False) for raw audio keys
+            leases: Connections owned by this process, its owner is the consumer name of the process
+            output_dir: Directory of the audio files of the connections
+        """
         self.__running_tasks = set()
-        self.__redis_client = None  # Will be initialized in setup
-        self.__audio_buffers = {}  # In-memory audio buffers indexed by connection_id
-        self.__buffer_last_updated = {}  # Timestamp of last update per connection
-        self.__inactive_timeout = 60  # Seconds before an inactive connection is flushed to disk
+        self.__redis_client = redis_client
+        self.__audio_redis_client = audio_redis_client
+        self.__leases = leases
+        # Consumer name within the audio stream group
+        self.__consumer = leases.owner if leases else f"{socket.gethostname()}-{os.getpid()}"
+        self.__last_sweep = 0.0  # monotonic time all registered connections were last checked
+        self.__file_writer = AudioFileWriter(
+            output_dir,
+            fsync_policy=settings.audio_fsync_policy,
+            fsync_interval_sec=settings.audio_fsync_interval_sec,
+            index_segment_sec=settings.audio_index_segment_sec,
+        )
+        # Connections are processed concurrently, up to PROCESSING_THREADS at a time and one batch per connection
+        self.__semaphore = asyncio.Semaphore(settings.processing_threads)
+        self.__connection_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.__meeting_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        # Audio buffers indexed by connection_id, spilled to their files beyond the memory budget
+        self.__buffers = AudioBufferManager(
+            self.__file_writer, settings.audio_buffer_memory_budget_mb * 1024 * 1024, inactive_timeout=60
+        )
+        # Audio of the active connections decoded once into PCM files, read by the transcriber by time
+        self.__decoders = PcmDecoders(self.__file_writer.output_dir, enabled=settings.audio_pcm_decode)
 
     async def setup(self):
         """Initialize Redis client if not already initialized and load existing audio buffers."""
         if self.__redis_client is None:
             self.__redis_client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password)
-            
+        if self.__audio_redis_client is None:
+            self.__audio_redis_client = await get_redis_client(
+                settings.redis_host, settings.redis_port, settings.redis_password, decode_responses=False
+            )
+        if self.__leases is None:
+            self.__leases = ConnectionLeases(self.__audio_redis_client, self.__consumer, settings.audio_lease_ttl_ms)
+
         # Load existing audio buffers from Redis
         await self._load_audio_buffers_from_redis()
             
         return self.__redis_client
         
     async def _load_audio_buffers_from_redis(self):
-        """Load existing audio buffers from Redis into memory cache."""
+        """Index the audio buffers left in Redis by a previous run.
+
+        Only their lengths and last updates are read (pipelined ``STRLEN`` / ``GET``), a buffer itself is loaded
+        by ``_restore_audio_buffer`` when its connection next receives chunks.
+        """
         pattern = f"{AUDIO_BUFFER}:*"
         buffer_count = 0
-        
-        logger.info("Loading existing audio buffers from Redis...")
-        async for key in self.__redis_client.scan_iter(match=pattern):
+
+        logger.info("Indexing existing audio buffers in Redis...")
+        keys = []
+        async for key in self.__audio_redis_client.scan_iter(match=pattern, count=RECOVERY_BATCH_SIZE):
+            keys.append(key)
+            if len(keys) >= RECOVERY_BATCH_SIZE:
+                buffer_count += await self._register_audio_buffers(keys)
+                keys = []
+        if keys:
+            buffer_count += await self._register_audio_buffers(keys)
+
+        logger.info(f"Indexed {buffer_count} audio buffers from Redis ({self.__buffers.stats()})")
+
+    async def _register_audio_buffers(self, keys: List[bytes]) -> int:
+        connection_ids = [key.decode().split(':')[1] for key in keys]
+        async with self.__audio_redis_client.pipeline(transaction=False) as pipe:
+            for key, connection_id in zip(keys, connection_ids):
+                pipe.strlen(key)
+                pipe.get(f"{AUDIO_BUFFER_LAST_UPDATED}:{connection_id}")
+            results = await pipe.execute()
+
+        registered = 0
+        for connection_id, length, timestamp in zip(connection_ids, results[::2], results[1::2]):
+            if not length:
+                continue
             try:
-                connection_id = key.split(':')[1]
-                buffer_data = await self.__redis_client.get(key)
-                
-                if buffer_data:
-                    # Create in-memory buffer
-                    mem_buffer = io.BytesIO(buffer_data)
-                    self.__audio_buffers[connection_id] = mem_buffer
-                    
-                    # Get last updated timestamp
-                    timestamp_key = f"{AUDIO_BUFFER_LAST_UPDATED}:{connection_id}"
-                    timestamp_str = await self.__redis_client.get(timestamp_key)
-                    if timestamp_str:
-                        try:
-                            last_updated = datetime.fromisoformat(timestamp_str)
-                            self.__buffer_last_updated[connection_id] = last_updated
-                        except ValueError:
-                            self.__buffer_last_updated[connection_id] = datetime.now(timezone.utc)
-                    else:
-                        self.__buffer_last_updated[connection_id] = datetime.now(timezone.utc)
-                        
-                    buffer_count += 1
-            except Exception as e:
-                logger.error(f"Error loading audio buffer from Redis: {e}")
-        
-        logger.info(f"Loaded {buffer_count} audio buffers from Redis")
-
-    async def _get_new_connections(self):
-        """Get new connections by scanning Redis for initialFeed_audio keys."""
-        pattern = "initialFeed_audio:*"
-        connections = []
-        async for key in self.__redis_client.scan_iter(match=pattern):
-            connection_id = key.split(':')[1]
-            connections.append((connection_id, key))
+                last_updated = datetime.fromisoformat(timestamp.decode()) if timestamp else datetime.now(timezone.utc)
+            except ValueError:
+                last_updated = datetime.now(timezone.utc)
+
+            self.__buffers.register(connection_id, length, last_updated)
+            registered += 1
+
+        return registered
+
+    async def _restore_audio_buffer(self, connection_id: str) -> None:
+        """Load the buffer of a connection indexed on startup, before its new chunks are appended."""
+        redis_key = f"{AUDIO_BUFFER}:{connection_id}"
+        buffer_data = await self.__audio_redis_client.get(redis_key)
+        if not buffer_data:
+            if not self.__buffers.is_pending(connection_id):
+                return  # new connection
+            logger.warning(f"Audio buffer of connection {connection_id} expired in Redis before it was restored")
+            buffer_data = b""
+
+        audio_data = decode_audio_buffer(buffer_data)
+        if audio_data is not buffer_data:
+            # Hex buffer of an older version, stored raw from now on so new chunks can be appended
+            await self.__audio_redis_client.set(redis_key, audio_data, keepttl=True)
+
+        # Restored buffers count against the memory budget like live ones
+        await self.__buffers.restore(connection_id, audio_data, datetime.now(timezone.utc))
+        logger.info(f"Restored audio buffer of connection {connection_id} from Redis ({len(audio_data)} bytes)")
+
+    async def _get_new_connections(self, wait_sec: float = 0) -> List[str]:
+        """Get connections with new audio chunks, waiting up to ``wait_sec`` for one to become ready.
+
+        Once per claim interval all registered connections are returned as well, so chunks left pending by a
+        crashed processor (whose ready mark was already popped) are reclaimed.
+        """
+        audio_chunk_dal = AudioChunkDAL(self.__audio_redis_client)
+        connections = await audio_chunk_dal.wait_ready_connections(wait_sec, READY_BATCH_SIZE, self.__consumer)
+
+        now = time.monotonic()
+        if now - self.__last_sweep >= settings.audio_stream_claim_idle_ms / 1000:
+            self.__last_sweep = now
+            connections = list(dict.fromkeys(connections + await audio_chunk_dal.get_chunks_connections()))
+
         return connections
 
-    async def process_connections(self):
+    async def process_connections(self, wait_sec: float = 0):
+        """Process the connections with new audio chunks.
+
+        Args:
+            wait_sec: Seconds to wait for a connection to become ready when none is (0 - do not wait)
+        """
         if not self.__redis_client:
             await self.setup()
         
+        # Connections whose lease was lost are processed by another process now
+        for connection_id in await self.__leases.heartbeat():
+            async with _lock(self.__connection_locks, connection_id):
+                await self._discard_connection(connection_id)
+
         # Check for and flush inactive connections before processing
         await self.flush_inactive_connections()
         
-        connections = await self._get_new_connections()
-        for connection_id, key in connections:
+        connections = await self._get_new_connections(wait_sec)
+        await asyncio.gather(*(self._process_connection(connection_id) for connection_id in connections))
+
+    async def _process_connection(self, connection_id: str) -> None:
+        # The connection's lock is taken first, so a connection waiting for its previous batch holds no slot
+        async with _lock(self.__connection_locks, connection_id), self.__semaphore:
             logger.info(f"Processing connection {connection_id}")
-            await self._process_connection_task(connection_id)
-            # Remove the key after processing
-            await self.__redis_client.delete(key)
+            try:
+                await self._process_connection_task(connection_id)
+            except Exception as e:
+                logger.exception(f"Error processing connection {connection_id}: {e}")
 
     async def _process_connection_task(
         self,
@@ -110,37 +210,42 @@ class Processor:
             logger.warning(f"Skipping processing for connection {connection_id} due to missing data")
             return
 
-        current_time = datetime.now(timezone.utc) #TODO: consider using transcriber_last_updated_timestamp + step and rename to update_time
-
         connection = Connection(self.__redis_client, connection_id, user_id)
         await connection.update_timestamps(segment_start_user_timestamp, segment_end_user_timestamp)
 
-        meeting = Meeting(self.__redis_client, meeting_id)
+        # Meeting metadata is committed in a transaction, connections of the same meeting take turns so that their
+        # transactions do not conflict
+        async with _lock(self.__meeting_locks, meeting_id):
+            await self._update_meeting(
+                meeting_id, connection, segment_start_user_timestamp, segment_start_server_timestamp, transcriber_step
+            )
 
-        await meeting.load_from_redis()
-        await meeting.add_connection(connection.id)
-        await meeting.set_start_timestamp(segment_start_user_timestamp)
-        await meeting.set_start_server_timestamp(segment_start_server_timestamp)
-        
-        meeting.transcriber_last_updated_timestamp = (
-            meeting.transcriber_last_updated_timestamp or segment_start_user_timestamp
-        )
+    async def _update_meeting(
+        self,
+        meeting_id: str,
+        connection: Connection,
+        segment_start_user_timestamp: datetime,
+        segment_start_server_timestamp: datetime,
+        transcriber_step: int,
+    ) -> None:
+        current_time = datetime.now(timezone.utc) #TODO: consider using transcriber_last_updated_timestamp + step and rename to update_time
 
-        time_since_last_update = (current_time - meeting.transcriber_last_updated_timestamp).seconds
+        meeting = Meeting(self.__redis_client, meeting_id)
+        transcriber_due = await meeting.add_segment(
+            connection.id,
+            segment_start_user_timestamp,
+            segment_start_server_timestamp,
+            Transcriber(self.__redis_client),
+            transcriber_step,
+            current_time,
+        )
 
         logger.info(f"Last transcriber update timestamp: {meeting.transcriber_last_updated_timestamp}")
 
-        if time_since_last_update > transcriber_step:
-            logger.info(f"Adding transcriber - time threshold exceeded ({time_since_last_update} > {transcriber_step} seconds)")
-            transcriber = Transcriber(self.__redis_client)
-            await transcriber.add_todo(meeting.meeting_id)
-            await meeting.update_transcriber_timestamp(
-                segment_start_user_timestamp, transcriber_last_updated_timestamp=current_time 
-            )
+        if transcriber_due:
+            logger.info(f"Added transcriber - time threshold of {transcriber_step} seconds exceeded")
         else:
-            logger.info(f"Skipping transcriber addition - time threshold not met ({time_since_last_update} <= {transcriber_step} seconds)")
-
-        await meeting.update_redis()
+            logger.info(f"Skipping transcriber addition - time threshold of {transcriber_step} seconds not met")
 
     async def writestream2file(self, connection_id) -> Tuple[Optional[str], Optional[datetime], Optional[datetime], Optional[datetime], Optional[str]]:
         """Process audio chunks for a connection, storing them in memory and Redis instead of writing to file.
@@ -158,86 +263,167 @@ class Processor:
         logger.info(f"Processing audio stream for connection {connection_id}")
         # Legacy path reference (not used for writing, but kept for reference)
         path = f"/data/audio/{connection_id}.webm"
-        first_user_timestamp = None
-        first_server_timestamp = None
-        
-        audio_chunk_dal = AudioChunkDAL(self.__redis_client)
-        chunks = await audio_chunk_dal.pop_chunks(connection_id, limit=100)
+        audio_chunk_dal = AudioChunkDAL(self.__audio_redis_client)
+
+        # Only the holder of the connection's lease processes it, it gets the connections other processes pick up
+        lease = await self.__leases.acquire(connection_id)
+        if lease.holder != self.__consumer:
+            logger.info(f"Connection {connection_id} is owned by {lease.holder}")
+            if lease.holder:
+                await audio_chunk_dal.mark_ready(connection_id, lease.holder)
+            return None, None, None, None, None
+
+        if lease.taken_over:
+            # Another process may have appended audio since: the buffer is restored from Redis
+            await self._discard_connection(connection_id)
+
+        # Chunks left pending by a former holder are reclaimed right away, they are not being processed anymore
+        entries = await audio_chunk_dal.read_chunks(
+            connection_id,
+            self.__consumer,
+            limit=READ_BATCH_SIZE,
+            claim_min_idle_ms=0 if lease.taken_over else settings.audio_stream_claim_idle_ms,
+        )
+        read_count = len(entries)
 
-        if not chunks:
+        # The restored buffer already holds the chunks the former holder appended without acknowledging them
+        if read_count and (lease.taken_over or self.__buffers.is_pending(connection_id)):
+            await self._restore_audio_buffer(connection_id)
+        entries = await self._skip_appended_entries(audio_chunk_dal, connection_id, entries)
+
+        if not entries:
             logger.info(f"No chunks found for connection {connection_id}")
+            if read_count >= READ_BATCH_SIZE:
+                await audio_chunk_dal.mark_ready(connection_id)
+            elif connection_id not in self.__buffers:
+                await audio_chunk_dal.remove_connection_if_drained(connection_id)
+                await self.__leases.release(connection_id)
             return None, None, None, None, None
 
-        meeting_id = connection_id
-        user_id = None
-        
-        # Initialize audio buffer for this connection if it doesn't exist
-        if connection_id not in self.__audio_buffers:
-            self.__audio_buffers[connection_id] = io.BytesIO()
-            
-        buffer = self.__audio_buffers[connection_id]
-        
-        for chunk_data in chunks:
-            try:
-                chunk_obj = AudioChunkModel(**chunk_data)
-            except ValueError as e:
-                logger.error(f"Invalid chunk data for connection {connection_id}: {e}")
-                continue
+        # Only the bytes of this batch are new, they are appended to the buffer, its file and Redis
+        new_data = b"".join(chunk.chunk for _, chunk in entries)
 
-            raw_chunk = bytes.fromhex(chunk_obj.chunk)
-            first_user_timestamp = (
-                datetime.fromisoformat(chunk_obj.user_timestamp.rstrip("Z")).astimezone(timezone.utc)
-                - timedelta(seconds=chunk_obj.audio_chunk_duration_sec)
-                if not first_user_timestamp
-                else first_user_timestamp
-            )
-            
-            first_server_timestamp = (
-                datetime.fromisoformat(chunk_obj.server_timestamp.rstrip("Z")).astimezone(timezone.utc)
-                - timedelta(seconds=chunk_obj.audio_chunk_duration_sec)
-                if not first_server_timestamp
-                else first_server_timestamp
-            )
-            
-            # Append the chunk to our in-memory buffer
-            buffer.write(raw_chunk)
-            
-            last_user_timestamp = datetime.fromisoformat(chunk_obj.user_timestamp.rstrip("Z")).astimezone(timezone.utc)
-            
-            meeting_id = chunk_obj.meeting_id or connection_id
-            user_id = str(chunk_obj.user_id)
+        # Chunks were validated once by streamqueue, only the batch boundaries need timestamps
+        first_chunk, last_chunk = entries[0][1], entries[-1][1]
+        first_chunk_duration = timedelta(seconds=first_chunk.audio_chunk_duration_sec)
+        first_user_timestamp = first_chunk.user_datetime - first_chunk_duration
+        first_server_timestamp = first_chunk.server_datetime - first_chunk_duration
+        last_user_timestamp = last_chunk.user_datetime
+
+        meeting_id = last_chunk.meeting_id or connection_id
+        user_id = last_chunk.user_id
         
-        # Update the last updated timestamp for this connection
+        # The buffer also appends to the file on disk, read by the transcriber's ffmpeg
         current_time = datetime.now(timezone.utc)
-        self.__buffer_last_updated[connection_id] = current_time
-        
-        # Store the buffer in Redis and also write to disk for compatibility
-        buffer_data = buffer.getvalue()
-        if buffer_data:
-            # Store the buffer in Redis with long expiration (e.g., 24 hours = 86400 seconds)
-            # We'll use our own activity tracking for flushing
-            redis_key = f"{AUDIO_BUFFER}:{connection_id}"
+        buffer = await self.__buffers.append(connection_id, new_data, current_time)
+
+        # Append the new bytes to the buffer in Redis
+        if new_data:
+            buffer_size = await self._append_audio_buffer(connection_id, new_data, buffer, entries[-1][0])
+            if buffer_size is None:
+                # The new holder restores the buffer from Redis and reclaims the chunks, they are not acknowledged
+                logger.warning(f"Lost the lease of connection {connection_id}, its chunks are left to the new holder")
+                await self._discard_connection(connection_id)
+                return None, None, None, None, None
+
+            await self.__decoders.feed(connection_id, new_data, buffer)
+
+            # Long expiration as safety, we use our own activity tracking for flushing
             timestamp_key = f"{AUDIO_BUFFER_LAST_UPDATED}:{connection_id}"
-            
-            # Hex encode the binary data before storing in Redis
-            # This ensures binary audio data is properly stored and retrieved with Redis decode_responses=True
-            hex_encoded_buffer = buffer_data.hex()
-            await self.__redis_client.set(redis_key, hex_encoded_buffer, ex=86400)  # 24 hour TTL as safety
-            await self.__redis_client.set(timestamp_key, current_time.isoformat(), ex=86400)
-            
-            # Also write to disk to maintain compatibility with previous implementation
-            # This ensures proper WebM file structure for ffmpeg
-            output_dir = "/data/audio"
-            os.makedirs(output_dir, exist_ok=True)
-            file_path = os.path.join(output_dir, f"{connection_id}.webm")
-            
-            with open(file_path, "wb") as f:
-                f.write(buffer_data)
-            
-            logger.info(f"Stored audio buffer in Redis and on disk for connection {connection_id} ({len(buffer_data)} bytes)")
+            await self.__redis_client.set(timestamp_key, current_time.isoformat(), ex=AUDIO_BUFFER_TTL_SEC)
+
+            logger.info(f"Appended {len(new_data)} bytes to audio buffer of connection {connection_id} ({buffer_size} bytes)")
+
+        # Chunks are acknowledged only once persisted, a crash before this point leaves them to be reclaimed
+        await audio_chunk_dal.ack_chunks(connection_id, [entry_id for entry_id, _ in entries])
+        if read_count >= READ_BATCH_SIZE:
+            # More chunks may be queued than one read returns, the connection is picked up again on the next tick
+            await audio_chunk_dal.mark_ready(connection_id)
         
         return meeting_id, first_user_timestamp, last_user_timestamp, first_server_timestamp, user_id
     
+    async def _skip_appended_entries(
+        self, audio_chunk_dal: AudioChunkDAL, connection_id: str, entries: List[Tuple[bytes, AudioChunkEnvelope]]
+    ) -> List[Tuple[bytes, AudioChunkEnvelope]]:
+        """Acknowledge the entries already appended to the buffer of a connection and return the others.
+
+        Entries are appended before they are acknowledged: if processing stops in between, they are read
+        again (reclaimed) while ``audio_buffer_last_entry:{connection_id}`` already covers them.
+
+        Args:
+            audio_chunk_dal: DAL of the audio stream
+            connection_id: The connection ID
+            entries: Entries read from the stream of the connection, in stream order
+
+        Returns:
+            Entries not appended yet
+        """
+        if not entries:
+            return entries
+
+        last_entry_id = await self.__audio_redis_client.get(f"{AUDIO_BUFFER_LAST_ENTRY}:{connection_id}")
+        if last_entry_id is None:
+            return entries
+
+        last_entry = _stream_id(last_entry_id)
+        appended = [entry_id for entry_id, _ in entries if _stream_id(entry_id) <= last_entry]
+        if not appended:
+            return entries
+
+        logger.warning(f"Skipping {len(appended)} chunk(s) of connection {connection_id} already in its audio buffer")
+        await audio_chunk_dal.ack_chunks(connection_id, appended)
+        return [(entry_id, chunk) for entry_id, chunk in entries if _stream_id(entry_id) > last_entry]
+
+    async def _append_audio_buffer(
+        self, connection_id: str, data: bytes, buffer: AudioBuffer, last_entry_id: bytes
+    ) -> Optional[int]:
+        """Append new bytes to ``audio_buffer:{connection_id}`` instead of rewriting the whole buffer.
+
+        The whole buffer is written only if the Redis copy turns out to be out of sync with it
+        (e.g. it expired or was flushed), so the Redis buffer always starts with the WebM header.
+        Both writes are fenced by the lease of the connection and record ``last_entry_id`` in the
+        same transaction, so entries read again after a failed acknowledgement are not appended twice.
+
+        Args:
+            connection_id: The connection ID
+            data: Bytes just appended to ``buffer``
+            buffer: Buffer of the connection (``data`` included), in memory or spilled to its file
+            last_entry_id: Id of the last stream entry in ``data``
+
+        Returns:
+            Size of the buffer in bytes or None if the lease of the connection was lost
+        """
+        redis_key = f"{AUDIO_BUFFER}:{connection_id}"
+        last_entry_key = f"{AUDIO_BUFFER_LAST_ENTRY}:{connection_id}"
+
+        def append(pipe):
+            pipe.append(redis_key, data)
+            pipe.expire(redis_key, AUDIO_BUFFER_TTL_SEC)
+            pipe.set(last_entry_key, last_entry_id, ex=AUDIO_BUFFER_TTL_SEC)
+
+        results = await self.__leases.fenced(connection_id, append)
+        if results is None:
+            return None
+
+        redis_size, buffer_size = results[0], len(buffer)
+        if redis_size != buffer_size:
+            logger.warning(
+                f"Audio buffer of connection {connection_id} out of sync in Redis ({redis_size} != {buffer_size} bytes), rewriting it"
+            )
+            def rewrite(pipe):
+                pipe.set(redis_key, buffer_data, ex=AUDIO_BUFFER_TTL_SEC)
+                pipe.set(last_entry_key, last_entry_id, ex=AUDIO_BUFFER_TTL_SEC)
+
+            with buffer.view() as buffer_data:
+                if await self.__leases.fenced(connection_id, rewrite) is None:
+                    return None
+
+        return buffer_size
+
+    def buffer_stats(self) -> Dict[str, int]:
+        """Number of connections with an audio buffer (in memory, spilled or pending) and memory used."""
+        return self.__buffers.stats()
+
     async def get_audio_buffer(self, connection_id: str) -> bytes:
         """Get the audio buffer for a connection from memory or Redis.
         
@@ -247,45 +433,30 @@ class Processor:
         Returns:
             The audio buffer as bytes or None if not found
         """
-        # Try to get from memory first
-        if connection_id in self.__audio_buffers:
-            return self.__audio_buffers[connection_id].getvalue()
+        # Try to get from memory (or the mmap-ed file of a spilled buffer) first
+        buffer = self.__buffers.get(connection_id)
+        if buffer is not None:
+            return buffer.getvalue()
         
         # If not in memory, try to get from Redis
         redis_key = f"{AUDIO_BUFFER}:{connection_id}"
-        hex_encoded_buffer = await self.__redis_client.get(redis_key)
-        
-        if hex_encoded_buffer:
-            try:
-                # Convert hex string back to binary
-                # This works with decode_responses=True by converting hex string representation back to bytes
-                buffer_data = bytes.fromhex(hex_encoded_buffer)
-                return buffer_data
-            except ValueError as e:
-                logger.error(f"Error loading audio buffer from Redis: {e}")
-                return None
-        
-        return None
+        buffer_data = await self.__audio_redis_client.get(redis_key)
+        return decode_audio_buffer(buffer_data) if buffer_data else None
     
     async def flush_inactive_connections(self):
         """Flush inactive connections to disk and remove them from memory."""
-        current_time = datetime.now(timezone.utc)
-        connections_to_flush = []
-        
-        # Identify inactive connections
-        for connection_id, last_updated in self.__buffer_last_updated.items():
-            time_since_update = (current_time - last_updated).total_seconds()
-            if time_since_update > self.__inactive_timeout:
-                connections_to_flush.append(connection_id)
-        
+        # Inactive connections come from the heap of last updates, not a scan of all buffers
+        connections_to_flush = self.__buffers.pop_inactive()
+
         if not connections_to_flush:
             return
             
         logger.info(f"Flushing {len(connections_to_flush)} inactive connections to disk")
         
-        # Flush each inactive connection
+        # Flush each inactive connection, after a batch of it still being processed
         for connection_id in connections_to_flush:
-            await self.flush_connection_to_disk(connection_id)
+            async with _lock(self.__connection_locks, connection_id):
+                await self.flush_connection_to_disk(connection_id)
     
     async def flush_connection_to_disk(self, connection_id: str) -> bool:
         """Flush a connection's audio buffer to disk and remove from memory.
@@ -296,29 +467,23 @@ class Processor:
         Returns:
             True if successful, False otherwise
         """
-        if connection_id not in self.__audio_buffers:
+        if connection_id not in self.__buffers:
             return False
-            
+        buffer = self.__buffers.get(connection_id)
+        if buffer is not None and not len(buffer):
+            return False
+
         try:
-            # Get the buffer data
-            buffer_data = self.__audio_buffers[connection_id].getvalue()
-            if not buffer_data:
-                return False
-                
-            # Ensure directory exists
-            output_dir = "/data/audio"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Write to disk
-            file_path = os.path.join(output_dir, f"{connection_id}.webm")
-            with open(file_path, "wb") as f:
-                f.write(buffer_data)
-                
-            logger.info(f"Flushed buffer for connection {connection_id} to {file_path} ({len(buffer_data)} bytes)")
-            
-            # Remove from memory
-            del self.__audio_buffers[connection_id]
-            del self.__buffer_last_updated[connection_id]
+            # The file already holds the appended chunks, it is only made durable (or rewritten if out of sync)
+            # and the buffer is removed from memory
+            await self.__decoders.close(connection_id)
+            length = await self.__buffers.release(connection_id)
+
+            logger.info(f"Flushed buffer for connection {connection_id} to {self.__file_writer.path(connection_id)} ({length} bytes)")
+
+            # Unregister the connection unless new chunks arrived meanwhile, any process may take it up again
+            await AudioChunkDAL(self.__audio_redis_client).remove_connection_if_drained(connection_id)
+            await self.__leases.release(connection_id)
             
             # We keep the Redis entries with their TTL to serve as a backup
             # but we could also delete them to save Redis memory:
@@ -332,6 +497,24 @@ class Processor:
             logger.error(f"Error flushing connection {connection_id} to disk: {e}")
             return False
     
+    async def shutdown(self) -> None:
+        """Hand the owned connections over to other processes: flush their buffers and release their leases."""
+        if self.__leases is None:
+            return
+
+        for connection_id in list(self.__leases.owned):
+            async with _lock(self.__connection_locks, connection_id):
+                if not await self.flush_connection_to_disk(connection_id):
+                    await self._discard_connection(connection_id)
+                    await self.__leases.release(connection_id)
+        await self.__decoders.close_all()
+        logger.info("Released all connections")
+
+    async def _discard_connection(self, connection_id: str) -> None:
+        """Forgets the buffer and the decoder of a connection processed by another process now."""
+        await self.__decoders.close(connection_id)
+        await self.__buffers.discard(connection_id)
+
     async def set_inactive_timeout(self, seconds: int):
         """Set the timeout for inactive connections before they're flushed to disk.
         
@@ -341,5 +524,21 @@ class Processor:
         if seconds < 10:  # Set a reasonable minimum
             seconds = 10
             
-        self.__inactive_timeout = seconds
-        logger.info(f"Inactive connection timeout set to {seconds} seconds")
\ No newline at end of file
+        self.__buffers.inactive_timeout = seconds
+        logger.info(f"Inactive connection timeout set to {seconds} seconds")
+
+
+def _lock(locks: "weakref.WeakValueDictionary[str, asyncio.Lock]", key: str) -> asyncio.Lock:
+    """Lock of ``key``, kept in ``locks`` only while in use."""
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+
+def _stream_id(entry_id) -> Tuple[int, int]:
+    """Orderable ``(ms, seq)`` of a stream entry id (``b"<ms>-<seq>"``)."""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
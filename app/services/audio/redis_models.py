@@ -1,5 +1,7 @@
+import asyncio
 import json
 import logging
+import random
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Literal, Optional, Union, Tuple, NamedTuple
@@ -7,14 +9,19 @@ from typing import List, Literal, Optional, Union, Tuple, NamedTuple
 from dateutil import parser
 from dateutil.tz import UTC
 from redis.asyncio.client import Redis
+from redis.exceptions import WatchError
 import pandas as pd
 
 from app.redis_transcribe.keys  import SEGMENTS_TRANSCRIBE
+from shared_lib.redis.dals.base import BaseDAL
 from shared_lib.redis.models import TranscriptSegmentModel
 from app.services.api.engine_client import EngineAPIClient
 
 logger = logging.getLogger(__name__)
 
+MEETING_UPDATE_ATTEMPTS = 8  # transactions tried by ``Meeting.add_segment`` before giving up
+MEETING_UPDATE_BACKOFF_SEC = 0.01  # base of the randomized exponential backoff between them
+
 
 @dataclass
 class Data:
@@ -26,6 +33,10 @@ class Data:
         data = json.dumps(self.data, default=str)
         await self.redis_client.lpush(self.key, data)
 
+    async def lpush_many(self, items: List) -> None:
+        """Pushes every item as an entry of its own with a single LPUSH."""
+        await BaseDAL(self.redis_client).lpush_many(self.key, items)
+
     async def rpop(self):
         data = await self.redis_client.rpop(self.key)
         if data:
@@ -157,12 +168,14 @@ class Connection:
         self.end_timestamp = None
 
     async def update_redis(self):
-        if self.start_timestamp is not None:
-            await self.redis.hset(self.type_, "start_timestamp", self.start_timestamp.isoformat())
-        if self.end_timestamp is not None:
-            await self.redis.hset(self.type_, "end_timestamp", self.end_timestamp.isoformat())
-        if self.user_id is not None:
-            await self.redis.hset(self.type_, "user_id", self.user_id)
+        mapping = {
+            "start_timestamp": self.start_timestamp.isoformat() if self.start_timestamp is not None else None,
+            "end_timestamp": self.end_timestamp.isoformat() if self.end_timestamp is not None else None,
+            "user_id": self.user_id,
+        }
+        mapping = {field: value for field, value in mapping.items() if value is not None}
+        if mapping:
+            await self.redis.hset(self.type_, mapping=mapping)
 
     async def load_from_redis(self):
         data = await self.redis.hgetall(self.type_)
@@ -175,10 +188,22 @@ class Connection:
         await self.redis.delete(self.type_)
 
     async def update_timestamps(self, segment_start_timestamp, end_timestamp):
-        await self.load_from_redis()
-        self.start_timestamp = segment_start_timestamp if not self.start_timestamp else self.start_timestamp
+        """Extends the connection to ``end_timestamp``, its start is set only by its first segment.
+
+        The hash is updated in one transaction, without reading it first.
+        """
+        mapping = {"end_timestamp": end_timestamp.isoformat()}
+        if self.user_id is not None:
+            mapping["user_id"] = self.user_id
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(self.type_, "start_timestamp", segment_start_timestamp.isoformat())
+            pipe.hset(self.type_, mapping=mapping)
+            pipe.hget(self.type_, "start_timestamp")
+            *_, start_timestamp = await pipe.execute()
+
+        self.start_timestamp = parser.parse(start_timestamp).astimezone(UTC)
         self.end_timestamp = end_timestamp
-        await self.update_redis()
 
 
 class Meeting:
@@ -200,11 +225,7 @@ class Meeting:
             "transcriber_seek_timestamp",
             "transcriber_last_updated_timestamp",
         ]
-
-    async def _update_field(self, field_name: str, value: Optional[datetime]):
-        # update redis only if not none
-        if value is not None:
-            await self.redis.hset(self.metadata_type_, field_name, value.isoformat())
+        self._stored: dict = {}  # fields as last loaded from (or written to) Redis, only changed fields are written
 
     async def _load_field(self, data: dict, field_name: str, default_value: Optional[datetime] = None):
         value = data.get(field_name)
@@ -214,17 +235,93 @@ class Meeting:
         setattr(self, field_name, set_value)
 
     async def update_redis(self):
+        """Writes the timestamps changed since they were loaded (not None) with a single HSET.
+
+        Fields left untouched are not written back, so fields updated meanwhile by other processes (e.g. the
+        transcriber's seek) are not overwritten with stale values.
+        """
+        mapping = {}
         for t in self.timestamps:
-            await self._update_field(t, getattr(self, t))
+            value = getattr(self, t)
+            if value is not None and value.isoformat() != self._stored.get(t):
+                mapping[t] = value.isoformat()
+
+        if mapping:
+            await self.redis.hset(self.metadata_type_, mapping=mapping)
+            self._stored.update(mapping)
 
     async def load_from_redis(self):
         data = await self.redis.hgetall(self.metadata_type_)
+        self._stored = {t: data.get(t) for t in self.timestamps}
         for t in self.timestamps:
             await self._load_field(data, t, self.start_timestamp)
 
     async def add_connection(self, connection_id):
         await self.redis.sadd(self.connections_type_, connection_id)
 
+    async def add_segment(
+        self,
+        connection_id: str,
+        segment_start_timestamp: datetime,
+        segment_start_server_timestamp: datetime,
+        transcriber: "Transcriber",
+        transcriber_step: int,
+        current_time: datetime,
+    ) -> bool:
+        """Records a new segment of a connection of the meeting and schedules the transcriber if it is due.
+
+        The metadata is read once and the changes are committed in one transaction, retried if the metadata changed
+        meanwhile (other processes handle other connections of the meeting, the transcriber moves its seek): the start
+        timestamps are set only if unset and the transcriber is scheduled at most once per ``transcriber_step``.
+        Conflicting retries back off and stop after ``MEETING_UPDATE_ATTEMPTS``.
+
+        Args:
+            connection_id: The connection of the segment
+            segment_start_timestamp: Start of the segment (user time)
+            segment_start_server_timestamp: Start of the segment (server time)
+            transcriber: Transcriber queue the meeting is added to
+            transcriber_step: Seconds between two transcriptions of the meeting
+            current_time: Time of the update
+
+        Returns:
+            True if the transcriber was scheduled
+
+        Raises:
+            WatchError: The metadata kept changing during every attempt.
+        """
+        fields = ["start_timestamp", "transcriber_last_updated_timestamp"]
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for attempt in range(1, MEETING_UPDATE_ATTEMPTS + 1):
+                try:
+                    await pipe.watch(self.metadata_type_)
+                    start_timestamp, last_updated = await pipe.hmget(self.metadata_type_, fields)
+                    start_timestamp = parser.parse(start_timestamp).astimezone(UTC) if start_timestamp else None
+                    last_updated = parser.parse(last_updated).astimezone(UTC) if last_updated else None
+                    last_updated = last_updated or start_timestamp or segment_start_timestamp
+                    transcriber_due = (current_time - last_updated).seconds > transcriber_step
+
+                    pipe.multi()
+                    pipe.sadd(self.connections_type_, connection_id)
+                    pipe.hsetnx(self.metadata_type_, "start_timestamp", segment_start_timestamp.isoformat())
+                    pipe.hsetnx(
+                        self.metadata_type_, "start_server_timestamp", segment_start_server_timestamp.isoformat()
+                    )
+                    if transcriber_due:
+                        pipe.hset(self.metadata_type_, "transcriber_last_updated_timestamp", current_time.isoformat())
+                        pipe.sadd(transcriber.todo_type_, self.meeting_id)
+                    await pipe.execute()
+
+                except WatchError:
+                    logger.info(f"Meeting {self.meeting_id} changed while adding a segment (attempt {attempt})")
+                    await asyncio.sleep(random.uniform(0, MEETING_UPDATE_BACKOFF_SEC * 2 ** (attempt - 1)))
+                    continue
+
+                self.start_timestamp = start_timestamp or segment_start_timestamp
+                self.transcriber_last_updated_timestamp = current_time if transcriber_due else last_updated
+                return transcriber_due
+
+        raise WatchError(f"Meeting {self.meeting_id} changed during all {MEETING_UPDATE_ATTEMPTS} attempts")
+
     async def delete_connection(self, connection_id):
         await self.redis.srem(self.connections_type_, connection_id)
 
@@ -0,0 +1,252 @@
+"""Time index of the audio files of connections (``/data/audio/{connection_id}.webm.index``).
+
+Notes:
+    MediaRecorder WebM has no cues, so ffmpeg can only seek in it by demuxing it from its start. The file is made of
+    an init header (EBML header, segment info, tracks) followed by clusters, each of them decodable on its own after
+    the header. ``AudioFileWriter`` scans the appended bytes for cluster starts (``ClusterScanner``) and indexes the
+    first cluster of every ``segment_sec`` segment: one ``<time_ms> <offset>`` line per segment, ``time_ms`` being
+    the timecode of the cluster.
+
+    The offset of the first entry is the length of the init header. A slice ``[start, start + duration)`` is read as
+    the header followed by the segments it overlaps (``read_segments``), so ffmpeg decodes a few seconds of audio
+    whatever the length of the file. The Redis buffer of a connection holds the same bytes as its file, so the same
+    ranges are read from it (``segment_range``).
+
+    Index lines are written before the length of the file that covers them is published, readers ignore entries past
+    the committed length (and a partially written last line).
+
+"""
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+INDEX_SUFFIX = ".index"
+
+# EBML element IDs (with their length markers)
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+CLUSTER = 0x1F43B675
+TIMECODE = 0xE7
+TIMECODE_SCALE = 0x2AD7B1
+MASTER_ELEMENTS = (SEGMENT, INFO, CLUSTER)  # descended into, their size may be unknown (live recordings)
+
+DEFAULT_TIMECODE_SCALE = 1_000_000  # ns per timecode unit
+READ_SIZE = 1024 * 1024
+
+
+def index_path(path: str) -> str:
+    return f"{path}{INDEX_SUFFIX}"
+
+
+class ClusterScanner:
+    """Finds the clusters of a WebM stream fed in arbitrary pieces, keeping only a few bytes between pieces."""
+
+    def __init__(self):
+        self.length = 0  # bytes fed
+        self.failed = False  # not a WebM stream the scanner can follow, no more clusters are reported
+        self.timecode_scale = DEFAULT_TIMECODE_SCALE
+        self._pending = b""  # start of an element header (or value) split between pieces
+        self._skip = 0  # bytes left of an element that is not parsed
+        self._cluster_offset: Optional[int] = None  # cluster whose timecode is not read yet
+
+    def feed(self, data: bytes) -> List[Tuple[int, int]]:
+        """Scans the next bytes of the stream.
+
+        Returns:
+            ``(time_ms, offset)`` of the clusters whose timecode is within the bytes fed so far
+        """
+        offset = self.length - len(self._pending)
+        self.length += len(data)
+        if self.failed:
+            return []
+
+        clusters = []
+        buffer, position = self._pending + data, 0
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(buffer) - position)
+                position += skipped
+                self._skip -= skipped
+                if self._skip:
+                    break
+
+            header = _read_element_header(buffer, position)
+            if header is None:
+                break
+            if header is False:
+                self.failed = True
+                break
+
+            element_id, size, header_length = header
+            if element_id in MASTER_ELEMENTS:
+                if element_id == CLUSTER:
+                    self._cluster_offset = offset + position
+                position += header_length
+
+            elif size is None:
+                self.failed = True  # only master elements can be of unknown size
+                break
+
+            elif element_id in (TIMECODE, TIMECODE_SCALE):
+                if len(buffer) - position < header_length + size:
+                    break
+                value = int.from_bytes(buffer[position + header_length:position + header_length + size], "big")
+                position += header_length + size
+                if element_id == TIMECODE_SCALE:
+                    self.timecode_scale = value
+                elif self._cluster_offset is not None:
+                    clusters.append((value * self.timecode_scale // 1_000_000, self._cluster_offset))
+                    self._cluster_offset = None
+
+            else:
+                position += header_length
+                self._skip = size
+
+        self._pending = buffer[position:]
+        return clusters
+
+
+class TimeIndexWriter:
+    """Maintains the index of one audio file (called from ``AudioFileWriter``, off the event loop)."""
+
+    def __init__(self, path: str, segment_sec: float):
+        self.path = path
+        self.segment_ms = segment_sec * 1000
+        self.scanner = ClusterScanner()
+        self._last_time_ms: Optional[int] = None
+
+    @property
+    def length(self) -> int:
+        """Bytes of the audio file indexed so far."""
+        return self.scanner.length
+
+    def append(self, data: bytes) -> None:
+        lines = self._entries(data)
+        if lines:
+            with open(index_path(self.path), "a") as file:
+                file.write(lines)
+
+    def rebuild(self, length: int) -> None:
+        """Indexes the first ``length`` bytes of the audio file from scratch."""
+        self.scanner = ClusterScanner()
+        self._last_time_ms = None
+
+        lines = []
+        with open(self.path, "rb") as file:
+            while self.scanner.length < length:
+                data = file.read(min(READ_SIZE, length - self.scanner.length))
+                if not data:
+                    break
+                lines.append(self._entries(data))
+
+        tmp_path = f"{index_path(self.path)}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write("".join(lines))
+        os.replace(tmp_path, index_path(self.path))
+
+    def _entries(self, data: bytes) -> str:
+        lines = []
+        for time_ms, offset in self.scanner.feed(data):
+            if self._last_time_ms is None or time_ms - self._last_time_ms >= self.segment_ms:
+                lines.append(f"{time_ms} {offset}\n")
+                self._last_time_ms = time_ms
+        return "".join(lines)
+
+
+def read_index(path: str, committed_length: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Returns the ``(time_ms, offset)`` entries of the audio file, up to its committed length if given."""
+    try:
+        with open(index_path(path)) as file:
+            content = file.read()
+    except OSError:
+        return []
+
+    entries = []
+    for line in content.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break  # being written
+        time_ms, offset = map(int, line.split())
+        if committed_length is not None and offset >= committed_length:
+            break
+        entries.append((time_ms, offset))
+    return entries
+
+
+class SegmentRange(NamedTuple):
+    header_length: int  # bytes of the init header, at the start of the audio
+    begin: int  # offset of the first segment of the slice
+    end: Optional[int]  # offset after its last segment, None if the slice extends to the end of the audio
+    start: float  # time in seconds (from the start of the audio) of the first segment
+
+
+def segment_range(entries: List[Tuple[int, int]], start: float, duration: float) -> Optional[SegmentRange]:
+    """Returns the bytes of the indexed audio to decode for ``[start, start + duration)`` (seconds), None if the
+    audio is not indexed."""
+    if not entries:
+        return None
+
+    first_ms, header_length = entries[0]
+    start_ms, end_ms = first_ms + start * 1000, first_ms + (start + duration) * 1000
+    begin_ms, begin = max((entry for entry in entries if entry[0] <= start_ms), default=entries[0])
+    end = next((offset for time_ms, offset in entries if time_ms >= end_ms), None)
+    return SegmentRange(header_length, begin, end, (begin_ms - first_ms) / 1000)
+
+
+def read_segments(path: str, start: float, duration: float, committed_length: int) -> Optional[Tuple[bytes, float]]:
+    """Reads the init header and the segments of the audio file overlapping ``[start, start + duration)``.
+
+    Args:
+        path: Path of the audio file
+        start: Start of the slice in seconds from the start of the file
+        duration: Duration of the slice in seconds
+        committed_length: Readable length of the audio file
+
+    Returns:
+        WebM bytes and the time in seconds (from the start of the file) they start at, or None if the file is not
+        indexed
+    """
+    segments = segment_range(read_index(path, committed_length), start, duration)
+    if segments is None:
+        return None
+
+    end = committed_length if segments.end is None else segments.end
+    with open(path, "rb") as file:
+        header = os.pread(file.fileno(), segments.header_length, 0)
+        data = os.pread(file.fileno(), end - segments.begin, segments.begin)
+
+    return header + data, segments.start
+
+
+def _read_element_header(buffer: bytes, position: int):
+    """Reads the ID and size of the EBML element at ``position``.
+
+    Returns:
+        ``(id, size or None if unknown, header length)``, None if the header is incomplete, False if it is invalid
+    """
+    id_length = _vint_length(buffer, position, max_length=4)
+    if not id_length:
+        return id_length
+    size_length = _vint_length(buffer, position + id_length, max_length=8)
+    if not size_length:
+        return size_length
+
+    element_id = int.from_bytes(buffer[position:position + id_length], "big")
+    size_bytes = buffer[position + id_length:position + id_length + size_length]
+    size = int.from_bytes(size_bytes, "big") & ((1 << (7 * size_length)) - 1)
+    if size == (1 << (7 * size_length)) - 1:
+        size = None
+    return element_id, size, id_length + size_length
+
+
+def _vint_length(buffer: bytes, position: int, max_length: int):
+    if position >= len(buffer):
+        return None
+    first = buffer[position]
+    if not first:
+        return False
+    length = 9 - first.bit_length()
+    if length > max_length:
+        return False
+    if position + length > len(buffer):
+        return None
+    return length
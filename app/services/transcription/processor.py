@@ -13,7 +13,10 @@ import tiktoken
 from redis.asyncio.client import Redis
 
 from app.redis_transcribe import keys
-from app.services.audio.audio import AudioFileCorruptedError, AudioSlicer
+from app.services.audio.audio import UPLOAD_FORMATS, AudioFileCorruptedError, AudioSlicer
+from app.services.audio.decoded_cache import DecodedAudioCache
+from app.services.audio.decoder import DecodeError
+from app.services.audio.file_writer import read_committed_length
 from app.services.audio.redis_models import (
     Meeting,
     Transcriber,
@@ -57,8 +60,16 @@ class Processor:
     
     engine_api_token: str = field(default_factory=lambda: os.getenv("ENGINE_API_TOKEN"))
     max_length: int = field(default=30)
+    audio_redis_client: Optional[Redis] = None  # binary-safe client (decode_responses=False) for audio buffers
+    # Format of the audio uploaded to the Whisper service, one of UPLOAD_FORMATS
+    upload_format: str = field(default_factory=lambda: os.getenv("WHISPER_UPLOAD_FORMAT", "wav"))
+    # Decoded audio kept between iterations, in MB
+    decode_cache_mb: int = field(default_factory=lambda: int(os.getenv("AUDIO_DECODE_CACHE_MB", "64")))
 
     def __post_init__(self):
+        if self.upload_format not in UPLOAD_FORMATS:
+            raise ValueError(f"Unknown upload format {self.upload_format!r}, expected one of {list(UPLOAD_FORMATS)}")
+
         self.processor = Transcriber(self.redis_client)
         self.matcher = None
         self.slice_duration = 0
@@ -72,6 +83,7 @@ class Processor:
         )
         self.queue_manager = TranscriptQueueManager(self.redis_client)
         self._failed_ingestions = {}
+        self.decoded_cache = DecodedAudioCache(self.decode_cache_mb * 1024 * 1024)
 
     def should_alert_for_failures(self, meeting_id: str) -> bool:
         """
@@ -127,18 +139,27 @@ class Processor:
             seek = (self.seek_timestamp - self.connection.start_timestamp).total_seconds()
             self.logger.info(f"seek: {seek}")
             
-            # First try to read from file system since it's more reliable
+            # Audio decoded by parse_stream is read by time, the encoded audio is decoded only without it
+            try:
+                self.audio_slicer = await AudioSlicer.from_pcm_slice(
+                    f"/data/audio/{self.connection.id}.pcm", seek, self.max_length
+                )
+                if self.audio_slicer:
+                    self.slice_duration = self.audio_slicer.audio.duration_seconds
+                    self.audio_data = await self.audio_slicer.export_data(format=self.upload_format)
+                    self.logger.info(f"Successfully read decoded audio, duration: {self.slice_duration}s")
+                    return True
+            except Exception as e:
+                self.logger.error(f"Failed to read decoded audio: {e}")
+
+            # Then try to read from file system since it's more reliable
             file_path = f"/data/audio/{self.connection.id}.webm"
             if os.path.exists(file_path):
                 try:
                     self.logger.info(f"Reading audio from file system: {file_path}")
-                    self.audio_slicer = await AudioSlicer.from_ffmpeg_slice(
-                        file_path,
-                        seek,
-                        self.max_length
-                    )
+                    self.audio_slicer = await self._read_file_slice(file_path, seek)
                     self.slice_duration = self.audio_slicer.audio.duration_seconds
-                    self.audio_data = await self.audio_slicer.export_data()
+                    self.audio_data = await self.audio_slicer.export_data(format=self.upload_format)
                     self.logger.info(f"Successfully read audio from file, duration: {self.slice_duration}s")
                     return True
                 except Exception as e:
@@ -149,13 +170,14 @@ class Processor:
             try:
                 self.logger.info(f"Attempting to read audio from Redis for connection {self.connection.id}")
                 self.audio_slicer = await AudioSlicer.from_redis_slice(
-                    self.redis_client, 
+                    self.audio_redis_client,
                     self.connection.id, 
                     seek, 
-                    self.max_length
+                    self.max_length,
+                    path=f"/data/audio/{self.connection.id}.webm",
                 )
                 self.slice_duration = self.audio_slicer.audio.duration_seconds
-                self.audio_data = await self.audio_slicer.export_data()
+                self.audio_data = await self.audio_slicer.export_data(format=self.upload_format)
                 self.logger.info(f"Successfully read audio from Redis, duration: {self.slice_duration}s")
                 return True
             
@@ -169,7 +191,7 @@ class Processor:
                 try:
                     self.audio_slicer = await AudioSlicer.from_ffmpeg_slice(path, seek, self.max_length)
                     self.slice_duration = self.audio_slicer.audio.duration_seconds
-                    self.audio_data = await self.audio_slicer.export_data()
+                    self.audio_data = await self.audio_slicer.export_data(format=self.upload_format)
                     self.logger.info(f"Successfully read audio from file system, duration: {self.slice_duration}s")
                     return True
 
@@ -209,13 +231,9 @@ class Processor:
             self.logger.info(f"Processed and matched {len(matched_segments)} segments with speakers")
 
 
-            for segment in matched_segments:
-                transcription = TranscriptStore(
-                    self.meeting.meeting_id,
-                    self.redis_client,
-                    segment.to_dict()
-                )
-                await transcription.lpush()
+            # All matched segments in one round-trip
+            transcription = TranscriptStore(self.meeting.meeting_id, self.redis_client)
+            await transcription.lpush_many([segment.to_dict() for segment in matched_segments])
 
             self.done = True
         except Exception as e:
@@ -223,6 +241,19 @@ class Processor:
             self.done = False
             raise
 
+    async def _read_file_slice(self, path: str, seek: float) -> AudioSlicer:
+        """Reads the window from the connection's audio file, decoding only the audio not decoded by earlier reads."""
+        committed_length = read_committed_length(path) or os.path.getsize(path)
+
+        async def decode(start, duration):
+            return (await AudioSlicer.from_ffmpeg_slice(path, start, duration)).audio.raw_data
+
+        pcm = await self.decoded_cache.read(self.connection.id, committed_length, seek, self.max_length, decode)
+        self.logger.info(f"Decoded audio cache: {self.decoded_cache.stats()}")
+        if not pcm:
+            raise DecodeError(f"No audio after {seek}s in {path}")
+        return AudioSlicer.from_pcm(pcm)
+
     async def _perform_audio_transcription(self, transcription_model=None):
         """Perform actual audio transcription using either direct model or whisper service and update transcription history"""
         # Get previous transcription history if available
@@ -255,10 +286,11 @@ class Processor:
     async def _call_whisper_service(self, last_transcripts):
         """Call the whisper service to get transcription"""
         request_data = aiohttp.FormData()
+        filename, content_type = UPLOAD_FORMATS[self.upload_format]
         request_data.add_field('audio_data', 
                               self.audio_data, 
-                              filename='audio.wav',
-                              content_type='audio/wav')
+                              filename=filename,
+                              content_type=content_type)
         
         if last_transcripts:
             request_data.add_field('prefix', last_transcripts)
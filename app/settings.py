@@ -26,6 +26,15 @@ class Settings(BaseSettings):
     redis_password: str | None = os.getenv('REDIS_PASSWORD')
     transcriber_step_sec: int = int(os.getenv('TRANSCRIBER_STEP_SEC', '1'))
     max_audio_length_sec: int = int(os.getenv('MAX_AUDIO_LENGTH_SEC', '5'))
+    audio_stream_claim_idle_ms: int = int(os.getenv('AUDIO_STREAM_CLAIM_IDLE_MS', '30000'))
+    audio_fsync_policy: str = os.getenv('AUDIO_FSYNC_POLICY', 'interval')  # always | interval | never
+    audio_fsync_interval_sec: float = float(os.getenv('AUDIO_FSYNC_INTERVAL_SEC', '5'))
+    audio_buffer_memory_budget_mb: int = int(os.getenv('AUDIO_BUFFER_MEMORY_BUDGET_MB', '512'))
+    audio_lease_ttl_ms: int = int(os.getenv('AUDIO_LEASE_TTL_MS', '10000'))
+    audio_index_segment_sec: float = float(os.getenv('AUDIO_INDEX_SEGMENT_SEC', '5'))
+    audio_decoder_pool_size: int = int(os.getenv('AUDIO_DECODER_POOL_SIZE', '4'))
+    audio_decoder_timeout_sec: float = float(os.getenv('AUDIO_DECODER_TIMEOUT_SEC', '30'))
+    audio_pcm_decode: bool = os.getenv('AUDIO_PCM_DECODE', 'true').lower() in ('1', 'true', 'yes')  # PCM store for the transcriber
     
     speaker_delay_sec: int = 1
 
@@ -2,30 +2,48 @@ import logging
 import asyncio
 from aiomisc import entrypoint
 
-from aiomisc.service.periodic import PeriodicService
+from aiomisc.service import Service
 
 from app.services.audio.processor import Processor
 
 logger = logging.getLogger(__name__)
 
 
-class ProcessConnectionTask(PeriodicService):
+class ProcessConnectionTask(Service):
+    """Processes connections as soon as they have new audio chunks.
+
+    Every tick blocks on the ready set of connections for up to ``interval`` seconds, so new chunks are picked up
+    within milliseconds and inactive connections are still flushed when no chunk arrives.
+    """
+
+    interval: float = 1
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.__processor = Processor()
 
+    async def start(self):
+        self.start_event.set()
+        while True:
+            await self.callback()
+
+    async def stop(self, exception: Exception = None):
+        # Connections are taken over by the other parse_stream processes right away instead of after their lease TTL
+        await self.__processor.shutdown()
+
     async def callback(self):
         try:
-            await self.__processor.process_connections()
+            await self.__processor.process_connections(wait_sec=self.interval)
         except Exception as ex:
             logger.exception(ex)
+            await asyncio.sleep(self.interval)
 
 
 if __name__ == "__main__":
     # Set up logging
     logging.basicConfig(level=logging.INFO)
     
-    # Create the service with a desired interval (e.g., 1 second)
+    # Create the service with the longest wait for new chunks (e.g., 1 second)
     service = ProcessConnectionTask(interval=1)
     
     # Run the service using aiomisc entrypoint
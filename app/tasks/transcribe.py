@@ -18,8 +18,13 @@ async def main():
 
     try:
         redis_client = await get_redis_client(settings.redis_host, settings.redis_port,settings.redis_password)
+        audio_redis_client = await get_redis_client(
+            settings.redis_host, settings.redis_port, settings.redis_password, decode_responses=False
+        )
 
-        processor = Processor(redis_client, logger, max_length=settings.max_audio_length_sec)
+        processor = Processor(
+            redis_client, logger, max_length=settings.max_audio_length_sec, audio_redis_client=audio_redis_client
+        )
         while True:
             try:
                 ok = await processor.read()
@@ -0,0 +1,54 @@
+import pytest
+from redis.asyncio.client import Pipeline, Redis
+
+from shared_lib.redis.models import AudioChunkEnvelope
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def binary_redis():
+    """Client of raw audio keys and streams (``decode_responses=False``)."""
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeAsyncRedis(decode_responses=False)
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    """Counts commands sent on their own (watched pipelines included) and pipelines executed."""
+    counter = {"round_trips": 0}
+    execute_command, execute_pipeline = Redis.execute_command, Pipeline.execute
+    immediate_execute_command = Pipeline.immediate_execute_command
+
+    async def counted(method, *args, **kwargs):
+        counter["round_trips"] += 1
+        return await method(*args, **kwargs)
+
+    monkeypatch.setattr(Redis, "execute_command", lambda *a, **kw: counted(execute_command, *a, **kw))
+    monkeypatch.setattr(Pipeline, "execute", lambda *a, **kw: counted(execute_pipeline, *a, **kw))
+    monkeypatch.setattr(
+        Pipeline, "immediate_execute_command", lambda *a, **kw: counted(immediate_execute_command, *a, **kw)
+    )
+    return counter
+
+
+def audio_chunk(i: int, chunk: bytes = b"\x00", meeting_id: str = "test-meeting", user_id: str = "test-user"):
+    return AudioChunkEnvelope(
+        chunk=chunk,
+        user_id=user_id,
+        meeting_id=meeting_id,
+        audio_chunk_number=i,
+        user_timestamp_ms=1710343962000 + i * 1000,
+        server_timestamp_ms=1710343962500 + i * 1000,
+        audio_chunk_duration_ms=1000,
+    )
+
+
+@pytest.fixture
+def make_chunk():
+    """Factory of the ``i``-th audio chunk of a connection (one second each)."""
+    return audio_chunk
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import patch
+from uuid import uuid4
+
+from streamqueue.settings import settings
+from services.admission import AdmissionControl
+from services.utils.exceptions import IngestOverloadedError
+from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
+
+
+@pytest.mark.asyncio
+async def test_connection_queue_limit(binary_redis, make_chunk):
+    await AudioChunkDAL(binary_redis).add_chunks("conn", [make_chunk(i) for i in range(3)])
+    admission = AdmissionControl(binary_redis)
+
+    with patch.object(settings, "admission_max_connection_queue", 4):
+        await admission.check_audio(uuid4(), "conn")
+        await admission.check_audio(uuid4(), "other-conn", chunks=4)
+
+        with pytest.raises(IngestOverloadedError) as error:
+            await admission.check_audio(uuid4(), "conn", chunks=2)
+
+    assert error.value.reason == "connection queue is full"
+    assert error.value.retry_after_sec == settings.admission_retry_after_sec
+    assert error.value.suggested_chunk_interval_sec == 2 * settings.audio_chunk_duration_sec
+
+
+@pytest.mark.asyncio
+async def test_backlog_follows_acks(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunks("conn-1", [make_chunk(i) for i in range(2)])
+    await dal.add_chunks("conn-2", [make_chunk(i) for i in range(2)])
+    admission = AdmissionControl(binary_redis)
+
+    with patch.object(settings, "admission_max_backlog", 4):
+        with pytest.raises(IngestOverloadedError, match="backlog"):
+            await admission.check_audio(uuid4(), "conn-3")
+
+        entries = await dal.read_chunks("conn-1", "worker")
+        await dal.ack_chunks("conn-1", [entry_id for entry_id, _ in entries])
+        await dal.ack_chunks("conn-1", [entry_id for entry_id, _ in entries])  # acked twice: counted once
+
+        await admission.check_audio(uuid4(), "conn-3", chunks=2)
+
+
+@pytest.mark.asyncio
+async def test_user_rate_limit(binary_redis):
+    admission = AdmissionControl(binary_redis)
+    user_id = uuid4()
+
+    with patch.object(settings, "admission_max_user_chunks", 3):
+        for _ in range(3):
+            await admission.check_audio(user_id, "conn")
+        await admission.check_audio(uuid4(), "conn")
+
+        with pytest.raises(IngestOverloadedError, match="rate") as error:
+            await admission.check_audio(user_id, "conn")
+
+    assert 0 < error.value.retry_after_sec <= settings.admission_rate_window_sec
+
+
+@pytest.mark.asyncio
+async def test_refused_chunks_do_not_count_toward_user_rate(binary_redis, make_chunk):
+    await AudioChunkDAL(binary_redis).add_chunks("full-conn", [make_chunk(i) for i in range(3)])
+    admission = AdmissionControl(binary_redis)
+    user_id = uuid4()
+
+    with patch.object(settings, "admission_max_user_chunks", 3), patch.object(
+        settings, "admission_max_connection_queue", 3
+    ):
+        for _ in range(3):
+            with pytest.raises(IngestOverloadedError, match="connection queue"):
+                await admission.check_audio(user_id, "full-conn")
+        await admission.check_audio(user_id, "conn", chunks=3)
+
+        with pytest.raises(IngestOverloadedError, match="rate"):
+            await admission.check_audio(user_id, "conn")
@@ -0,0 +1,72 @@
+import pytest
+
+from app.services.audio.buffer_manager import AudioBuffer
+from app.services.audio.lease import ConnectionLeases
+from app.services.audio.processor import Processor
+from shared_lib.redis.keys import AUDIO_BUFFER, AUDIO_BUFFER_LAST_UPDATED
+
+
+@pytest.fixture
+def leases(binary_redis):
+    return ConnectionLeases(binary_redis, "worker", 10000)
+
+
+@pytest.fixture
+def processor(binary_redis, leases, tmp_path):
+    return Processor(binary_redis, binary_redis, leases, output_dir=str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_only_new_bytes_are_appended(processor, leases, binary_redis):
+    await leases.acquire("conn")
+    buffer = AudioBuffer("/data/audio/conn.webm")
+
+    for data in (b"\x1aE\xdf\xa3header", b"cluster-1", b"cluster-2"):
+        buffer.write(data)
+        assert await processor._append_audio_buffer("conn", data, buffer, b"1-0") == len(buffer.getvalue())
+
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == buffer.getvalue()
+    assert await binary_redis.ttl(f"{AUDIO_BUFFER}:conn") > 0
+
+
+@pytest.mark.asyncio
+async def test_out_of_sync_buffer_is_rewritten(processor, leases, binary_redis):
+    await leases.acquire("conn")
+    buffer = AudioBuffer("/data/audio/conn.webm", b"\x1aE\xdf\xa3header")
+
+    # The Redis copy expired: appending alone would lose the header
+    buffer.write(b"cluster-1")
+    await processor._append_audio_buffer("conn", b"cluster-1", buffer, b"2-0")
+
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == b"\x1aE\xdf\xa3headercluster-1"
+
+
+@pytest.mark.asyncio
+async def test_startup_indexes_buffers_without_loading_them(processor, binary_redis):
+    await binary_redis.set(f"{AUDIO_BUFFER}:conn", b"\x1aE\xdf\xa3header".hex())
+    await binary_redis.set(f"{AUDIO_BUFFER_LAST_UPDATED}:conn", "2024-01-01T00:00:00+00:00")
+
+    await processor.setup()
+    assert processor.buffer_stats()["pending"] == 1 and processor.buffer_stats()["memory_bytes"] == 0
+
+    # Loaded (and the legacy hex buffer stored raw) when the connection receives chunks again
+    await processor._restore_audio_buffer("conn")
+    assert processor.buffer_stats()["pending"] == 0 and processor.buffer_stats()["in_memory"] == 1
+    assert await processor.get_audio_buffer("conn") == b"\x1aE\xdf\xa3header"
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == b"\x1aE\xdf\xa3header"
+
+
+@pytest.mark.asyncio
+async def test_append_is_fenced_by_lease(processor, leases, binary_redis):
+    await leases.acquire("conn")
+    buffer = AudioBuffer("/data/audio/conn.webm", b"\x1aE\xdf\xa3header")
+    await processor._append_audio_buffer("conn", b"\x1aE\xdf\xa3header", buffer, b"1-0")
+
+    # Another process took the connection over after the lease expired
+    await binary_redis.set(ConnectionLeases.key("conn"), "other-process")
+    buffer.write(b"cluster-1")
+
+    assert await processor._append_audio_buffer("conn", b"cluster-1", buffer, b"2-0") is None
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == b"\x1aE\xdf\xa3header"
+    assert not leases.owns("conn")
+
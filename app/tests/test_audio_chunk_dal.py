@@ -0,0 +1,116 @@
+import json
+import pytest
+from uuid import uuid4
+
+from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
+from shared_lib.redis.keys import INITIAL_FEED_AUDIO, INITIAL_FEED_AUDIO_CONNECTIONS
+from shared_lib.redis.models import AudioChunkEnvelope
+
+
+@pytest.mark.asyncio
+async def test_chunk_bytes_stored_raw(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    chunk = b"\x1aE\xdf\xa3\x00\xff" * 10
+
+    await dal.add_chunk("conn", make_chunk(0, chunk))
+
+    # Raw bytes, no hex/JSON inflation; metadata lives in its own packed field
+    [(_, fields)] = await binary_redis.xrange(f"{INITIAL_FEED_AUDIO}:conn")
+    assert fields[b"chunk"] == chunk
+    assert b"test-meeting" in fields[b"env"]
+    assert chunk not in fields[b"env"]
+    assert await dal.get_chunks_connections() == ["conn"]
+
+
+def test_envelope_round_trip(make_chunk):
+    chunk = make_chunk(7, b"\x01\x02")
+    decoded = AudioChunkEnvelope.decode(chunk.chunk, chunk.encode_meta())
+
+    assert decoded == chunk
+    assert decoded.user_datetime.isoformat() == "2024-03-13T15:32:49+00:00"
+    assert AudioChunkEnvelope.decode(b"", make_chunk(0, b"", meeting_id=None).encode_meta()).meeting_id is None
+
+    with pytest.raises(ValueError):
+        AudioChunkEnvelope.decode(b"", b"\x02" + chunk.encode_meta()[1:])
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_entries_are_read(binary_redis):
+    dal = AudioChunkDAL(binary_redis)
+    user_id = str(uuid4())
+    meta = {
+        "user_timestamp": "2024-03-13T15:32:42+00:00",
+        "server_timestamp": "2024-03-13T15:32:43+00:00",
+        "meeting_id": "test-meeting",
+        "user_id": user_id,
+        "audio_chunk_duration_sec": 1.0,
+        "audio_chunk_number": 3,
+    }
+    await binary_redis.xadd(f"{INITIAL_FEED_AUDIO}:conn", {"chunk": b"\x00", "meta": json.dumps(meta)})
+    await binary_redis.xadd(f"{INITIAL_FEED_AUDIO}:conn", {"chunk": b"\x00", "env": b"garbage"})
+
+    [(_, chunk)] = await dal.read_chunks("conn", "worker-1")
+    assert chunk.user_timestamp_ms == 1710343962000
+    assert chunk.user_id == user_id
+    assert chunk.audio_chunk_number == 3
+
+    # The malformed entry is dropped instead of being redelivered forever
+    assert await binary_redis.xlen(f"{INITIAL_FEED_AUDIO}:conn") == 1
+
+
+@pytest.mark.asyncio
+async def test_read_chunks_in_order_and_ack_deletes(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunks("conn", [make_chunk(i, bytes([i]) * 4) for i in range(5)])
+
+    entries = await dal.read_chunks("conn", "worker-1", limit=3)
+    assert [c.audio_chunk_number for _, c in entries] == [0, 1, 2]
+    assert [c.chunk for _, c in entries] == [bytes([i]) * 4 for i in range(3)]
+
+    await dal.ack_chunks("conn", [entry_id for entry_id, _ in entries])
+    assert await binary_redis.xlen(f"{INITIAL_FEED_AUDIO}:conn") == 2
+
+    rest = await dal.read_chunks("conn", "worker-1", limit=100)
+    assert [c.audio_chunk_number for _, c in rest] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_unacked_chunks_are_reclaimed(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunks("conn", [make_chunk(i, bytes([i])) for i in range(2)])
+
+    # worker-1 reads and crashes before acknowledging
+    assert len(await dal.read_chunks("conn", "worker-1")) == 2
+
+    assert await dal.read_chunks("conn", "worker-2", claim_min_idle_ms=60000) == []
+    reclaimed = await dal.read_chunks("conn", "worker-2", claim_min_idle_ms=0)
+    assert [c.audio_chunk_number for _, c in reclaimed] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_remove_connection_if_drained(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunk("conn", make_chunk(0, b"\x00"))
+
+    entries = await dal.read_chunks("conn", "worker-1")
+    assert await dal.remove_connection_if_drained("conn") is False
+
+    await dal.ack_chunks("conn", [entry_id for entry_id, _ in entries])
+    assert await dal.remove_connection_if_drained("conn") is True
+    assert not await binary_redis.exists(f"{INITIAL_FEED_AUDIO}:conn")
+    assert await binary_redis.smembers(INITIAL_FEED_AUDIO_CONNECTIONS) == set()
+
+
+@pytest.mark.asyncio
+async def test_ingest_marks_connection_ready(binary_redis, make_chunk):
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunks("conn-1", [make_chunk(0, b"a"), make_chunk(1, b"b")])
+    await dal.add_chunk("conn-2", make_chunk(0, b"c"))
+    await dal.add_chunk("conn-1", make_chunk(2, b"d"))
+
+    # Marked once per connection until popped, oldest first
+    assert await dal.wait_ready_connections(timeout_sec=0.1) == ["conn-1", "conn-2"]
+    assert await dal.wait_ready_connections(timeout_sec=0.1) == []
+
+    await dal.mark_ready("conn-1")
+    assert await dal.wait_ready_connections(timeout_sec=0.1, limit=1) == ["conn-1"]
@@ -0,0 +1,54 @@
+import os
+import pytest
+
+from app.services.audio.buffer_manager import AudioBuffer
+from app.services.audio.file_writer import AudioFileWriter, read_committed_length
+
+
+def append_to(buffer, data):
+    buffer.write(data)
+    return data
+
+
+@pytest.mark.asyncio
+async def test_appends_and_publishes_committed_length(tmp_path):
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="always")
+    buffer = AudioBuffer(writer.path("conn"))
+
+    for data in (b"\x1aE\xdf\xa3header", b"cluster-1", b"cluster-2"):
+        length = await writer.append("conn", append_to(buffer, data), buffer)
+        assert length == read_committed_length(writer.path("conn")) == len(buffer.getvalue())
+
+    with open(writer.path("conn"), "rb") as f:
+        assert f.read() == buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_out_of_sync_file_is_rewritten(tmp_path):
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="never")
+    buffer = AudioBuffer(writer.path("conn"))
+    await writer.append("conn", append_to(buffer, b"header"), buffer)
+
+    os.remove(writer.path("conn"))
+    await writer.append("conn", append_to(buffer, b"cluster-1"), buffer)
+
+    with open(writer.path("conn"), "rb") as f:
+        assert f.read() == b"headercluster-1"
+    assert read_committed_length(writer.path("conn")) == len(b"headercluster-1")
+
+
+@pytest.mark.asyncio
+async def test_flush(tmp_path):
+    writer = AudioFileWriter(str(tmp_path))
+    buffer = AudioBuffer(writer.path("conn"))
+    await writer.append("conn", append_to(buffer, b"header"), buffer)
+
+    assert await writer.flush("conn", buffer) == len(b"header")
+    assert await writer.flush("missing", AudioBuffer(writer.path("missing"), b"restored")) == len(b"restored")
+    with open(writer.path("missing"), "rb") as f:
+        assert f.read() == b"restored"
+
+
+def test_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        AudioFileWriter(fsync_policy="sometimes")
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from app.redis_transcribe.base import BaseDAL as TranscribeBaseDAL
+from app.redis_transcribe.exceptions import DataNotFoundError
+from shared_lib.redis.dals.base import BaseDAL
+from shared_lib.redis.exceptions import DataNotFoundError as SharedDataNotFoundError
+
+
+@pytest.mark.asyncio
+async def test_push_and_pop_many_in_one_round_trip(redis_client, round_trips):
+    dal = BaseDAL(redis_client)
+    items = [{"n": i} for i in range(50)]
+
+    assert await dal.lpush_many("queue", items) == 50
+    assert await dal.rpop_many("queue", limit=30) == items[:30]  # FIFO
+    assert await dal.rpop_many("queue", limit=30) == items[30:]
+    assert round_trips["round_trips"] == 3
+
+    assert await dal.rpop_many("queue", limit=30) == []
+    with pytest.raises(SharedDataNotFoundError):
+        await dal.rpop_many("queue", raise_exception=True)
+
+
+@pytest.mark.asyncio
+async def test_pop_many_by_pattern_pipelines_keys(redis_client, round_trips):
+    dal = BaseDAL(redis_client)
+    for meeting in range(10):
+        await dal.lpush_many(f"segments:{meeting}", [f"segment-{i}" for i in range(3)], json_dump=False)
+    await redis_client.set("segments_other", "not a list")
+    round_trips["round_trips"] = 0
+
+    popped = await dal.rpop_many_by_pattern("segments:", limit=2, min_length=1000)
+
+    assert popped == {f"segments:{meeting}": ["segment-0", "segment-1"] for meeting in range(10)}
+    assert round_trips["round_trips"] == 2  # SCAN + one pipeline of RPOPs
+
+
+@pytest.mark.asyncio
+async def test_transcribe_dal_keeps_its_interface(redis_client):
+    dal = TranscribeBaseDAL(redis_client)
+    await redis_client.lpush("queue", json.dumps({"n": 1}))
+
+    assert await dal.rpop_many("queue", limit=10) == [{"n": 1}]
+    assert await dal.rpop_many("queue", limit=10) is None
+    with pytest.raises(DataNotFoundError):
+        await dal.rpop_many("queue", raise_exception=True)
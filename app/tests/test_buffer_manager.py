@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.audio import file_writer
+from app.services.audio.buffer_manager import AudioBufferManager
+from app.services.audio.file_writer import AudioFileWriter, read_committed_length
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return AudioFileWriter(str(tmp_path), fsync_policy="never")
+
+
+@pytest.mark.asyncio
+async def test_least_recently_updated_buffer_is_spilled(writer):
+    manager = AudioBufferManager(writer, memory_budget=20)
+
+    await manager.append("old", b"\x1aE\xdf\xa3old-1")
+    await manager.append("new", b"\x1aE\xdf\xa3new-1")
+    await manager.append("new", b"new-2")
+
+    assert manager.get("old").spilled
+    assert not manager.get("new").spilled
+    assert manager.memory_bytes == len(manager.get("new")) <= 20
+    assert manager.stats() == {
+        "connections": 2, "in_memory": 1, "spilled": 1, "pending": 0, "memory_bytes": manager.memory_bytes
+    }
+
+    # A spilled buffer keeps receiving audio (file only) and is read back through mmap
+    await manager.append("old", b"old-2")
+    assert manager.get("old").spilled
+    assert manager.get("old").getvalue() == b"\x1aE\xdf\xa3old-1old-2"
+    with manager.get("old").view() as view:
+        assert bytes(view) == b"\x1aE\xdf\xa3old-1old-2"
+    assert read_committed_length(writer.path("old")) == len(b"\x1aE\xdf\xa3old-1old-2")
+
+
+@pytest.mark.asyncio
+async def test_restored_buffers_count_against_budget(writer):
+    manager = AudioBufferManager(writer, memory_budget=10)
+    now = datetime.now(timezone.utc)
+
+    await manager.restore("conn", b"\x1aE\xdf\xa3restored", now)
+
+    assert manager.get("conn").spilled
+    assert manager.memory_bytes == 0
+    with open(writer.path("conn"), "rb") as f:
+        assert f.read() == b"\x1aE\xdf\xa3restored"
+
+
+@pytest.mark.asyncio
+async def test_pop_inactive_reports_each_connection_once(writer):
+    manager = AudioBufferManager(writer, memory_budget=1024, inactive_timeout=60)
+    start = datetime.now(timezone.utc)
+
+    await manager.append("idle", b"a", start)
+    await manager.append("active", b"b", start)
+    await manager.append("active", b"c", start + timedelta(seconds=50))
+
+    assert manager.pop_inactive(start + timedelta(seconds=30)) == []
+    assert manager.pop_inactive(start + timedelta(seconds=70)) == ["idle"]
+    assert manager.pop_inactive(start + timedelta(seconds=80)) == []
+    assert manager.pop_inactive(start + timedelta(seconds=120)) == ["active"]
+
+
+@pytest.mark.asyncio
+async def test_release(writer):
+    manager = AudioBufferManager(writer, memory_budget=1024)
+    await manager.append("conn", b"\x1aE\xdf\xa3header")
+
+    assert await manager.release("conn") == len(b"\x1aE\xdf\xa3header")
+    assert "conn" not in manager
+    assert manager.memory_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_registered_buffer_is_restored_or_dropped(writer):
+    manager = AudioBufferManager(writer, memory_budget=1024, inactive_timeout=60)
+    start = datetime.now(timezone.utc)
+    manager.register("restored", 10, start)
+    manager.register("idle", 10, start)
+
+    assert "restored" in manager and manager.get("restored") is None
+    await manager.restore("restored", b"\x1aE\xdf\xa3header", start)
+    assert not manager.is_pending("restored")
+    assert manager.get("restored").getvalue() == b"\x1aE\xdf\xa3header"
+
+    assert sorted(manager.pop_inactive(start + timedelta(seconds=70))) == ["idle", "restored"]
+    assert await manager.release("idle") == 10
+    assert "idle" not in manager
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_within_budget(writer):
+    manager = AudioBufferManager(writer, memory_budget=64)
+    connection_ids = [f"conn-{i}" for i in range(8)]
+
+    async def feed(connection_id):
+        for i in range(10):
+            await manager.append(connection_id, f"{connection_id}:{i};".encode())
+
+    await asyncio.gather(*(feed(connection_id) for connection_id in connection_ids))
+
+    assert manager.memory_bytes == sum(
+        len(manager.get(c)) for c in connection_ids if not manager.get(c).spilled
+    ) <= 64
+    for connection_id in connection_ids:
+        expected = b"".join(f"{connection_id}:{i};".encode() for i in range(10))
+        assert manager.get(connection_id).getvalue() == expected
+        with open(writer.path(connection_id), "rb") as f:
+            assert f.read() == expected
+
+
+@pytest.mark.asyncio
+async def test_spill_keeps_fsync_schedule(tmp_path, monkeypatch):
+    fsyncs = []
+    monkeypatch.setattr(file_writer.os, "fsync", fsyncs.append)
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="interval", fsync_interval_sec=3600)
+    manager = AudioBufferManager(writer, memory_budget=20)
+
+    await manager.append("old", b"\x1aE\xdf\xa3old-1")  # first append: synced
+    await manager.append("new", b"\x1aE\xdf\xa3new-1")
+    await manager.append("new", b"new-2")  # spills "old": synced
+    assert manager.get("old").spilled and len(fsyncs) == 3
+
+    # Still within the interval of its last fsync
+    await manager.append("old", b"old-2")
+    assert len(fsyncs) == 3
@@ -0,0 +1,126 @@
+import pytest
+
+from app.services.audio.lease import ConnectionLeases
+from app.services.audio.pcm import PcmDecoders
+from app.services.audio.processor import Processor
+from app.settings import settings
+from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
+from shared_lib.redis.keys import AUDIO_BUFFER, INITIAL_FEED_AUDIO
+
+
+@pytest.mark.asyncio
+async def test_connection_is_owned_by_one_process(binary_redis):
+    first = ConnectionLeases(binary_redis, "worker-1", 10000)
+    second = ConnectionLeases(binary_redis, "worker-2", 10000)
+
+    assert await first.acquire("conn") == ("worker-1", True)
+    assert await first.acquire("conn") == ("worker-1", False)  # renewed
+    assert await second.acquire("conn") == ("worker-1", False)
+    assert first.owns("conn") and not second.owns("conn")
+
+    await first.release("conn")
+    assert await second.acquire("conn") == ("worker-2", True)
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_taken_over(binary_redis):
+    first = ConnectionLeases(binary_redis, "worker-1", 10000)
+    second = ConnectionLeases(binary_redis, "worker-2", 10000)
+    await first.acquire("conn")
+    await first.acquire("other")
+
+    await binary_redis.delete(ConnectionLeases.key("conn"))  # expired while worker-1 stalled
+    assert await second.acquire("conn") == ("worker-2", True)
+
+    assert await first.heartbeat() == ["conn"]
+    assert first.owned == {"other"}
+    assert await first.fenced("conn", lambda pipe: pipe.set("audio", b"stale")) is None
+    assert await binary_redis.get("audio") is None
+    assert await second.fenced("conn", lambda pipe: pipe.set("audio", b"fresh")) == [True]
+    assert await binary_redis.pttl(ConnectionLeases.key("conn")) > 0
+
+
+def make_processor(binary_redis, name, tmp_path):
+    leases = ConnectionLeases(binary_redis, name, 10000)
+    return Processor(binary_redis, binary_redis, leases, output_dir=str(tmp_path / name)), leases
+
+
+@pytest.mark.asyncio
+async def test_connection_is_handed_over_between_processes(binary_redis, tmp_path, make_chunk):
+    first, _ = make_processor(binary_redis, "worker-1", tmp_path)
+    second, second_leases = make_processor(binary_redis, "worker-2", tmp_path)
+    dal = AudioChunkDAL(binary_redis)
+
+    await dal.add_chunk("conn", make_chunk(0, b"\x1aE\xdf\xa3header"))
+    assert (await first.writestream2file("conn"))[0] == "test-meeting"
+
+    # Not the owner: the connection is passed to worker-1 and its chunk left alone
+    await dal.add_chunk("conn", make_chunk(1, b"cluster-1"))
+    assert await second.writestream2file("conn") == (None, None, None, None, None)
+    assert await dal.wait_ready_connections(0, consumer="worker-1") == ["conn"]
+
+    # worker-1 died: once its lease expires worker-2 continues the same buffer
+    await binary_redis.delete(ConnectionLeases.key("conn"))
+    assert (await second.writestream2file("conn"))[0] == "test-meeting"
+    assert await second.get_audio_buffer("conn") == b"\x1aE\xdf\xa3headercluster-1"
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == b"\x1aE\xdf\xa3headercluster-1"
+    assert await binary_redis.xlen(f"{INITIAL_FEED_AUDIO}:conn") == 0
+
+
+@pytest.mark.asyncio
+async def test_appended_chunks_are_not_appended_again(binary_redis, tmp_path, monkeypatch, make_chunk):
+    processor, _ = make_processor(binary_redis, "worker-1", tmp_path)
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunk("conn", make_chunk(0, b"\x1aE\xdf\xa3header"))
+    await processor.writestream2file("conn")
+
+    async def fail(*args):
+        raise RuntimeError("decoder failed")
+
+    # Appended to the buffer but never acknowledged
+    await dal.add_chunk("conn", make_chunk(1, b"cluster-1"))
+    monkeypatch.setattr(PcmDecoders, "feed", fail)
+    with pytest.raises(RuntimeError):
+        await processor.writestream2file("conn")
+    monkeypatch.undo()
+
+    # Reclaimed with the next chunk: only the next chunk is appended
+    monkeypatch.setattr(settings, "audio_stream_claim_idle_ms", 0)
+    await dal.add_chunk("conn", make_chunk(2, b"cluster-2"))
+    await processor.writestream2file("conn")
+
+    expected = b"\x1aE\xdf\xa3headercluster-1cluster-2"
+    assert await processor.get_audio_buffer("conn") == expected
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == expected
+    assert await binary_redis.xlen(f"{INITIAL_FEED_AUDIO}:conn") == 0
+
+
+@pytest.mark.asyncio
+async def test_new_holder_skips_chunks_appended_by_former_holder(binary_redis, tmp_path, monkeypatch, make_chunk):
+    first, _ = make_processor(binary_redis, "worker-1", tmp_path)
+    second, second_leases = make_processor(binary_redis, "worker-2", tmp_path)
+    dal = AudioChunkDAL(binary_redis)
+    await dal.add_chunk("conn", make_chunk(0, b"\x1aE\xdf\xa3header"))
+    await first.writestream2file("conn")
+
+    async def crash(*args):
+        raise RuntimeError("worker-1 died")
+
+    # worker-1 died after appending the chunk, before acknowledging it
+    await dal.add_chunk("conn", make_chunk(1, b"cluster-1"))
+    monkeypatch.setattr(PcmDecoders, "feed", crash)
+    with pytest.raises(RuntimeError):
+        await first.writestream2file("conn")
+    monkeypatch.undo()
+    await binary_redis.delete(ConnectionLeases.key("conn"))
+
+    # worker-2 restores the buffer and only acknowledges the reclaimed chunk
+    assert await second.writestream2file("conn") == (None, None, None, None, None)
+    assert second_leases.owns("conn") and second.buffer_stats()["connections"] == 1
+    assert await binary_redis.xlen(f"{INITIAL_FEED_AUDIO}:conn") == 0
+
+    await dal.add_chunk("conn", make_chunk(2, b"cluster-2"))
+    assert (await second.writestream2file("conn"))[0] == "test-meeting"
+    expected = b"\x1aE\xdf\xa3headercluster-1cluster-2"
+    assert await second.get_audio_buffer("conn") == expected
+    assert await binary_redis.get(f"{AUDIO_BUFFER}:conn") == expected
@@ -0,0 +1,66 @@
+import pytest
+
+from app.services.audio.decoded_cache import DecodedAudioCache
+from app.services.audio.decoder import DecodeError
+from app.services.audio.pcm import PCM_BYTES_PER_SEC, PCM_SAMPLE_RATE
+
+
+class FakeAudio:
+    """Audio of a connection growing over time; every second holds its own sample value."""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.decoded = []
+
+    async def decode(self, start: float, duration: float) -> bytes:
+        self.decoded.append((start, duration))
+        end = min(start + duration, self.seconds)
+        if end <= start:
+            raise DecodeError("No audio decoded")
+        return pcm(start, end)
+
+
+def pcm(start: float, end: float) -> bytes:
+    samples = range(int(start * PCM_SAMPLE_RATE), int(end * PCM_SAMPLE_RATE))
+    return b"".join(bytes([sample // PCM_SAMPLE_RATE, 0]) for sample in samples)
+
+
+@pytest.mark.asyncio
+async def test_decodes_only_new_audio():
+    cache, audio = DecodedAudioCache(max_bytes=10 * 1024 * 1024), FakeAudio(seconds=8)
+
+    assert await cache.read("conn", 100, 0, 5, audio.decode) == pcm(0, 5)
+    # The same window again (e.g. after a failed transcription) is not decoded
+    assert await cache.read("conn", 100, 0, 5, audio.decode) == pcm(0, 5)
+    # The window moved on before the file grew: only the cached audio is returned
+    assert await cache.read("conn", 100, 3, 5, audio.decode) == pcm(3, 5)
+    assert audio.decoded == [(0, 5)]
+
+    audio.seconds = 12
+    assert await cache.read("conn", 200, 3, 5, audio.decode) == pcm(3, 8)
+    assert audio.decoded[-1] == (5, 3)  # only the audio after the cached end
+    assert (cache.hits, cache.extends, cache.misses) == (2, 1, 1)
+    assert cache.hit_rate == 0.75
+
+
+@pytest.mark.asyncio
+async def test_rewinding_past_the_cache_decodes_again():
+    cache, audio = DecodedAudioCache(max_bytes=10 * 1024 * 1024), FakeAudio(seconds=30)
+
+    await cache.read("conn", 100, 20, 5, audio.decode)
+    assert await cache.read("conn", 100, 2, 5, audio.decode) == pcm(2, 7)
+    assert audio.decoded == [(20, 5), (2, 5)]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_connections_are_evicted():
+    cache = DecodedAudioCache(max_bytes=int(2.5 * 5 * PCM_BYTES_PER_SEC))
+    audio = {connection_id: FakeAudio(seconds=5) for connection_id in ("a", "b", "c")}
+
+    for connection_id in ("a", "b", "a", "c"):
+        await cache.read(connection_id, 100, 0, 5, audio[connection_id].decode)
+
+    assert cache.stats()["connections"] == 2 and cache.evictions == 1
+    await cache.read("a", 100, 0, 5, audio["a"].decode)
+    await cache.read("b", 100, 0, 5, audio["b"].decode)
+    assert len(audio["a"].decoded) == 1 and len(audio["b"].decoded) == 2  # b was evicted
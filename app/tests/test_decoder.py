@@ -0,0 +1,80 @@
+import asyncio
+import shutil
+
+import pytest
+
+from app.services.audio import decoder as decoder_module
+from app.services.audio.audio import AudioSlicer
+from app.services.audio.decoder import DecodeError, DecoderPool
+from app.services.audio.pcm import PCM_BYTES_PER_SEC
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_concurrent_jobs(monkeypatch):
+    running, peak = 0, 0
+
+    async def decode(source, start, duration):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return b"\x00\x00" * int(duration * PCM_BYTES_PER_SEC / 2)
+
+    monkeypatch.setattr(decoder_module, "_decode_with_ffmpeg", decode)
+    pool = DecoderPool(size=2, in_process=False)
+
+    results = await asyncio.gather(*(pool.decode(b"audio", 0, 1) for _ in range(6)))
+    assert peak == 2
+    assert all(len(data) == PCM_BYTES_PER_SEC for data in results)
+
+
+@pytest.mark.asyncio
+async def test_jobs_time_out(monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def stuck(source, start, duration):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cancelled.set()
+
+    monkeypatch.setattr(decoder_module, "_decode_with_ffmpeg", stuck)
+    pool = DecoderPool(size=1, timeout_sec=0.05, in_process=False)
+
+    with pytest.raises(DecodeError):
+        await pool.decode(b"audio", 0, 1)
+    assert cancelled.is_set()  # the ffmpeg process is killed
+
+
+@pytest.mark.asyncio
+async def test_redis_slice_is_decoded_to_pcm(monkeypatch):
+    async def decode(source, start, duration):
+        assert source == b"\x1aE\xdf\xa3audio"
+        return b"\x00\x00" * int(duration * PCM_BYTES_PER_SEC / 2)
+
+    monkeypatch.setattr(decoder_module, "_decode_with_ffmpeg", decode)
+    redis_client = fakeredis.FakeAsyncRedis()
+    await redis_client.set("audio_buffer:conn", b"\x1aE\xdf\xa3audio")
+
+    slicer = await AudioSlicer.from_redis_slice(
+        redis_client, "conn", 2, 3, decoder=DecoderPool(size=1, in_process=False)
+    )
+    assert slicer.audio.duration_seconds == 3
+    assert slicer.audio.frame_rate == 16000
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+async def test_decodes_slice_with_ffmpeg():
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=10",
+        "-c:a", "libopus", "-f", "webm", "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+    )
+    webm, _ = await process.communicate()
+
+    data = await DecoderPool(size=1, in_process=False).decode(webm, 4, 3)
+    assert abs(len(data) / PCM_BYTES_PER_SEC - 3) < 0.05
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from redis.asyncio.client import Pipeline
+from redis.exceptions import WatchError
+
+from app.services.audio import redis_models
+from app.services.audio.redis_models import Connection, Meeting, Transcriber
+
+START = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+async def add_segment(meeting, start, now, connection_id="conn"):
+    return await meeting.add_segment(
+        connection_id, start, start + timedelta(milliseconds=50), Transcriber(meeting.redis), 5, now
+    )
+
+
+@pytest.mark.asyncio
+async def test_connection_keeps_first_start(redis_client, round_trips):
+    connection = Connection(redis_client, "conn", "user")
+    await connection.update_timestamps(START, START + timedelta(seconds=1))
+    await connection.update_timestamps(START + timedelta(seconds=1), START + timedelta(seconds=2))
+    assert round_trips["round_trips"] == 2
+
+    stored = Connection(redis_client, "conn")
+    await stored.load_from_redis()
+    assert (stored.start_timestamp, stored.end_timestamp, stored.user_id) == (START, START + timedelta(seconds=2), "user")
+    assert connection.start_timestamp == START
+
+
+@pytest.mark.asyncio
+async def test_segment_sets_starts_once_and_schedules_transcriber(redis_client, round_trips):
+    meeting = Meeting(redis_client, "meeting")
+
+    # The first segment only sets the start, the transcriber is due once a step passed since then
+    assert not await add_segment(meeting, START, START + timedelta(seconds=1))
+    assert round_trips["round_trips"] == 3  # WATCH, HMGET, MULTI/EXEC
+    assert await add_segment(meeting, START + timedelta(seconds=1), START + timedelta(seconds=7))
+    assert not await add_segment(meeting, START + timedelta(seconds=2), START + timedelta(seconds=8))
+
+    stored = Meeting(redis_client, "meeting")
+    await stored.load_from_redis()
+    assert stored.start_timestamp == START
+    assert stored.start_server_timestamp == START + timedelta(milliseconds=50)
+    assert stored.transcriber_last_updated_timestamp == START + timedelta(seconds=7)
+    assert await redis_client.smembers(stored.connections_type_) == {"conn"}
+    assert await redis_client.smembers(Transcriber(redis_client).todo_type_) == {"meeting"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_segments_schedule_transcriber_once(redis_client):
+    meetings = [Meeting(redis_client, "meeting") for _ in range(5)]
+    await add_segment(meetings[0], START, START)
+
+    scheduled = await asyncio.gather(
+        *(add_segment(m, START, START + timedelta(seconds=10), f"conn-{i}") for i, m in enumerate(meetings))
+    )
+    assert sum(scheduled) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_redis_writes_changed_fields_only(redis_client):
+    await add_segment(Meeting(redis_client, "meeting"), START, START)
+    transcriber_view = Meeting(redis_client, "meeting")
+    await transcriber_view.load_from_redis()
+
+    # Another process moves the start meanwhile, the transcriber only writes its seek
+    await redis_client.hset("meeting:meeting:metadata", "start_timestamp", (START - timedelta(seconds=1)).isoformat())
+    transcriber_view.transcriber_seek_timestamp = START + timedelta(seconds=30)
+    await transcriber_view.update_redis()
+
+    stored = await redis_client.hgetall("meeting:meeting:metadata")
+    assert stored["start_timestamp"] == (START - timedelta(seconds=1)).isoformat()
+    assert stored["transcriber_seek_timestamp"] == (START + timedelta(seconds=30)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_segment_gives_up_under_constant_contention(redis_client, monkeypatch):
+    attempts, execute = [], Pipeline.execute
+
+    async def conflict(pipe, *args, **kwargs):
+        # The transcriber moves its seek between every WATCH and EXEC
+        attempts.append(1)
+        await redis_client.hset("meeting:meeting:metadata", "transcriber_seek_timestamp", len(attempts))
+        return await execute(pipe, *args, **kwargs)
+
+    monkeypatch.setattr(Pipeline, "execute", conflict)
+    monkeypatch.setattr(redis_models, "MEETING_UPDATE_BACKOFF_SEC", 0)
+
+    with pytest.raises(WatchError):
+        await add_segment(Meeting(redis_client, "meeting"), START, START)
+    assert len(attempts) == redis_models.MEETING_UPDATE_ATTEMPTS
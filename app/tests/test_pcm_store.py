@@ -0,0 +1,97 @@
+import asyncio
+import io
+import shutil
+import wave
+
+import pytest
+
+from app.services.audio.audio import AudioSlicer
+from app.services.audio.buffer_manager import AudioBuffer
+from app.services.audio.file_writer import publish_committed_length
+from app.services.audio.pcm import PCM_BYTES_PER_SEC, PcmDecoders, pcm_path, read_pcm_slice
+
+
+def write_pcm(path, seconds, committed_seconds=None):
+    # Every second holds its own sample value, so slices can be checked by time
+    data = b"".join(bytes([i, 0]) * (PCM_BYTES_PER_SEC // 2) for i in range(seconds))
+    with open(path, "wb") as f:
+        f.write(data)
+    publish_committed_length(path, int((committed_seconds or seconds) * PCM_BYTES_PER_SEC))
+    return data
+
+
+def test_reads_slice_by_time(tmp_path):
+    path = str(tmp_path / "conn.pcm")
+    data = write_pcm(path, 10)
+
+    assert read_pcm_slice(path, 3, 2) == data[3 * PCM_BYTES_PER_SEC:5 * PCM_BYTES_PER_SEC]
+    # Odd offsets are aligned to whole samples
+    assert len(read_pcm_slice(path, 3.00003, 1)) % 2 == 0
+
+
+def test_reads_up_to_committed_length(tmp_path):
+    path = str(tmp_path / "conn.pcm")
+    data = write_pcm(path, 10, committed_seconds=6)
+
+    assert read_pcm_slice(path, 4, 5) == data[4 * PCM_BYTES_PER_SEC:6 * PCM_BYTES_PER_SEC]
+    assert read_pcm_slice(path, 6, 5) is None
+    assert read_pcm_slice(str(tmp_path / "missing.pcm"), 0, 5) is None
+
+
+@pytest.mark.asyncio
+async def test_slicer_from_pcm(tmp_path):
+    path = str(tmp_path / "conn.pcm")
+    write_pcm(path, 10)
+
+    slicer = await AudioSlicer.from_pcm_slice(path, 2, 5)
+    assert slicer.audio.duration_seconds == 5
+    assert await AudioSlicer.from_pcm_slice(path, 12, 5) is None
+
+
+@pytest.mark.asyncio
+async def test_decoding_is_disabled_without_ffmpeg(tmp_path, monkeypatch):
+    async def missing_ffmpeg(*args, **kwargs):
+        raise FileNotFoundError("ffmpeg")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", missing_ffmpeg)
+    decoders = PcmDecoders(str(tmp_path))
+    buffer = AudioBuffer(str(tmp_path / "conn.webm"), b"audio")
+
+    await decoders.feed("conn", b"audio", buffer)
+    assert not decoders.enabled
+    await decoders.close_all()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+async def test_decodes_chunks_into_pcm(tmp_path):
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=3",
+        "-c:a", "libopus", "-f", "webm", "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+    )
+    webm, _ = await proc.communicate()
+
+    decoders = PcmDecoders(str(tmp_path))
+    buffer = AudioBuffer(str(tmp_path / "conn.webm"))
+    for start in range(0, len(webm), 4096):
+        chunk = webm[start:start + 4096]
+        buffer.write(chunk)
+        await decoders.feed("conn", chunk, buffer)
+    await decoders.close("conn")
+
+    pcm = read_pcm_slice(pcm_path(str(tmp_path), "conn"), 0, 10)
+    assert abs(len(pcm) / PCM_BYTES_PER_SEC - 3) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_exports_upload_formats_without_encoder(tmp_path):
+    path = str(tmp_path / "conn.pcm")
+    data = write_pcm(path, 3)
+    slicer = AudioSlicer.from_pcm(data)
+
+    assert await slicer.export_data(format="pcm") == data
+
+    with wave.open(io.BytesIO(await slicer.export_data(format="wav"))) as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (16000, 1, 2)
+        assert wav.readframes(wav.getnframes()) == data
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services.audio.lease import ConnectionLeases
+from app.services.audio.processor import Processor
+from app.settings import settings
+
+
+@pytest.fixture
+def processor(binary_redis):
+    return Processor(binary_redis, binary_redis, ConnectionLeases(binary_redis, "test-consumer", 10000))
+
+
+@pytest.mark.asyncio
+async def test_connections_are_processed_concurrently_within_limit(processor):
+    running, peak, batches = set(), [0], []
+
+    async def get_new_connections(wait_sec=0):
+        return [f"conn-{i}" for i in range(settings.processing_threads * 3)]
+
+    async def flush_inactive_connections():
+        pass
+
+    async def process_connection_task(connection_id):
+        assert connection_id not in running  # one batch per connection at a time
+        running.add(connection_id)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.01)
+        running.discard(connection_id)
+        batches.append(connection_id)
+
+    processor._get_new_connections = get_new_connections
+    processor.flush_inactive_connections = flush_inactive_connections
+    processor._process_connection_task = process_connection_task
+
+    # Overlapping ticks process the same connections: their batches are serialised, not interleaved
+    await asyncio.gather(processor.process_connections(), processor.process_connections())
+
+    assert peak[0] == settings.processing_threads
+    assert len(batches) == settings.processing_threads * 6
+
+
+@pytest.mark.asyncio
+async def test_failing_connection_does_not_stop_others(processor):
+    processed = []
+
+    async def get_new_connections(wait_sec=0):
+        return ["broken", "ok"]
+
+    async def flush_inactive_connections():
+        pass
+
+    async def process_connection_task(connection_id):
+        if connection_id == "broken":
+            raise RuntimeError("boom")
+        processed.append(connection_id)
+
+    processor._get_new_connections = get_new_connections
+    processor.flush_inactive_connections = flush_inactive_connections
+    processor._process_connection_task = process_connection_task
+
+    await processor.process_connections()
+
+    assert processed == ["ok"]
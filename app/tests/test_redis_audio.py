@@ -11,7 +11,7 @@ from app.settings import settings
 from app.services.audio.processor import Processor
 from app.services.audio.audio import AudioSlicer
 from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
-from shared_lib.redis.models import AudioChunkModel
+from shared_lib.redis.models import AudioChunkEnvelope
 from shared_lib.redis.keys import AUDIO_BUFFER
 from datetime import datetime, timezone
 
@@ -31,29 +31,27 @@ async def upload_test_audio(audio_chunk_dal, connection_id, user_id, meeting_id=
         b'\x0C\x0D\x0E\x0F\x10\x11'
     ]
     
-    server_timestamp = datetime.now(timezone.utc)
-    user_timestamp = server_timestamp
+    server_timestamp_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    user_timestamp_ms = server_timestamp_ms
     
     for i, chunk in enumerate(chunks):
-        chunk_hex = chunk.hex()
-        
-        # Create a chunk model
-        chunk_obj = AudioChunkModel(
-            chunk=chunk_hex,
-            user_timestamp=user_timestamp.isoformat(),
-            server_timestamp=server_timestamp.isoformat(),
+        # Create a chunk envelope
+        chunk_obj = AudioChunkEnvelope(
+            chunk=chunk,
+            user_id=str(user_id),
             meeting_id=meeting_id or connection_id,
-            user_id=user_id,
-            audio_chunk_duration_sec=0.5,  # 0.5 seconds per chunk
-            audio_chunk_number=i
+            audio_chunk_number=i,
+            user_timestamp_ms=user_timestamp_ms,
+            server_timestamp_ms=server_timestamp_ms,
+            audio_chunk_duration_ms=500,  # 0.5 seconds per chunk
         )
         
         # Add to Redis
-        await audio_chunk_dal.add_chunk(connection_id, chunk_obj.model_dump())
+        await audio_chunk_dal.add_chunk(connection_id, chunk_obj)
         
         # Increment timestamps
-        user_timestamp = user_timestamp.replace(microsecond=user_timestamp.microsecond + 500000)
-        server_timestamp = server_timestamp.replace(microsecond=server_timestamp.microsecond + 500000)
+        user_timestamp_ms += 500
+        server_timestamp_ms += 500
     
     return len(chunks)
 
@@ -61,11 +59,12 @@ async def test_redis_audio_processing():
     """Test Redis-based audio processing."""
     logger.info("Starting Redis audio processing test")
     
-    # Initialize Redis client
+    # Initialize binary-safe Redis client
     redis_client = await get_redis_client(
         settings.redis_host, 
         settings.redis_port,
-        settings.redis_password
+        settings.redis_password,
+        decode_responses=False,
     )
     
     # Create processor and audio chunk DAL
@@ -93,12 +92,11 @@ async def test_redis_audio_processing():
     
     # Verify data in Redis
     redis_key = f"{AUDIO_BUFFER}:{connection_id}"
-    hex_encoded_buffer = await redis_client.get(redis_key)
+    buffer_data = await redis_client.get(redis_key)
     
-    if hex_encoded_buffer:
+    if buffer_data:
         try:
-            # Convert hex encoded string back to binary data
-            buffer_data = bytes.fromhex(hex_encoded_buffer)
+            assert buffer_data.startswith(b'\x00\x01\x02'), "Expected raw (not hex encoded) audio bytes in Redis"
             logger.info(f"Found audio buffer in Redis ({len(buffer_data)} bytes)")
             
             # Test AudioSlicer from Redis
@@ -114,8 +112,8 @@ async def test_redis_audio_processing():
             logger.info(f"Exported {len(audio_data)} bytes of audio data from slicer")
             assert len(audio_data) > 0, "Expected non-empty audio data from slicer"
         except ValueError as e:
-            logger.error(f"Failed to decode hex data from Redis: {e}")
-            assert False, f"Failed to decode hex data from Redis: {e}"
+            logger.error(f"Failed to read audio data from Redis: {e}")
+            assert False, f"Failed to read audio data from Redis: {e}"
     else:
         logger.error(f"No audio buffer found in Redis for {connection_id}")
     
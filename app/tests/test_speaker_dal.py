@@ -0,0 +1,50 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from shared_lib.redis.dals.speaker_dal import SpeakerDAL
+from shared_lib.redis.keys import SPEAKER_DATA
+from shared_lib.redis.models import SpeakerDataModel
+
+
+@pytest.fixture
+def mock_redis():
+    mock = AsyncMock()
+    mock.lpush = AsyncMock(return_value=1)
+    return mock
+
+
+def make_speakers(count):
+    user_id = uuid4()
+    return [
+        SpeakerDataModel(
+            speaker_name=f"Speaker {i}",
+            meta="1001111111",
+            user_timestamp="2024-03-13T15:32:42+00:00",
+            server_timestamp="2024-03-13T15:32:42+00:00",
+            meeting_id="test-meeting",
+            user_id=user_id,
+            speaker_delay_sec=1,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_add_speakers_data_single_round_trip(mock_redis):
+    speakers = make_speakers(10)
+
+    await SpeakerDAL(mock_redis).add_speakers_data(speakers)
+
+    mock_redis.lpush.assert_called_once()
+    key, *values = mock_redis.lpush.call_args.args
+    assert key == SPEAKER_DATA
+    assert [json.loads(v)["speaker_name"] for v in values] == [f"Speaker {i}" for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_add_speakers_data_empty_batch(mock_redis):
+    await SpeakerDAL(mock_redis).add_speakers_data([])
+
+    mock_redis.lpush.assert_not_called()
@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from streamqueue.settings import settings
+from streamqueue.api.routers import stream
+
+
+class FakeWebSocket:
+    """Client sending audio frames as fast as they are read."""
+
+    def __init__(self):
+        self.app = SimpleNamespace(state=SimpleNamespace(stream_writers=set(), redis=None))
+        self.headers = {}
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        await asyncio.sleep(0)
+        return {"type": "websocket.receive", "bytes": stream.AUDIO_FRAME_HEADER.pack(0, 1719397023) + b"audio"}
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_when_writer_fails_on_full_queue():
+    async def authenticate(self, websocket, token):
+        return "user"
+
+    async def fail(*args):
+        await asyncio.sleep(0.01)  # the queue fills up meanwhile
+        raise RuntimeError("redis unavailable")
+
+    websocket = FakeWebSocket()
+    with patch.object(stream.UserTokenAuth, "authenticate", authenticate), patch.object(
+        stream, "_write_batch", fail
+    ), patch.object(settings, "ws_max_pending_frames", 2):
+        await asyncio.wait_for(stream.stream_endpoint(websocket, "conn", token="token"), timeout=1)
+
+    assert websocket.close_code == 1011
+    assert not websocket.app.state.stream_writers
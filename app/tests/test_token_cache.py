@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from shared_lib.redis.dals.admin_dal import AdminDAL
+from streamqueue.api.auth.token_cache import MISSING, TokenCache
+
+
+def test_hit_miss_counters():
+    cache = TokenCache()
+
+    assert cache.get_user("token") is MISSING
+    cache.set_user("token", "user")
+    assert cache.get_user("token") == "user"
+    cache.set_enabled("user", False)
+    assert cache.get_enabled("user") is False
+
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TokenCache(ttl=10)
+    with patch("streamqueue.api.auth.token_cache.time.monotonic", return_value=100):
+        cache.set_enabled("user", True)
+    with patch("streamqueue.api.auth.token_cache.time.monotonic", return_value=105):
+        assert cache.get_enabled("user") is True
+    with patch("streamqueue.api.auth.token_cache.time.monotonic", return_value=111):
+        assert cache.get_enabled("user") is MISSING
+
+
+def test_size_is_bounded_lru():
+    cache = TokenCache(max_size=2)
+    cache.set_user("a", "1")
+    cache.set_user("b", "2")
+    cache.get_user("a")
+    cache.set_user("c", "3")
+
+    assert cache.get_user("b") is MISSING
+    assert cache.get_user("a") == "1"
+    assert cache.get_user("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_admin_changes_invalidate_cache(redis_client):
+    admin_dal = AdminDAL(redis_client)
+    cache = TokenCache()
+
+    listener = asyncio.create_task(cache.listen(redis_client))
+    await asyncio.sleep(0.1)  # let the subscription start
+
+    cache.set_user("token", "user")
+    cache.set_enabled("user", True)
+    await admin_dal.set_user_enable_status("user", False)
+    await asyncio.sleep(0.1)
+    assert cache.get_enabled("user") is MISSING
+    assert cache.get_user("token") == "user"
+
+    cache.set_user("other-token", "stale")
+    await admin_dal.add_token("other-token", "user-2", True)
+    await asyncio.sleep(0.1)
+    assert cache.get_user("other-token") is MISSING
+
+    # Flushed tokens are not authenticated from the cache anymore
+    cache.set_user("token", "user")
+    await admin_dal.flush()
+    await asyncio.sleep(0.1)
+    assert cache.get_user("token") is MISSING
+    assert await admin_dal.get_user_from_token("other-token") is None
+
+    listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
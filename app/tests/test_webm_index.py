@@ -0,0 +1,134 @@
+import pytest
+
+from app.services.audio import decoder as decoder_module
+from app.services.audio.audio import AudioSlicer
+from app.services.audio.buffer_manager import AudioBuffer, AudioBufferManager
+from app.services.audio.decoder import DecoderPool
+from app.services.audio.file_writer import AudioFileWriter
+from app.services.audio.webm_index import ClusterScanner, TimeIndexWriter, read_index, read_segments
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def element(element_id: int, payload: bytes) -> bytes:
+    size = (0x10000000 | len(payload)).to_bytes(4, "big")
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + size + payload
+
+
+def header() -> bytes:
+    ebml = element(0x1A45DFA3, element(0x4282, b"webm"))
+    info = element(0x1549A966, element(0x2AD7B1, (1_000_000).to_bytes(3, "big")))
+    tracks = element(0x1654AE6B, b"\x00" * 40)
+    return ebml + b"\x18\x53\x80\x67" + UNKNOWN_SIZE + info + tracks
+
+
+def cluster(time_ms: int) -> bytes:
+    # Unknown size, as written by MediaRecorder
+    return b"\x1f\x43\xb6\x75" + UNKNOWN_SIZE + element(0xE7, time_ms.to_bytes(2, "big")) + element(0xA3, b"\xaa" * 300)
+
+
+def recording(seconds: int):
+    data, clusters = header(), []
+    for second in range(seconds):
+        clusters.append((second * 1000, len(data)))
+        data += cluster(second * 1000)
+    return data, clusters
+
+
+def test_scanner_finds_clusters_across_pieces():
+    data, clusters = recording(10)
+
+    scanner = ClusterScanner()
+    assert scanner.feed(data) == clusters
+
+    scanner, found = ClusterScanner(), []
+    for i in range(0, len(data), 7):
+        found += scanner.feed(data[i:i + 7])
+    assert found == clusters and not scanner.failed
+
+
+@pytest.mark.asyncio
+async def test_writer_indexes_segments(tmp_path):
+    data, clusters = recording(20)
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="never", index_segment_sec=5)
+    buffer = AudioBuffer(writer.path("conn"))
+    for i in range(0, len(data), 1000):
+        buffer.write(data[i:i + 1000])
+        await writer.append("conn", data[i:i + 1000], buffer)
+
+    assert read_index(writer.path("conn")) == clusters[::5]
+
+    # [7, 9) is in the second segment, read with the header
+    segments, start = read_segments(writer.path("conn"), 7, 2, len(data))
+    assert start == 5
+    assert segments == data[:clusters[0][1]] + data[clusters[5][1]:clusters[10][1]]
+
+    # Entries past the committed length are not read
+    assert read_index(writer.path("conn"), committed_length=clusters[10][1]) == clusters[:10:5]
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_for_existing_file(tmp_path):
+    data, clusters = recording(12)
+    path = tmp_path / "conn.webm"
+    path.write_bytes(data[:len(data) // 2])
+
+    # A new writer (e.g. after a restart) indexes what the file holds before appending
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="never", index_segment_sec=5)
+    buffer = AudioBuffer(writer.path("conn"), data[:len(data) // 2])
+    buffer.write(data[len(data) // 2:])
+    await writer.append("conn", data[len(data) // 2:], buffer)
+
+    assert read_index(writer.path("conn")) == clusters[::5]
+
+
+@pytest.mark.asyncio
+async def test_redis_slice_reads_only_its_segments(tmp_path, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    data, clusters = recording(20)
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="never", index_segment_sec=5)
+    buffer = AudioBuffer(writer.path("conn"))
+    buffer.write(data)
+    await writer.append("conn", data, buffer)
+
+    decoded = []
+
+    async def decode(source, start, duration):
+        decoded.append((source, start))
+        return b"\x00\x00" * 16000
+
+    monkeypatch.setattr(decoder_module, "_decode_with_ffmpeg", decode)
+    pool = DecoderPool(size=1, in_process=False)
+    redis_client = fakeredis.FakeAsyncRedis()
+
+    await redis_client.set("audio_buffer:conn", data)
+    await AudioSlicer.from_redis_slice(redis_client, "conn", 12, 2, decoder=pool, path=writer.path("conn"))
+    assert decoded.pop() == (data[:clusters[0][1]] + data[clusters[10][1]:clusters[15][1]], 2)
+
+    # Buffers of older versions are hex encoded, their offsets do not match the index
+    await redis_client.set("audio_buffer:conn", data.hex())
+    await AudioSlicer.from_redis_slice(redis_client, "conn", 12, 2, decoder=pool, path=writer.path("conn"))
+    assert decoded.pop() == (data, 12)
+
+
+@pytest.mark.asyncio
+async def test_spilled_connection_is_not_indexed_again(tmp_path, monkeypatch):
+    data, clusters = recording(20)
+    writer = AudioFileWriter(str(tmp_path), fsync_policy="never", index_segment_sec=5)
+    manager = AudioBufferManager(writer, memory_budget=len(data) // 2)
+
+    rebuilds, rebuild = [], TimeIndexWriter.rebuild
+
+    def counted_rebuild(index, length):
+        rebuilds.append(length)
+        rebuild(index, length)
+
+    monkeypatch.setattr(TimeIndexWriter, "rebuild", counted_rebuild)
+
+    for i in range(0, len(data), 1000):
+        await manager.append("conn", data[i:i + 1000])
+    assert manager.get("conn").spilled
+
+    # Indexed once, when the file was created, and appended to across the spill
+    assert rebuilds == [0]
+    assert read_index(writer.path("conn")) == clusters[::5]
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Microbenchmark of the per-chunk CPU cost of queuing an audio chunk.
+
+Compares the former path (pydantic ``AudioChunkModel`` validated three times, ISO timestamps built with
+``dateutil`` and parsed back with ``fromisoformat``) with ``AudioChunkEnvelope`` (built once from typed values,
+packed with ``struct``, epoch-millisecond timestamps). Redis is not involved, only the encode/decode work done by
+streamqueue and the audio processor for every chunk.
+
+Usage:
+    python -m benchmarks.chunk_envelope [--chunks 20000] [--chunk-size 3000]
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from dateutil import parser
+from dateutil.tz import UTC
+
+from shared_lib.redis.models import AudioChunkEnvelope, AudioChunkModel
+
+USER_ID = uuid4()
+MEETING_ID = "abc-defg-hij"
+DURATION_SEC = 3
+
+
+def former_path(chunk: bytes, number: int, ts: int) -> datetime:
+    # streamqueue: endpoint + ExtensionProcessor.process_audio + AudioChunkDAL.add_chunk
+    server_datetime = parser.parse(datetime.utcnow().isoformat()).astimezone(UTC)
+    user_timestamp = parser.parse(datetime.utcfromtimestamp(ts).isoformat()).astimezone(UTC).isoformat()
+    model = AudioChunkModel(
+        chunk=chunk,
+        user_timestamp=user_timestamp,
+        server_timestamp=server_datetime.isoformat(),
+        meeting_id=MEETING_ID,
+        user_id=USER_ID,
+        audio_chunk_duration_sec=DURATION_SEC,
+        audio_chunk_number=number,
+    )
+    stored = AudioChunkModel(**model.model_dump())
+    meta = stored.model_dump_json(exclude={"chunk"})
+
+    # audio processor: AudioChunkDAL.read_chunks + Processor.writestream2file
+    chunk_data = json.loads(meta)
+    chunk_data["chunk"] = chunk
+    read = AudioChunkModel(**chunk_data)
+    datetime.fromisoformat(read.server_timestamp.rstrip("Z")).astimezone(timezone.utc)
+    datetime.fromisoformat(read.user_timestamp.rstrip("Z")).astimezone(timezone.utc)
+    return datetime.fromisoformat(read.user_timestamp.rstrip("Z")).astimezone(timezone.utc)
+
+
+def envelope_path(chunk: bytes, number: int, ts: int) -> datetime:
+    # streamqueue: endpoint + ExtensionProcessor.build_audio_chunk + AudioChunkDAL.add_chunks
+    server_timestamp_ms = int(time.time() * 1000)
+    envelope = AudioChunkEnvelope(
+        chunk=chunk,
+        user_id=str(USER_ID),
+        meeting_id=MEETING_ID,
+        audio_chunk_number=number,
+        user_timestamp_ms=ts * 1000,
+        server_timestamp_ms=server_timestamp_ms,
+        audio_chunk_duration_ms=DURATION_SEC * 1000,
+    )
+    meta = envelope.encode_meta()
+
+    # audio processor: AudioChunkDAL.read_chunks (+ a datetime, the processor needs them per batch only)
+    return AudioChunkEnvelope.decode(chunk, meta).user_datetime
+
+
+def measure(path, chunks: int, chunk: bytes) -> float:
+    """Returns microseconds per chunk."""
+    ts = int(time.time())
+    start = time.perf_counter()
+    for number in range(chunks):
+        path(chunk, number, ts)
+    return (time.perf_counter() - start) / chunks * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--chunks", type=int, default=20000)
+    arg_parser.add_argument("--chunk-size", type=int, default=3000, help="bytes per chunk")
+    args = arg_parser.parse_args()
+
+    chunk = bytes(args.chunk_size)
+    for path in (former_path, envelope_path):  # warm-up
+        measure(path, 1000, chunk)
+
+    former = measure(former_path, args.chunks, chunk)
+    envelope = measure(envelope_path, args.chunks, chunk)
+
+    print(f"chunks: {args.chunks}, chunk size: {args.chunk_size} bytes")
+    print(f"former (pydantic x3, ISO timestamps): {former:8.2f} us/chunk")
+    print(f"envelope (packed, epoch ms):          {envelope:8.2f} us/chunk")
+    print(f"speedup: {former / envelope:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""Synthetic Chrome extension load against the streamqueue app, in-process.
+
+Simulates ``--meetings`` x ``--participants`` extensions. Each one is a connection of its own user that sends an audio
+chunk every ``--chunk-interval`` seconds (``PUT /extension/audio``) and the speakers bitstrings every
+``--speakers-interval`` seconds (``PUT /extension/speakers``). Requests go through ``create_app()`` (auth, admission
+control, DALs) via ``httpx.ASGITransport``, so only the HTTP server itself is left out.
+
+Reports throughput, p50/p95/p99 latency, response statuses (e.g. 429 from admission control) and Redis commands /
+round-trips per request of each endpoint (counted on the client; with ``--redis local`` the server's
+``INFO commandstats`` is reported as well).
+
+Usage (environment as for streamqueue, e.g. ``set -a; . ./.env; set +a``):
+    python -m benchmarks.ingest_load [--meetings 20] [--participants 5] [--duration 30] [--redis fake|local]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+from redis.asyncio.client import Pipeline, Redis
+
+from shared_lib.redis.dals.admin_dal import AdminDAL
+from streamqueue import main as streamqueue_main
+from streamqueue.settings import settings
+
+
+current_endpoint: contextvars.ContextVar = contextvars.ContextVar("current_endpoint", default="other")
+
+
+class RedisCounter:
+    """Counts commands and round-trips issued by every ``redis.asyncio`` client of the process, per endpoint.
+
+    ``ASGITransport`` runs the app in the task of the request, so the endpoint set by the participant is visible here.
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, int] = defaultdict(int)
+        self.round_trips: Dict[str, int] = defaultdict(int)
+
+    def install(self) -> None:
+        execute_command = Redis.execute_command
+        execute_pipeline = Pipeline.execute
+        counter = self
+
+        async def counted_execute_command(client, *args, **options):
+            counter.commands[current_endpoint.get()] += 1
+            counter.round_trips[current_endpoint.get()] += 1
+            return await execute_command(client, *args, **options)
+
+        async def counted_execute_pipeline(pipe, *args, **kwargs):
+            counter.commands[current_endpoint.get()] += len(pipe.command_stack)
+            counter.round_trips[current_endpoint.get()] += 1
+            return await execute_pipeline(pipe, *args, **kwargs)
+
+        Redis.execute_command = counted_execute_command
+        Pipeline.execute = counted_execute_pipeline
+
+    def reset(self) -> None:
+        self.commands.clear()
+        self.round_trips.clear()
+
+
+async def server_command_calls(redis_client: Redis) -> int:
+    stats = await redis_client.info("commandstats")
+    return sum(value["calls"] for value in stats.values())
+
+
+class Participant:
+    def __init__(self, client: httpx.AsyncClient, token: str, meeting_id: str, name: str, args: argparse.Namespace):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.connection_id = str(uuid.uuid4())
+        self.meeting_id = meeting_id
+        self.name = name
+        self.args = args
+
+    async def run(self, deadline: float, results: Dict[str, List[float]], statuses: Dict[str, Dict[int, int]]) -> None:
+        await asyncio.sleep(random.uniform(0, self.args.chunk_interval))  # extensions are not in sync
+        await asyncio.gather(self._send_audio(deadline, results, statuses), self._send_speakers(deadline, results, statuses))
+
+    async def _send_audio(self, deadline: float, results, statuses) -> None:
+        chunk = random.randbytes(self.args.chunk_bytes)
+        number = 0
+        while time.monotonic() < deadline:
+            await self._request(
+                "audio",
+                f"/api/v1/extension/audio?i={number}&connection_id={self.connection_id}"
+                f"&meeting_id={self.meeting_id}&ts={int(time.time())}",
+                chunk,
+                results,
+                statuses,
+            )
+            number += 1
+            await asyncio.sleep(self.args.chunk_interval)
+
+    async def _send_speakers(self, deadline: float, results, statuses) -> None:
+        while time.monotonic() < deadline:
+            bits = "".join(random.choice("01") for _ in range(10))
+            await self._request(
+                "speakers",
+                f"/api/v1/extension/speakers?connection_id={self.connection_id}"
+                f"&meeting_id={self.meeting_id}&ts={int(time.time())}",
+                json.dumps([[self.name, bits]]).encode(),
+                results,
+                statuses,
+            )
+            await asyncio.sleep(self.args.speakers_interval)
+
+    async def _request(self, endpoint: str, url: str, body: bytes, results, statuses) -> None:
+        current_endpoint.set(endpoint)
+        start = time.perf_counter()
+        response = await self.client.put(url, content=body, headers=self.headers)
+        results[endpoint].append(time.perf_counter() - start)
+        statuses[endpoint][response.status_code] += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.redis == "fake":
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        streamqueue_main._create_redis = lambda db, decode_responses: fakeredis.FakeAsyncRedis(
+            server=server, db=db, decode_responses=decode_responses
+        )
+
+    counter = RedisCounter()
+    counter.install()
+
+    app = streamqueue_main.create_app()
+    async with app.router.lifespan_context(app):
+        admin_dal = AdminDAL(app.state.admin_redis)
+        participants = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://streamqueue") as client:
+            for meeting in range(args.meetings):
+                meeting_id = f"bench-{meeting:04d}"
+                for participant in range(args.participants):
+                    token = f"bench-token-{uuid.uuid4()}"
+                    await admin_dal.add_token(token, str(uuid.uuid4()), True)
+                    participants.append(Participant(client, token, meeting_id, f"Speaker {participant}", args))
+
+            server_calls = await server_command_calls(app.state.redis) if args.redis == "local" else None
+            counter.reset()
+            results: Dict[str, List[float]] = defaultdict(list)
+            statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+            started = time.monotonic()
+            await asyncio.gather(*(p.run(started + args.duration, results, statuses) for p in participants))
+            elapsed = time.monotonic() - started
+
+            if server_calls is not None:
+                server_calls = await server_command_calls(app.state.redis) - server_calls
+
+    print(f"participants: {len(participants)} ({args.meetings} meetings x {args.participants}), {elapsed:.1f}s")
+    for endpoint, latencies in sorted(results.items()):
+        print(
+            f"{endpoint:>9}: {len(latencies) / elapsed:8.1f} req/s"
+            f"  p50 {percentile(latencies, 0.50) * 1000:7.2f} ms"
+            f"  p95 {percentile(latencies, 0.95) * 1000:7.2f} ms"
+            f"  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms"
+            f"  redis {counter.commands[endpoint] / len(latencies):5.2f} cmd"
+            f" / {counter.round_trips[endpoint] / len(latencies):5.2f} rtt per request"
+            f"  statuses {dict(statuses[endpoint])}"
+        )
+
+    if server_calls is not None:
+        chunks = len(results["audio"]) or 1
+        print(f"redis (server, all endpoints): {server_calls / chunks:.2f} commands per audio chunk")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--meetings", type=int, default=20)
+    arg_parser.add_argument("--participants", type=int, default=5, help="participants per meeting")
+    arg_parser.add_argument("--duration", type=float, default=30, help="seconds")
+    arg_parser.add_argument("--chunk-interval", type=float, default=settings.audio_chunk_duration_sec)
+    arg_parser.add_argument("--chunk-bytes", type=int, default=None, help="default: 4 KB per second of audio")
+    arg_parser.add_argument("--speakers-interval", type=float, default=1)
+    arg_parser.add_argument("--redis", choices=("fake", "local"), default="fake",
+                            help="fakeredis stand-in or the Redis configured by REDIS_* variables")
+    args = arg_parser.parse_args()
+    if args.chunk_bytes is None:
+        args.chunk_bytes = int(args.chunk_interval * 4000)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
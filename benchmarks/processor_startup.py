@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Startup time of the audio processor (parse_stream) with audio buffers left in Redis by a previous run.
+
+Fills Redis with ``--buffers`` ``audio_buffer:*`` keys of ``--buffer-kb`` each (plus their last-updated keys), then
+measures ``Processor.setup``, which only indexes them, and, for comparison, loading every buffer as the former
+startup did (one ``GET`` per buffer). Reports wall time, Redis commands / round-trips (counted on the client) and the
+audio bytes held in memory after each step.
+
+Usage (environment as for the audio processor, e.g. ``set -a; . ./.env; set +a``):
+    python -m benchmarks.processor_startup [--buffers 500] [--buffer-kb 256] [--redis fake|local]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+from redis.asyncio.client import Pipeline, Redis
+
+from app.services.audio import processor as processor_module
+from app.services.audio.audio import WEBM_MAGIC
+from app.services.audio.processor import Processor
+from shared_lib.redis.keys import AUDIO_BUFFER, AUDIO_BUFFER_LAST_UPDATED
+
+CONNECTION_PREFIX = "bench-startup"
+
+
+async def fill(redis_client: Redis, args: argparse.Namespace) -> None:
+    now = datetime.now(timezone.utc).isoformat()
+    data = WEBM_MAGIC + random.randbytes(args.buffer_kb * 1024 - len(WEBM_MAGIC))
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for i in range(args.buffers):
+            connection_id = f"{CONNECTION_PREFIX}-{i:05d}"
+            pipe.set(f"{AUDIO_BUFFER}:{connection_id}", data, ex=3600)
+            pipe.set(f"{AUDIO_BUFFER_LAST_UPDATED}:{connection_id}", now, ex=3600)
+        await pipe.execute()
+
+
+async def cleanup(redis_client: Redis) -> None:
+    for pattern in (f"{AUDIO_BUFFER}:{CONNECTION_PREFIX}-*", f"{AUDIO_BUFFER_LAST_UPDATED}:{CONNECTION_PREFIX}-*"):
+        keys = [key async for key in redis_client.scan_iter(match=pattern)]
+        if keys:
+            await redis_client.delete(*keys)
+
+
+class RedisCounter:
+    """Counts commands and round-trips issued by every ``redis.asyncio`` client of the process."""
+
+    def __init__(self):
+        self.commands = 0
+        self.round_trips = 0
+
+    def install(self) -> None:
+        execute_command = Redis.execute_command
+        execute_pipeline = Pipeline.execute
+        counter = self
+
+        async def counted_execute_command(client, *args, **options):
+            counter.commands += 1
+            counter.round_trips += 1
+            return await execute_command(client, *args, **options)
+
+        async def counted_execute_pipeline(pipe, *args, **kwargs):
+            counter.commands += len(pipe.command_stack)
+            counter.round_trips += 1
+            return await execute_pipeline(pipe, *args, **kwargs)
+
+        Redis.execute_command = counted_execute_command
+        Pipeline.execute = counted_execute_pipeline
+
+
+async def measure(label: str, coroutine, counter: RedisCounter, processor: Processor) -> None:
+    commands, round_trips = counter.commands, counter.round_trips
+    start = time.perf_counter()
+    await coroutine
+    elapsed = time.perf_counter() - start
+    stats = processor._Processor__buffers.stats()
+    print(
+        f"{label:>18}: {elapsed * 1000:9.1f} ms  redis {counter.commands - commands:6d} cmd"
+        f" / {counter.round_trips - round_trips:6d} rtt  in memory {stats['memory_bytes'] / 1024 / 1024:8.1f} MB"
+        f"  {stats}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.redis == "fake":
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+
+        async def get_redis_client(host, port, password=None, db=0, decode_responses=True):
+            return fakeredis.FakeAsyncRedis(server=server, db=db, decode_responses=decode_responses)
+
+        processor_module.get_redis_client = get_redis_client
+
+    audio_redis = await processor_module.get_redis_client(
+        processor_module.settings.redis_host,
+        processor_module.settings.redis_port,
+        processor_module.settings.redis_password,
+        decode_responses=False,
+    )
+    await fill(audio_redis, args)
+    counter = RedisCounter()
+    counter.install()
+    try:
+        processor = Processor()
+        await measure("setup (index)", processor.setup(), counter, processor)
+
+        async def load_all():
+            for i in range(args.buffers):
+                await processor._restore_audio_buffer(f"{CONNECTION_PREFIX}-{i:05d}")
+
+        await measure("load all (former)", load_all(), counter, processor)
+    finally:
+        await cleanup(audio_redis)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--buffers", type=int, default=500, help="audio buffers left in Redis")
+    arg_parser.add_argument("--buffer-kb", type=int, default=256, help="size of each buffer (keep the total within "
+                                                                       "AUDIO_BUFFER_MEMORY_BUDGET_MB)")
+    arg_parser.add_argument("--redis", choices=("fake", "local"), default="fake",
+                            help="fakeredis stand-in or the Redis configured by REDIS_* variables")
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
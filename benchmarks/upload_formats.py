@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Encode time and payload size of the audio uploaded to the Whisper service, per ``WHISPER_UPLOAD_FORMAT``.
+
+Encodes a decoded slice (16 kHz mono s16le, as returned by the decoder pool and the PCM store) with
+``AudioSlicer.export_data`` in every format of ``UPLOAD_FORMATS``. The former upload (MP3 at 48 kHz stereo, the
+source format of MediaRecorder audio) is measured as well. ``flac`` and ``mp3`` are encoded by ffmpeg and reported as
+unavailable without it.
+
+Usage:
+    python -m benchmarks.upload_formats [--seconds 30] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+from app.services.audio.audio import UPLOAD_FORMATS, AudioSlicer
+from app.services.audio.pcm import PCM_SAMPLE_RATE
+
+
+def speech_like(seconds: float) -> bytes:
+    """Amplitude-modulated harmonics with noise, closer to speech than silence for lossless codecs."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * PCM_SAMPLE_RATE)) / PCM_SAMPLE_RATE
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    signal = voice * envelope * 0.2 + rng.normal(0, 0.01, t.size)
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+async def measure(slicer: AudioSlicer, format: str, repeat: int):
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            data = await slicer.export_data(format=format)
+        return (time.perf_counter() - start) / repeat, len(data)
+    except Exception as e:  # ffmpeg is missing
+        return None, str(e).splitlines()[0] if str(e) else type(e).__name__
+
+
+async def run(args: argparse.Namespace) -> None:
+    slicer = AudioSlicer.from_pcm(speech_like(args.seconds))
+    former = AudioSlicer(format="mp3")
+    former.audio = slicer.audio.set_frame_rate(48000).set_channels(2)
+
+    print(f"slice: {args.seconds} s, repeat: {args.repeat}")
+    rows = [(format, slicer, format) for format in UPLOAD_FORMATS] + [("mp3 48k stereo (former)", former, "mp3")]
+    for label, source, format in rows:
+        elapsed, size = await measure(source, format, args.repeat)
+        if elapsed is None:
+            print(f"{label:>24}: unavailable ({size})")
+        else:
+            kbit_per_sec = size * 8 / args.seconds / 1000
+            print(f"{label:>24}: {elapsed * 1000:8.1f} ms  {size / 1024:8.1f} KiB  {kbit_per_sec:7.1f} kbit/s")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--seconds", type=float, default=30, help="duration of the slice")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,70 @@
 from typing import Optional, Union
 
 from redis.asyncio.client import Redis
+from redis.asyncio.connection import BlockingConnectionPool
 from shared_lib.redis.exceptions import RedisConnectionError    
 from redis.exceptions import ConnectionError
 
-async def get_redis_client(host: str, port: int, password: Optional[str] = None, db: Union[str, int] = 0) -> Redis: #database 0 will be for streamqueue
+async def get_redis_client(
+    host: str,
+    port: int,
+    password: Optional[str] = None,
+    db: Union[str, int] = 0,  # database 0 will be for streamqueue
+    decode_responses: bool = True,  # False for binary-safe clients (raw audio bytes)
+) -> Redis:
     """ToDo."""
     try:
         # import redis.asyncio as aioredis
         # redis_client = await aioredis.from_url(f"redis://{host}:{port}/0", decode_responses=True)
-        redis_client = Redis(host=host, port=port, password=password, db=db, decode_responses=True)
+        redis_client = Redis(host=host, port=port, password=password, db=db, decode_responses=decode_responses)
         await redis_client.ping()
 
     except ConnectionError:
         raise RedisConnectionError("Redis connection error. Check if the connection configuration is correct")
 
     return redis_client
+
+
+def create_redis_pool(
+    host: str,
+    port: int,
+    password: Optional[str] = None,
+    db: Union[str, int] = 0,
+    decode_responses: bool = True,
+    max_connections: int = 50,
+    pool_timeout: Optional[float] = 5,
+    health_check_interval: int = 30,
+    socket_timeout: Optional[float] = None,
+) -> Redis:
+    """Create a long-lived Redis client backed by a bounded connection pool.
+
+    Unlike ``get_redis_client`` nothing is sent to the server here: connections are opened lazily, reused across
+    requests and checked with ``PING`` only after ``health_check_interval`` seconds of idleness.
+
+    Args:
+        host: Redis host.
+        port: Redis port.
+        password: Redis password.
+        db: Database number.
+        decode_responses: False for binary-safe clients (raw audio bytes).
+        max_connections: Pool size. When all connections are busy callers wait up to ``pool_timeout`` seconds.
+        pool_timeout: Seconds to wait for a free connection (None waits forever).
+        health_check_interval: Seconds of idleness after which a connection is pinged before reuse.
+        socket_timeout: Socket read/write timeout in seconds.
+
+    Returns:
+        Redis client; close it with ``await client.aclose()``.
+
+    """
+    pool = BlockingConnectionPool(
+        host=host,
+        port=port,
+        password=password,
+        db=db,
+        decode_responses=decode_responses,
+        max_connections=max_connections,
+        timeout=pool_timeout,
+        health_check_interval=health_check_interval,
+        socket_timeout=socket_timeout,
+    )
+    return Redis.from_pool(pool)  # the client owns the pool and closes it on aclose()
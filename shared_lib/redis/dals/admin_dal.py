@@ -1,20 +1,28 @@
 """Module for basic work with Redis admin database (n=1)."""
+import json
 import logging
 from typing import Optional
 
 from shared_lib.redis.dals.base import BaseDAL
 from shared_lib.redis.exceptions import UserTokenAlreadyExist
-from shared_lib.redis.keys import TOKEN_USER_MAP, USER_ENABLE_STATUS_MAP
+from shared_lib.redis.keys import ADMIN_CHANGES_CHANNEL, TOKEN_USER_MAP, USER_ENABLE_STATUS_MAP
 
 logger = logging.getLogger(__name__)
 
 
 class AdminDAL(BaseDAL):
-    """Class for basic work with Redis admin database (n=1)."""
+    """Class for basic work with Redis admin database (n=1).
+
+    Notes:
+        Every change is announced on ``ADMIN_CHANGES_CHANNEL`` so that in-process caches
+        (see ``streamqueue.api.auth.token_cache``) can drop stale entries immediately.
+
+    """
 
     async def add_token(self, token: str, user_id: str, enable: bool) -> None:
         if await self.get_user_from_token(token) is None:
             await self._redis_client.hset(TOKEN_USER_MAP, token, user_id)
+            await self._publish_change(token=token)
             await self.set_user_enable_status(user_id, enable)
 
         else:
@@ -22,6 +30,7 @@ class AdminDAL(BaseDAL):
 
     async def set_user_enable_status(self, user_id: str, enable_status: bool) -> None:
         await self._redis_client.hset(USER_ENABLE_STATUS_MAP, user_id, str(int(enable_status)))
+        await self._publish_change(user_id=user_id)
 
     async def is_user_enabled(self, user_id: str) -> bool:
         enable_status = await self._redis_client.hget(USER_ENABLE_STATUS_MAP, user_id)
@@ -29,3 +38,14 @@ class AdminDAL(BaseDAL):
 
     async def get_user_from_token(self, token: str) -> Optional[str]:
         return await self._redis_client.hget(TOKEN_USER_MAP, token)
+
+    async def flush(self) -> None:
+        """Deletes all tokens and enable statuses."""
+        await self._redis_client.flushdb()
+        await self._publish_change(flushed=True)
+
+    async def _publish_change(
+        self, token: Optional[str] = None, user_id: Optional[str] = None, flushed: bool = False
+    ) -> None:
+        change = {"token": token, "user_id": user_id, "flushed": flushed}
+        await self._redis_client.publish(ADMIN_CHANGES_CHANNEL, json.dumps(change))
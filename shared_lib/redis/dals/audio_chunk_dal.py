@@ -1,50 +1,257 @@
-"""Module for basic work with Redis by audio-chunk keys."""
+"""Module for basic work with Redis by audio-chunk keys.
+
+Notes:
+    Audio chunks of a connection are entries of the Redis Stream ``initialFeed_audio:{connection_id}``, each holding
+    the raw chunk bytes (``chunk`` field) and the packed ``AudioChunkEnvelope`` metadata (``env`` field). Entries
+    queued by older versions carry JSON metadata in a ``meta`` field instead and are still read. The client must be
+    created with ``decode_responses=False``.
+
+    Ingest registers the connection in ``initialFeed_audio_connections``, so consumers find work without SCAN, and
+    marks it in the ``initialFeed_audio_ready`` sorted set, which consumers block on (``wait_ready_connections``)
+    instead of polling. A consumer pops a connection before reading its stream, so chunks added meanwhile mark it
+    again and no wake-up is lost. A consumer that gets a connection owned by another one passes it to the owner's
+    ``initialFeed_audio_ready:{consumer}`` set, which the owner waits on first.
+    Consumers read through the ``INITIAL_FEED_AUDIO_GROUP`` consumer group and acknowledge (and delete) entries only
+    after they have been persisted; entries left pending by a crashed consumer are reclaimed with XAUTOCLAIM.
+
+    ``initialFeed_audio_backlog`` counts the entries of all streams (incremented on add, decremented by the number of
+    entries actually deleted on ack) and is used for ingest admission control.
+
+"""
+import json
+import logging
+import time
 from typing import List, Optional, Tuple
 
+from redis.exceptions import ResponseError, WatchError
+
 from shared_lib.redis.dals.base import BaseDAL
-from shared_lib.redis.keys import INITIAL_FEED_AUDIO
-from shared_lib.redis.models import AudioChunkModel
+from shared_lib.redis.keys import (
+    INGEST_RATE,
+    INITIAL_FEED_AUDIO,
+    INITIAL_FEED_AUDIO_BACKLOG,
+    INITIAL_FEED_AUDIO_CONNECTIONS,
+    INITIAL_FEED_AUDIO_GROUP,
+    INITIAL_FEED_AUDIO_READY,
+)
+from shared_lib.redis.models import AudioChunkEnvelope, AudioChunkModel
+
+logger = logging.getLogger(__name__)
 
 
 class AudioChunkDAL(BaseDAL):
     """Class for basic work with Redis by audio-chunk keys."""
 
-    async def get_chunks_connections(self, pattern="*", min_length=1) -> List[Tuple[str, int]]:
+    async def get_chunks_connections(self) -> List[str]:
+        """Returns connections that have (or recently had) queued audio chunks."""
+        connection_ids = await self._redis_client.smembers(INITIAL_FEED_AUDIO_CONNECTIONS)
+        return [c.decode() if isinstance(c, bytes) else c for c in connection_ids]
+
+    async def wait_ready_connections(
+        self, timeout_sec: float, limit: int = 100, consumer: Optional[str] = None
+    ) -> List[str]:
+        """Pops connections marked ready, oldest first, waiting up to ``timeout_sec`` for one.
+
+        Args:
+            timeout_sec: Seconds to block when no connection is ready (0 - do not block).
+            limit: Maximum number of connections to return.
+            consumer: Name of the consumer, connections passed to it are popped first.
+
+        Returns:
+            Connection IDs, empty on timeout.
+
         """
-        Finds queues that match a given pattern and have a minimum number of items.
+        keys = ([f"{INITIAL_FEED_AUDIO_READY}:{consumer}"] if consumer else []) + [INITIAL_FEED_AUDIO_READY]
+
+        ready = []
+        for key in keys:
+            ready += await self._redis_client.zpopmin(key, limit - len(ready))
+        if not ready and timeout_sec > 0:
+            popped = await self._redis_client.bzpopmin(keys, timeout=timeout_sec)
+            if popped:
+                ready = [popped[1:]]
+                for key in keys:
+                    if len(ready) < limit:
+                        ready += await self._redis_client.zpopmin(key, limit - len(ready))
+
+        return list(dict.fromkeys(c.decode() if isinstance(c, bytes) else c for c, _ in ready))
+
+    async def mark_ready(self, connection_id: str, consumer: Optional[str] = None) -> None:
+        """Marks the connection ready again, e.g. when more chunks are left than one read returns.
+
+        Args:
+            connection_id: Connection ID.
+            consumer: Consumer the connection is passed to (any consumer if not set).
+
+        """
+        key = f"{INITIAL_FEED_AUDIO_READY}:{consumer}" if consumer else INITIAL_FEED_AUDIO_READY
+        await self._redis_client.zadd(key, {connection_id: time.time() * 1000}, nx=True)
+
+    async def read_chunks(
+        self,
+        connection_id: str,
+        consumer: str,
+        limit: int = 100,
+        claim_min_idle_ms: int = 30000,
+    ) -> List[Tuple[bytes, AudioChunkEnvelope]]:
+        """Reads chunks of the connection for the consumer in arrival order.
+
+        Entries that another consumer received but did not acknowledge within ``claim_min_idle_ms`` are
+        reclaimed first, then new entries are read.
+
+        Args:
+            connection_id: Connection ID.
+            consumer: Name of the consumer (unique per worker process).
+            limit: Maximum number of chunks to return.
+            claim_min_idle_ms: Idle time after which a pending entry is considered abandoned.
+
+        Returns:
+            List of (entry_id, chunk). Pass the entry ids to ``ack_chunks`` once the chunks are persisted.
+            Entries that can not be decoded are logged and dropped.
+
         """
-        matching_queues = []
-        cursor = "0"
-
-        while cursor != 0:
-            cursor, keys = await self._redis_client.scan(
-                cursor,
-                match=f"{INITIAL_FEED_AUDIO}:{pattern}",
-                count=min_length,
+        key = f"{INITIAL_FEED_AUDIO}:{connection_id}"
+
+        try:
+            _, claimed, *_ = await self._redis_client.xautoclaim(
+                key, INITIAL_FEED_AUDIO_GROUP, consumer, min_idle_time=claim_min_idle_ms, count=limit
+            )
+        except ResponseError as ex:
+            if "NOGROUP" not in str(ex):
+                raise
+            await self.create_group(connection_id)
+            claimed = []
+
+        entries = [entry for entry in claimed if entry and entry[1]]  # skip entries deleted meanwhile
+        if entries:
+            logger.warning(f"Reclaimed {len(entries)} pending chunk(s) of connection {connection_id}")
+
+        if len(entries) < limit:
+            response = await self._redis_client.xreadgroup(
+                INITIAL_FEED_AUDIO_GROUP, consumer, {key: ">"}, count=limit - len(entries)
             )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+
+        chunks, malformed = [], []
+        for entry_id, fields in entries:
+            try:
+                chunks.append((entry_id, self._load_chunk(fields)))
+            except (KeyError, ValueError) as ex:
+                logger.error(f"Dropping malformed chunk {entry_id} of connection {connection_id}: {ex}")
+                malformed.append(entry_id)
+
+        await self.ack_chunks(connection_id, malformed)
+        return chunks
+
+    async def ack_chunks(self, connection_id: str, entry_ids: List[bytes]) -> None:
+        """Acknowledges and deletes processed entries in one round-trip."""
+        if not entry_ids:
+            return
+
+        key = f"{INITIAL_FEED_AUDIO}:{connection_id}"
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(key, INITIAL_FEED_AUDIO_GROUP, *entry_ids)
+            pipe.xdel(key, *entry_ids)
+            _, deleted = await pipe.execute()
 
-            for key in keys:
-                length = await self._redis_client.llen(key)
+        if deleted:  # entries acknowledged twice (after a reclaim) are not subtracted again
+            await self._redis_client.decrby(INITIAL_FEED_AUDIO_BACKLOG, deleted)
 
-                if await self._redis_client.type(key) == "list" and await self._redis_client.llen(key) >= min_length:
-                    key = key.replace(f"{INITIAL_FEED_AUDIO}:", "")  # Remove the prefix
-                    matching_queues.append((key, length))
+    async def get_ingest_load(
+        self,
+        connection_id: str,
+        user_id: str,
+        chunks: int = 1,
+        rate_window_sec: int = 60,
+        now: Optional[float] = None,
+    ) -> Tuple[int, int, int]:
+        """Counts the incoming chunks against the user's rate and reads the queue sizes in one round-trip.
 
-        return matching_queues
+        Chunks that are refused afterwards are uncounted with ``uncount_ingest``.
+
+        Args:
+            connection_id: Connection ID.
+            user_id: User ID.
+            chunks: Number of chunks about to be added.
+            rate_window_sec: Length of the fixed window the user's rate is counted in.
+            now: Time the chunks are counted at (defaults to the current time).
+
+        Returns:
+            Chunks queued for the connection, chunks queued for all connections and chunks the user sent in the
+            current rate window (including ``chunks``).
 
-    async def pop_chunks(self, connection_id: str, limit: int = 1):
         """
-        Retrieves a specified number of audio chunks from this connection's queue
-        in a FIFO manner using RPOP.
+        rate_key = _ingest_rate_key(user_id, rate_window_sec, now)
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            pipe.xlen(f"{INITIAL_FEED_AUDIO}:{connection_id}")
+            pipe.get(INITIAL_FEED_AUDIO_BACKLOG)
+            pipe.incrby(rate_key, chunks)
+            pipe.expire(rate_key, rate_window_sec * 2)
+            queue_depth, backlog, user_rate, _ = await pipe.execute()
+
+        return queue_depth, max(int(backlog or 0), 0), user_rate
+
+    async def uncount_ingest(self, user_id: str, chunks: int, rate_window_sec: int, now: float) -> None:
+        """Removes refused chunks from the user's rate, counted by ``get_ingest_load`` at ``now``."""
+        await self._redis_client.decrby(_ingest_rate_key(user_id, rate_window_sec, now), chunks)
+
+    async def create_group(self, connection_id: str) -> None:
+        """Creates the consumer group of the connection's stream (reading from its very first entry)."""
+        try:
+            await self._redis_client.xgroup_create(
+                f"{INITIAL_FEED_AUDIO}:{connection_id}", INITIAL_FEED_AUDIO_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as ex:
+            if "BUSYGROUP" not in str(ex):
+                raise
+
+    async def remove_connection_if_drained(self, connection_id: str) -> bool:
+        """Deletes the connection's stream and unregisters it if no chunk is queued or pending.
+
+        The check and the delete are one optimistic transaction, a chunk added meanwhile aborts it.
         """
         key = f"{INITIAL_FEED_AUDIO}:{connection_id}"
-        chunks = await self.rpop_many(key, limit)
-        return chunks
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.xlen(key):
+                    return False
+
+                pipe.multi()
+                pipe.delete(key)
+                pipe.srem(INITIAL_FEED_AUDIO_CONNECTIONS, connection_id)
+                await pipe.execute()
+                return True
+
+            except WatchError:
+                return False
+
+    async def add_chunks(self, connection_id: str, chunks: List[AudioChunkEnvelope]) -> None:
+        """Writes chunks of one connection in a single round-trip (arrival order is kept)."""
+        if not chunks:
+            return
+
+        key = f"{INITIAL_FEED_AUDIO}:{connection_id}"
+        async with self._redis_client.pipeline(transaction=True) as pipe:
+            for chunk in chunks:
+                pipe.xadd(key, {"chunk": chunk.chunk, "env": chunk.encode_meta()})
+            pipe.sadd(INITIAL_FEED_AUDIO_CONNECTIONS, connection_id)
+            pipe.zadd(INITIAL_FEED_AUDIO_READY, {connection_id: time.time() * 1000}, nx=True)
+            pipe.incrby(INITIAL_FEED_AUDIO_BACKLOG, len(chunks))
+            await pipe.execute()
+
+    async def add_chunk(self, connection_id: str, chunk: AudioChunkEnvelope) -> None:
+        await self.add_chunks(connection_id, [chunk])
+
+    @staticmethod
+    def _load_chunk(fields: dict) -> AudioChunkEnvelope:
+        if b"env" in fields:
+            return AudioChunkEnvelope.decode(fields[b"chunk"], fields[b"env"])
+
+        # Queued by a version that stored JSON metadata
+        return AudioChunkEnvelope.from_model(AudioChunkModel(chunk=fields[b"chunk"], **json.loads(fields[b"meta"])))
+
 
-    async def add_chunk(self, connection_id: str, chunk_data: dict) -> None:
-        # Validate the data
-        chunk_model = AudioChunkModel(**chunk_data)
-        await self._redis_client.lpush(
-            f"{INITIAL_FEED_AUDIO}:{connection_id}", 
-            chunk_model.model_dump_json()
-        )
+def _ingest_rate_key(user_id: str, rate_window_sec: int, now: Optional[float] = None) -> str:
+    return f"{INGEST_RATE}:{user_id}:{int((time.time() if now is None else now) // rate_window_sec)}"
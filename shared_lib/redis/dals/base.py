@@ -1,8 +1,7 @@
 """Module for basic work with Redis (get value, put value, check connection)."""
 import json
 import logging
-from collections import defaultdict
-from typing import Any
+from typing import Any, Iterable, List
 
 from redis.asyncio.client import Redis
 
@@ -23,7 +22,7 @@ class BaseDAL:
         self._redis_client = client
 
     async def rpop_many_by_pattern(self, name: str, pattern: str = "*", min_length: int = 1, limit: int = 1) -> dict:
-        matching_queues = defaultdict(list)
+        """Pops up to ``limit`` items of every list matching ``{name}{pattern}`` (one pipeline for all of them)."""
         unique_keys = set()
         cursor = "0"
 
@@ -31,43 +30,58 @@ class BaseDAL:
             cursor, matched_keys = await self._redis_client.scan(cursor, match=f"{name}{pattern}", count=min_length)
             unique_keys.update(matched_keys)
 
-        for key in unique_keys:
-            for _ in range(limit):
-                value = await self._redis_client.rpop(key)
-                if value:
-                    matching_queues[key].append(value)
-                else:
-                    break  # Exit if the list becomes empty before reaching num_items
+        return await self.rpop_many_from_keys(list(unique_keys), limit)
 
-        return matching_queues
+    async def rpop_many_from_keys(self, keys: List[str], limit: int = 1) -> dict:
+        """Pops up to ``limit`` items of each list in one round-trip.
+
+        Returns:
+            Popped items (oldest first) by key, keys of empty lists are left out.
+
+        """
+        if not keys:
+            return {}
+
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.rpop(key, limit)
+            results = await pipe.execute()
+
+        return {key: values for key, values in zip(keys, results) if values}
 
     async def rpop_many(self, key: str, limit: int = 1, json_load: bool = True, raise_exception: bool = False) -> Any:
-        """Retrieves a specified number of audio chunks from this connection's queue in a FIFO manner using RPOP.
+        """Retrieves a specified number of items from the list in a FIFO manner with a single ``RPOP key count``.
 
         Args:
             key: Key for getting data.
-            limit: ToDo.
-            json_load: ToDo.
-            raise_exception: ToDo.
+            limit: Maximum number of items to pop.
+            json_load: Whether to load the items from JSON.
+            raise_exception: Whether to raise if the list is empty.
 
         Returns:
             Data from redis converted to JSON.
 
+        Raises:
+            DataNotFoundError: The list is empty and ``raise_exception`` is set.
+
         """
-        # ToDo:
-        #  if error put data in redis again
-        #  if error_count > 5 put data in difference
-        chunks = []
-
-        # Continuously remove items from the right end of the list (end of the list)
-        for _ in range(limit):
-            chunk = await self._redis_client.rpop(key)
-            if chunk:
-                chunks.append(json.loads(chunk) if json_load else chunk)
-            else:
-                break  # Exit if the list becomes empty before reaching num_items
+        chunks = await self._redis_client.rpop(key, limit) or []
+        if json_load:
+            chunks = [json.loads(chunk) for chunk in chunks]
 
         if not chunks and raise_exception:
             raise DataNotFoundError(f"Data for '{key}' not found")
 
         return chunks
+
+    async def lpush_many(self, key: str, values: Iterable[Any], json_dump: bool = True) -> int:
+        """Pushes the values in order with a single multi-value ``LPUSH`` (they are popped back in the same order).
+
+        Returns:
+            Length of the list after the push.
+
+        """
+        values = [json.dumps(value, default=str) if json_dump else value for value in values]
+        if not values:
+            return 0
+        return await self._redis_client.lpush(key, *values)
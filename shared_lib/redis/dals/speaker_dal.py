@@ -17,5 +17,10 @@ class SpeakerDAL(BaseDAL):
             speaker_model.model_dump_json()
         )
 
+    async def add_speakers_data(self, speakers: List[SpeakerDataModel]) -> None:
+        """Writes already validated speaker entries with a single multi-value LPUSH (one round-trip per batch)."""
+        if speakers:
+            await self._redis_client.lpush(SPEAKER_DATA, *(speaker.model_dump_json() for speaker in speakers))
+
     async def pop_chunks(self, limit: int = 1) -> List[dict]:
         return await self.rpop_many(SPEAKER_DATA, limit, json_load=True)
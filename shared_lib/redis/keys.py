@@ -2,8 +2,18 @@
 
 TOKEN_USER_MAP = "token_user_map"  # get user_id by token
 USER_ENABLE_STATUS_MAP = "user_enable_status_map"  # get user's enable status by user_id
-INITIAL_FEED_AUDIO = "initialFeed_audio"  # "audio data (Example: initialFeed_audio:{self.id})
+INITIAL_FEED_AUDIO = "initialFeed_audio"  # Stream of raw audio chunks + metadata (Example: initialFeed_audio:{self.id})
+INITIAL_FEED_AUDIO_CONNECTIONS = "initialFeed_audio_connections"  # Set of connection ids with an audio stream
+INITIAL_FEED_AUDIO_GROUP = "parse_stream"  # Consumer group reading initialFeed_audio:* streams
+INITIAL_FEED_AUDIO_READY = "initialFeed_audio_ready"  # Sorted set of connections with new chunks (score: first ms)
+INITIAL_FEED_AUDIO_BACKLOG = "initialFeed_audio_backlog"  # Number of chunks queued in all initialFeed_audio:* streams
+INGEST_RATE = "ingest_rate"  # Chunks sent by a user in a rate window (Example: ingest_rate:{user_id}:{window})
+
+AUDIO_CONNECTION_LEASE = "audio_connection_lease"  # parse_stream process owning a connection (Example: audio_connection_lease:{connection_id})
 
 SPEAKER_DATA = "speaker_data"
-AUDIO_BUFFER = "audio_buffer"  # In-memory audio buffer storage (Example: audio_buffer:{connection_id})
+AUDIO_BUFFER = "audio_buffer"  # Raw (binary) audio buffer storage (Example: audio_buffer:{connection_id})
 AUDIO_BUFFER_LAST_UPDATED = "audio_buffer_last_updated"  # Timestamp when buffer was last updated (Example: audio_buffer_last_updated:{connection_id})
+AUDIO_BUFFER_LAST_ENTRY = "audio_buffer_last_entry"  # Id of the last stream entry appended to the buffer (Example: audio_buffer_last_entry:{connection_id})
+
+ADMIN_CHANGES_CHANNEL = "admin_changes"  # Pub/Sub channel (DB 1) notified on token / enable status changes
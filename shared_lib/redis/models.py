@@ -1,5 +1,7 @@
-"""Pydantic models for Redis data validation."""
-from datetime import datetime
+"""Pydantic models for Redis data validation and the packed audio chunk envelope."""
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Optional, List, Any, Dict, Union
 from uuid import UUID
 
@@ -7,8 +9,12 @@ from pydantic import BaseModel, Field, field_validator
 
 
 class AudioChunkModel(BaseModel):
-    """Model for audio chunk data validation."""
-    chunk: str
+    """Model for audio chunk data validation.
+
+    The raw ``chunk`` bytes are stored in Redis as-is, separately from the JSON metadata
+    (see ``AudioChunkDAL``), so no hex/base64 encoding is involved.
+    """
+    chunk: bytes
     user_timestamp: str
     server_timestamp: str
     meeting_id: Optional[str] = None
@@ -17,6 +23,84 @@ class AudioChunkModel(BaseModel):
     audio_chunk_number: int
 
 
+@dataclass(slots=True)
+class AudioChunkEnvelope:
+    """Audio chunk as queued from streamqueue to the audio processor.
+
+    Values are checked once, at the API edge (typed query parameters / WebSocket frame header), and travel in a packed
+    binary form (``encode_meta`` / ``decode``) instead of a pydantic model dumped to JSON with ISO timestamps. Both
+    timestamps are epoch milliseconds (UTC).
+    """
+    chunk: bytes
+    user_id: str
+    meeting_id: Optional[str]
+    audio_chunk_number: int
+    user_timestamp_ms: int
+    server_timestamp_ms: int
+    audio_chunk_duration_ms: int
+
+    # version, audio chunk number, user's timestamp, server's timestamp, chunk duration; then "user_id\0meeting_id"
+    HEADER = struct.Struct("!BIqqI")
+    VERSION = 1
+
+    @property
+    def user_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.user_timestamp_ms / 1000, tz=timezone.utc)
+
+    @property
+    def server_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.server_timestamp_ms / 1000, tz=timezone.utc)
+
+    @property
+    def audio_chunk_duration_sec(self) -> float:
+        return self.audio_chunk_duration_ms / 1000
+
+    def encode_meta(self) -> bytes:
+        """Packs everything but the chunk bytes."""
+        return self.HEADER.pack(
+            self.VERSION,
+            self.audio_chunk_number,
+            self.user_timestamp_ms,
+            self.server_timestamp_ms,
+            self.audio_chunk_duration_ms,
+        ) + f"{self.user_id}\0{self.meeting_id or ''}".encode()
+
+    @classmethod
+    def decode(cls, chunk: bytes, meta: bytes) -> "AudioChunkEnvelope":
+        """Inverse of ``encode_meta``.
+
+        Raises:
+            ValueError: Malformed or unsupported meta.
+
+        """
+        try:
+            version, number, user_ts, server_ts, duration = cls.HEADER.unpack_from(meta)
+            user_id, meeting_id = meta[cls.HEADER.size:].decode().split("\0")
+        except (struct.error, UnicodeDecodeError, ValueError) as ex:
+            raise ValueError(f"Malformed audio chunk meta: {ex}")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported audio chunk meta version: {version}")
+
+        return cls(chunk, user_id, meeting_id or None, number, user_ts, server_ts, duration)
+
+    @classmethod
+    def from_model(cls, model: AudioChunkModel) -> "AudioChunkEnvelope":
+        """Converts a chunk queued in the former JSON form (ISO timestamps)."""
+        return cls(
+            chunk=model.chunk,
+            user_id=str(model.user_id),
+            meeting_id=model.meeting_id,
+            audio_chunk_number=model.audio_chunk_number,
+            user_timestamp_ms=_iso_to_ms(model.user_timestamp),
+            server_timestamp_ms=_iso_to_ms(model.server_timestamp),
+            audio_chunk_duration_ms=int(model.audio_chunk_duration_sec * 1000),
+        )
+
+
+def _iso_to_ms(value: str) -> int:
+    return int(datetime.fromisoformat(value.rstrip("Z")).astimezone(timezone.utc).timestamp() * 1000)
+
+
 class SpeakerDataModel(BaseModel):
     """Model for speaker data validation."""
     speaker_name: str
@@ -0,0 +1,152 @@
+"""In-process cache of user tokens and enable statuses (admin database, n=1)."""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from redis.asyncio.client import Redis
+
+from shared_lib.redis.keys import ADMIN_CHANGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()  # sentinel: not cached (None is a valid cached value)
+
+
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return MISSING
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TokenCache:
+    """Cache of ``token -> user_id`` and ``user_id -> enabled`` lookups done by ``UserTokenAuth``.
+
+    Notes:
+        Entries are dropped as soon as ``AdminDAL`` announces a change on ``ADMIN_CHANGES_CHANNEL`` (see ``listen``).
+        The TTL bounds staleness if a notification is lost, e.g. while the subscription is reconnecting.
+
+    Attributes:
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that had to go to Redis.
+
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30):
+        self._users = _TTLCache(max_size, ttl)
+        self._statuses = _TTLCache(max_size, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def get_user(self, token: str) -> Any:
+        """Returns the cached user_id of the token or ``MISSING``."""
+        return self._count(self._users.get(token))
+
+    def set_user(self, token: str, user_id: str) -> None:
+        self._users.set(token, user_id)
+
+    def get_enabled(self, user_id: str) -> Any:
+        """Returns the cached enable status of the user or ``MISSING``."""
+        return self._count(self._statuses.get(user_id))
+
+    def set_enabled(self, user_id: str, enabled: bool) -> None:
+        self._statuses.set(user_id, enabled)
+
+    def invalidate(self, token: Optional[str] = None, user_id: Optional[str] = None) -> None:
+        if token is not None:
+            self._users.pop(token)
+        if user_id is not None:
+            self._statuses.pop(user_id)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._statuses.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens": len(self._users),
+            "users": len(self._statuses),
+        }
+
+    async def listen(self, redis_client: Redis, reconnect_delay_sec: float = 1) -> None:
+        """Apply change notifications published by ``AdminDAL`` until cancelled.
+
+        Args:
+            redis_client: Client of the admin database (n=1).
+            reconnect_delay_sec: Pause before re-subscribing after a connection error.
+
+        """
+        while True:
+            try:
+                async with redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(ADMIN_CHANGES_CHANNEL)
+                    # Changes made while we were not subscribed were never delivered
+                    self.clear()
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._apply_change(message["data"])
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as ex:
+                logger.warning(f"Token cache subscription lost [{type(ex)}]: {ex}")
+                self.clear()
+                await asyncio.sleep(reconnect_delay_sec)
+
+    def _apply_change(self, data: Any) -> None:
+        try:
+            change = json.loads(data)
+            if change.get("flushed"):
+                self.clear()
+            else:
+                self.invalidate(token=change.get("token"), user_id=change.get("user_id"))
+        except (TypeError, ValueError, AttributeError):
+            logger.warning(f"Unexpected admin change notification: {data!r}")
+            self.clear()
+
+    def _count(self, value: Any) -> Any:
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
@@ -3,10 +3,11 @@ from typing import Optional
 
 from fastapi import HTTPException, Request, status
 from fastapi.security import HTTPBearer
+from starlette.requests import HTTPConnection
 
-from shared_lib.redis.connection import get_redis_client
 from shared_lib.redis.dals.admin_dal import AdminDAL
-from streamqueue.settings import settings
+from streamqueue.api.auth.token_cache import MISSING
+from streamqueue.api.dependencies import get_admin_redis, get_token_cache
 
 
 class UserTokenAuth(HTTPBearer):
@@ -25,6 +26,7 @@ class UserTokenAuth(HTTPBearer):
 
         Notes:
             The token can be passed both in the request parameters and in the query parameters.
+            Lookups are served from the in-process ``TokenCache`` when possible.
 
         Args:
             request: All meta information about the request.
@@ -45,17 +47,44 @@ class UserTokenAuth(HTTPBearer):
 
             token = header_token.credentials
 
-        admin_dal = AdminDAL(
-            await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password, db=1)
-        )
-        user_id = await admin_dal.get_user_from_token(token)
+        request.state.user_id = await self.authenticate(request, token)
+        return True
+
+    async def authenticate(self, connection: HTTPConnection, token: str) -> str:
+        """Resolve the user of the token and check that the user is enabled.
+
+        Notes:
+            Shared by HTTP requests and WebSockets (which cannot use ``HTTPBearer``).
+
+        Args:
+            connection: Request or WebSocket.
+            token: User's token.
+
+        Returns:
+            user_id of the token.
+
+        Raises:
+            HTTPException (HTTP-401): The provided token is incorrect.
+            HTTPException (HTTP-403): The user is disabled.
+
+        """
+        admin_dal = AdminDAL(get_admin_redis(connection))
+        token_cache = get_token_cache(connection)
+
+        user_id = token_cache.get_user(token)
+        if user_id is MISSING:
+            user_id = await admin_dal.get_user_from_token(token)
+            if user_id:
+                token_cache.set_user(token, user_id)
 
         if user_id:
-            is_user_enabled = await admin_dal.is_user_enabled(user_id)
+            is_user_enabled = token_cache.get_enabled(user_id)
+            if is_user_enabled is MISSING:
+                is_user_enabled = await admin_dal.is_user_enabled(user_id)
+                token_cache.set_enabled(user_id, is_user_enabled)
 
             if is_user_enabled:
-                request.state.user_id = user_id
-                return True
+                return user_id
 
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbitten")
 
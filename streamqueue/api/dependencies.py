@@ -0,0 +1,44 @@
+"""Dependencies shared by the endpoints (process-wide Redis clients and caches)."""
+from redis.asyncio.client import Redis
+from starlette.requests import HTTPConnection
+
+from streamqueue.api.auth.token_cache import TokenCache
+
+
+def get_redis(connection: HTTPConnection) -> Redis:
+    """Binary-safe client of the streamqueue database (n=0).
+
+    Args:
+        connection: Request or WebSocket.
+
+    Returns:
+        Pooled Redis client created in the application lifespan.
+
+    """
+    return connection.app.state.redis
+
+
+def get_admin_redis(connection: HTTPConnection) -> Redis:
+    """Client of the admin database (n=1).
+
+    Args:
+        connection: Request or WebSocket.
+
+    Returns:
+        Pooled Redis client created in the application lifespan.
+
+    """
+    return connection.app.state.admin_redis
+
+
+def get_token_cache(connection: HTTPConnection) -> TokenCache:
+    """Process-wide cache of token and enable status lookups.
+
+    Args:
+        connection: Request or WebSocket.
+
+    Returns:
+        TokenCache created in the application lifespan.
+
+    """
+    return connection.app.state.token_cache
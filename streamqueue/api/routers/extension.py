@@ -2,19 +2,22 @@
 from datetime import datetime
 from typing import Optional
 import logging
+import time
 import uuid
 
 from dateutil import parser
 from dateutil.tz import UTC
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from redis.asyncio.client import Redis
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED, HTTP_429_TOO_MANY_REQUESTS
 
 from api.schemas import TokenValidationResult
 from api.schemas.extension import SourceType
-from shared_lib.redis.connection import get_redis_client
+from services.admission import AdmissionControl
 from services.extension_processor import ExtensionProcessor
-from streamqueue.settings import settings
+from services.utils.exceptions import IngestOverloadedError
+from streamqueue.api.dependencies import get_redis
 
 logger = logging.getLogger("app")
 router = APIRouter(prefix="/extension", tags=["extension"])
@@ -42,25 +45,32 @@ async def audio_endpoint(
     source: SourceType = SourceType.GOOGLE_MEET,  # ToDo: will be used later
     meeting_id: Optional[str] = None,
     ts: Optional[int] = None,  # user's timestamp
+    redis_client: Redis = Depends(get_redis),
 ) -> JSONResponse:
     # For chunk, and connection_start
-    server_datetime: datetime = parser.parse(datetime.utcnow().isoformat()).astimezone(UTC)
+    server_timestamp_ms = int(time.time() * 1000)
     user_id = request.state.user_id
+
+    try:
+        await AdmissionControl(redis_client).check_audio(user_id, connection_id)
+    except IngestOverloadedError as e:
+        logger.warning(f"Refused audio chunk {i} of connection {connection_id}: {e.message}")
+        return overloaded_response(e)
+
     data = await request.body()
 
     logger.info(f"Received audio chunk {i} for meeting {meeting_id} from user {user_id}")
     logger.debug(f"Audio details: connection_id={connection_id}, timestamp={ts}, size={len(data)}")
 
     try:
-        redis_client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password)
         extension_process = ExtensionProcessor(redis_client)
         await extension_process.process_audio(
             user_id=user_id,
             connection_id=connection_id,
             meeting_id=meeting_id,
             audio_chunk_number=i,
-            chunk=data.hex(),
-            server_datetime=server_datetime,
+            chunk=data,
+            server_timestamp_ms=server_timestamp_ms,
             user_timestamp=ts,
         )
         logger.info(f"Successfully processed audio chunk {i} for meeting {meeting_id}")
@@ -70,12 +80,29 @@ async def audio_endpoint(
         raise
 
 
+def overloaded_response(error: IngestOverloadedError) -> JSONResponse:
+    """429 telling the extension when to retry and which chunk interval to switch to."""
+    return JSONResponse(
+        status_code=HTTP_429_TOO_MANY_REQUESTS,
+        content={
+            "detail": error.message,
+            "retry_after_sec": error.retry_after_sec,
+            "suggested_chunk_interval_sec": error.suggested_chunk_interval_sec,
+        },
+        headers={
+            "Retry-After": str(error.retry_after_sec),
+            "X-Suggested-Chunk-Interval": str(error.suggested_chunk_interval_sec),
+        },
+    )
+
+
 @router.put("/speakers")
 async def speakers_speech(
     request: Request,
     connection_id: str,
     meeting_id: Optional[str] = None,
     ts: Optional[int] = None,  # user's timestamp
+    redis_client: Redis = Depends(get_redis),
 ) -> JSONResponse:
     server_datetime: datetime = parser.parse(datetime.utcnow().isoformat()).astimezone(UTC)
     user_id = request.state.user_id
@@ -83,13 +110,9 @@ async def speakers_speech(
     try:
         data = await request.json()
         logger.info(f"Received speakers data for meeting {meeting_id} from user {user_id}")
-        logger.info(f"Raw speakers data: {data}")
-        logger.info(f"Data type: {type(data)}")
-        if isinstance(data, list) and len(data) > 0:
-            logger.info(f"First item type: {type(data[0])}")
-            logger.info(f"First item: {data[0]}")
-        
-        redis_client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Raw speakers data: {data}")
+
         extension_process = ExtensionProcessor(redis_client)
         await extension_process.process_speakers_speech(
             user_id=user_id,
@@ -99,9 +122,9 @@ async def speakers_speech(
             server_datetime=server_datetime,
             user_timestamp=ts,
         )
-        logger.info(f"Successfully processed speakers data for meeting {meeting_id}")
+        logger.debug(f"Successfully processed speakers data for meeting {meeting_id}")
         return JSONResponse(status_code=HTTP_201_CREATED, content={"message": "Speaker created"})
     except Exception as e:
         logger.error(f"Error processing speakers data: {str(e)}", exc_info=True)
-        logger.error(f"Full request data: {await request.body()}")
+        logger.debug(f"Full request data: {await request.body()}")
         raise
@@ -0,0 +1,199 @@
+"""Persistent WebSocket ingest channel used by Chrome extension.
+
+Notes:
+    The socket is authenticated once, when it is opened (``token`` query parameter or ``Authorization: Bearer``
+    header), and then carries interleaved frames of one connection_id:
+
+    * binary frame - audio chunk: ``AUDIO_FRAME_HEADER`` (chunk number, user's timestamp - the same values as the ``i``
+      and ``ts`` query parameters of ``PUT /extension/audio``) followed by the raw chunk bytes;
+    * text frame - speakers: ``{"type": "speakers", "ts": 1719397023, "data": [["Speaker Name", "1001111111"], ...]}``.
+
+    Frames that arrive while the previous batch is being written are written together, so under load audio chunks of
+    the connection go to Redis in one transaction instead of one per chunk.
+
+    Audio chunks refused by admission control are dropped and reported with a
+    ``{"type": "throttle", "rejected": [<chunk numbers>], "retry_after_sec": ..., "suggested_chunk_interval_sec": ...}``
+    frame, the extension is expected to resend them later and send less often.
+
+"""
+import asyncio
+import json
+import logging
+import struct
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from dateutil.tz import UTC
+from fastapi import APIRouter, HTTPException, WebSocket, status
+
+from api.schemas.extension import SourceType
+from services.admission import AdmissionControl
+from services.extension_processor import ExtensionProcessor
+from services.utils.exceptions import IngestOverloadedError
+from streamqueue.api.auth.user_token import UserTokenAuth
+from streamqueue.api.dependencies import get_redis
+from streamqueue.settings import settings
+
+logger = logging.getLogger("app")
+router = APIRouter(prefix="/extension", tags=["extension"])
+
+AUDIO_FRAME_HEADER = struct.Struct("!Iq")  # audio chunk number (uint32), user's timestamp (int64)
+
+_CLOSE = None  # sentinel put into the frame queue when the client is gone
+
+
+@router.websocket("/stream")
+async def stream_endpoint(
+    websocket: WebSocket,
+    connection_id: str,
+    source: SourceType = SourceType.GOOGLE_MEET,  # ToDo: will be used later
+    meeting_id: Optional[str] = None,
+    token: Optional[str] = None,
+) -> None:
+    token = token or _get_bearer_token(websocket)
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        user_id = await UserTokenAuth().authenticate(websocket, token)
+
+    except HTTPException as ex:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=ex.detail)
+        return
+
+    await websocket.accept()
+    logger.info(f"Stream opened for connection {connection_id} (meeting {meeting_id}) from user {user_id}")
+
+    frames: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_max_pending_frames)
+    writer = asyncio.create_task(_write_frames(websocket, frames, user_id, connection_id, meeting_id))
+    # Tracked so that the app lifespan waits for it on shutdown
+    websocket.app.state.stream_writers.add(writer)
+    writer.add_done_callback(websocket.app.state.stream_writers.discard)
+
+    try:
+        while not writer.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if not await _put_frame(frames, (int(time.time() * 1000), message), writer):
+                break
+
+    finally:
+        await _put_frame(frames, _CLOSE, writer)  # let the writer drain frames already received
+        await asyncio.gather(writer, return_exceptions=True)
+        logger.info(f"Stream closed for connection {connection_id}")
+
+
+async def _put_frame(frames: asyncio.Queue, frame: Optional[Tuple[int, dict]], writer: asyncio.Task) -> bool:
+    """Puts a frame into the queue, waiting for room only while the writer is running.
+
+    Returns:
+        False if the writer stopped (e.g. it failed and closed the socket) before the frame was queued.
+    """
+    if writer.done():
+        return False
+    if not frames.full():
+        frames.put_nowait(frame)
+        return True
+
+    put = asyncio.ensure_future(frames.put(frame))
+    try:
+        await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        put.cancel()  # no-op if the frame was queued
+    return put.done()
+
+
+async def _write_frames(
+    websocket: WebSocket,
+    frames: asyncio.Queue,
+    user_id: str,
+    connection_id: str,
+    meeting_id: Optional[str],
+) -> None:
+    extension_process = ExtensionProcessor(get_redis(websocket))
+    admission = AdmissionControl(get_redis(websocket))
+    closing = False
+    while not closing:
+        batch: List[Tuple[int, dict]] = []
+        frame = await frames.get()
+        while frame is not _CLOSE:
+            batch.append(frame)
+            if len(batch) >= settings.ws_batch_max_frames or frames.empty():
+                break
+            frame = frames.get_nowait()
+        closing = frame is _CLOSE
+
+        try:
+            await _write_batch(websocket, extension_process, admission, batch, user_id, connection_id, meeting_id)
+        except Exception as e:
+            logger.error(f"Error writing stream frames of connection {connection_id}: {e}", exc_info=True)
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            raise
+
+
+async def _write_batch(
+    websocket: WebSocket,
+    extension_process: ExtensionProcessor,
+    admission: AdmissionControl,
+    batch: List[Tuple[int, dict]],
+    user_id: str,
+    connection_id: str,
+    meeting_id: Optional[str],
+) -> None:
+    audio_chunks = []
+    for server_timestamp_ms, message in batch:
+        try:
+            if message.get("bytes") is not None:
+                audio_chunk_number, user_timestamp = AUDIO_FRAME_HEADER.unpack_from(message["bytes"])
+                audio_chunks.append(
+                    extension_process.build_audio_chunk(
+                        user_id=user_id,
+                        meeting_id=meeting_id,
+                        audio_chunk_number=audio_chunk_number,
+                        chunk=message["bytes"][AUDIO_FRAME_HEADER.size:],
+                        server_timestamp_ms=server_timestamp_ms,
+                        user_timestamp=user_timestamp,
+                    )
+                )
+            else:
+                speakers = json.loads(message["text"])
+                await extension_process.process_speakers_speech(
+                    user_id=user_id,
+                    connection_id=connection_id,
+                    meeting_id=meeting_id,
+                    speakers_data=speakers["data"],
+                    server_datetime=datetime.fromtimestamp(server_timestamp_ms / 1000, tz=UTC),
+                    user_timestamp=speakers.get("ts"),
+                )
+
+        except (ValueError, TypeError, KeyError, struct.error) as e:
+            # A malformed frame is reported to the client and skipped, the stream stays open
+            logger.warning(f"Invalid frame on stream of connection {connection_id}: {e}")
+            await websocket.send_json({"type": "error", "detail": str(e)})
+
+    if not audio_chunks:
+        return
+
+    try:
+        await admission.check_audio(user_id, connection_id, chunks=len(audio_chunks))
+    except IngestOverloadedError as e:
+        logger.warning(f"Refused {len(audio_chunks)} audio chunk(s) of connection {connection_id}: {e.message}")
+        await websocket.send_json(
+            {
+                "type": "throttle",
+                "detail": e.message,
+                "rejected": [chunk.audio_chunk_number for chunk in audio_chunks],
+                "retry_after_sec": e.retry_after_sec,
+                "suggested_chunk_interval_sec": e.suggested_chunk_interval_sec,
+            }
+        )
+        return
+
+    await extension_process.process_audio_batch(connection_id, audio_chunks)
+
+
+def _get_bearer_token(websocket: WebSocket) -> Optional[str]:
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" and credentials else None
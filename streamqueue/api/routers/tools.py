@@ -1,36 +1,44 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from redis.asyncio.client import Redis
 
 from api.schemas import AudioChunkInfo, SpeakerInfo, AddTokenRequest
-from shared_lib.redis.connection import get_redis_client
 from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
 from shared_lib.redis.dals.speaker_dal import SpeakerDAL
 from shared_lib.redis.dals.admin_dal import AdminDAL
-from streamqueue.settings import settings
+from streamqueue.api.auth.token_cache import TokenCache
+from streamqueue.api.dependencies import get_admin_redis, get_redis, get_token_cache
 
 router = APIRouter(prefix="/tools", tags=["tools"])
 
 
 @router.post("/flush-cache")
-async def flush_cache():
-    client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password)
+async def flush_cache(client: Redis = Depends(get_redis)):
     await client.flushdb()
     return {"message": "cache flushed successfully"}
 
 
 @router.post("/flush-admin-cache")
-async def flush_admin_cache():
-    admin_client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password, db=1)
-    await admin_client.flushdb()
+async def flush_admin_cache(
+    admin_client: Redis = Depends(get_admin_redis), token_cache: TokenCache = Depends(get_token_cache)
+):
+    # Announced to the token caches of all workers, this one is cleared right away
+    await AdminDAL(admin_client).flush()
+    token_cache.clear()
     return {"message": "admin cache flushed successfully"}
 
 
 @router.post("/add-token")
-async def add_token(request: AddTokenRequest):
+async def add_token(request: AddTokenRequest, admin_client: Redis = Depends(get_admin_redis)):
     """Add a new user token to Redis."""
-    admin_client = await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password, db=1)
     admin_dal = AdminDAL(admin_client)
     
     await admin_dal.add_token(request.token, request.user_id, request.enable)
     return {"message": "Token added successfully"}
+
+
+@router.get("/token-cache-stats")
+async def token_cache_stats(token_cache: TokenCache = Depends(get_token_cache)):
+    """Hit/miss counters of the in-process token cache (per worker process)."""
+    return token_cache.stats()
@@ -1,29 +1,27 @@
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from redis.asyncio.client import Redis
 
 from api.schemas import UserResponse, UserSetEnableStatus, UserTokenCreate
-from shared_lib.redis.connection import get_redis_client
 from shared_lib.redis.dals.admin_dal import AdminDAL
-from streamqueue.settings import settings
+from streamqueue.api.dependencies import get_admin_redis
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/add-token")
-async def add_user_token(user_token: UserTokenCreate) -> UserResponse:
-    admin_dal = AdminDAL(
-        await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password, db=1)
-    )
+async def add_user_token(user_token: UserTokenCreate, admin_client: Redis = Depends(get_admin_redis)) -> UserResponse:
+    admin_dal = AdminDAL(admin_client)
     await admin_dal.add_token(user_token.token, user_token.user_id, user_token.enable_status)
     return UserResponse(user_id=user_token.user_id, enabled=user_token.enable_status)
 
 
 @router.post("/set-status")
-async def set_users_status(user_statues: List[UserSetEnableStatus]) -> List[UserResponse]:
-    admin_dal = AdminDAL(
-        await get_redis_client(settings.redis_host, settings.redis_port, settings.redis_password, db=1)
-    )
+async def set_users_status(
+    user_statues: List[UserSetEnableStatus], admin_client: Redis = Depends(get_admin_redis)
+) -> List[UserResponse]:
+    admin_dal = AdminDAL(admin_client)
     response = []
 
     for user_status in user_statues:
@@ -1,16 +1,73 @@
 """Run FastAPI server."""
-import uvicorn
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from redis.exceptions import ConnectionError
 from starlette.middleware.cors import CORSMiddleware
 
+from shared_lib.redis.connection import create_redis_pool
+from shared_lib.redis.exceptions import RedisConnectionError
 from streamqueue.api.api import router
+from streamqueue.api.auth.token_cache import TokenCache
 from streamqueue.settings import settings
 
+logger = logging.getLogger("app")
+
+
+def _create_redis(db: int, decode_responses: bool):
+    return create_redis_pool(
+        settings.redis_host,
+        settings.redis_port,
+        settings.redis_password,
+        db=db,
+        decode_responses=decode_responses,
+        max_connections=settings.redis_pool_max_connections,
+        pool_timeout=settings.redis_pool_timeout_sec,
+        health_check_interval=settings.redis_health_check_interval_sec,
+        socket_timeout=settings.redis_socket_timeout_sec,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create one pooled Redis client per database and the token cache for the whole process."""
+    app.state.redis = _create_redis(db=0, decode_responses=False)  # binary-safe: raw audio chunks
+    app.state.admin_redis = _create_redis(db=1, decode_responses=True)
+
+    try:
+        await app.state.redis.ping()
+        await app.state.admin_redis.ping()
+    except ConnectionError:
+        raise RedisConnectionError("Redis connection error. Check if the connection configuration is correct")
+
+    app.state.token_cache = TokenCache(max_size=settings.token_cache_max_size, ttl=settings.token_cache_ttl_sec)
+    token_cache_listener = asyncio.create_task(app.state.token_cache.listen(app.state.admin_redis))
+    app.state.stream_writers = set()  # writer tasks of open WebSocket streams
+
+    try:
+        yield
+    finally:
+        # Frames already received on streams are written before the pools are closed
+        if app.state.stream_writers:
+            logger.info(f"Draining {len(app.state.stream_writers)} stream writer(s)")
+            await asyncio.wait(app.state.stream_writers, timeout=settings.api_graceful_timeout_sec)
+
+        token_cache_listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await token_cache_listener
+
+        await app.state.redis.aclose()
+        await app.state.admin_redis.aclose()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title='StreamQueue',
         version='0.1.0',
-        debug=True
+        debug=settings.api_debug,
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -26,9 +83,6 @@ def create_app() -> FastAPI:
 app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",  # Changed from app to "main:app"
-        host="0.0.0.0",  # Allow external connections
-        port=settings.api_port,
-        reload=True  # Enable auto-reload for development
-    )
+    from streamqueue.server import run
+
+    run()
@@ -0,0 +1,64 @@
+"""Production server of StreamQueue (``python -m streamqueue.server``).
+
+Notes:
+    Gunicorn master with ``API_WORKERS`` uvicorn workers. The app and settings are imported once in the master
+    (``preload_app``) and inherited by the forked workers, every worker opens its own Redis pools in the app lifespan.
+    Workers run on uvloop / httptools when they are installed.
+
+    On SIGTERM a worker stops accepting connections, closes WebSockets and waits up to ``API_GRACEFUL_TIMEOUT_SEC``
+    for in-flight requests and stream writers before the lifespan closes its pools.
+
+    With ``API_DEBUG`` a single auto-reloading uvicorn process is started instead.
+
+"""
+import uvicorn
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from streamqueue.settings import settings
+
+LIFESPAN_SHUTDOWN_MARGIN_SEC = 5  # time left to the lifespan after connections are drained
+
+
+class StreamQueueWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        "timeout_graceful_shutdown": settings.api_graceful_timeout_sec,
+    }
+
+
+class StreamQueueServer(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from streamqueue.main import app
+
+        return app
+
+
+def run() -> None:
+    if settings.api_debug:
+        uvicorn.run("streamqueue.main:app", host="0.0.0.0", port=settings.api_port, reload=True)
+        return
+
+    StreamQueueServer(
+        {
+            "bind": f"0.0.0.0:{settings.api_port}",
+            "workers": settings.api_workers,
+            "worker_class": "streamqueue.server.StreamQueueWorker",
+            "preload_app": True,
+            "graceful_timeout": settings.api_graceful_timeout_sec + LIFESPAN_SHUTDOWN_MARGIN_SEC,
+            "keepalive": 5,
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    run()
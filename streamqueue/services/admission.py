@@ -0,0 +1,72 @@
+"""Admission control of audio chunks coming from Chrome extension.
+
+Notes:
+    A chunk is refused (``IngestOverloadedError``) when the connection's queue, the queue of all connections or the
+    user's rate is above its limit (see ``admission_*`` settings). The error carries the ``Retry-After`` and a longer
+    chunk interval the extension should switch to, so overload is absorbed by the clients instead of Redis' memory.
+
+"""
+import math
+import time
+from typing import Optional
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from services.utils.exceptions import IngestOverloadedError
+from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
+from streamqueue.settings import settings
+
+MAX_INTERVAL_FACTOR = 4  # suggested chunk interval is at most this many times the nominal one
+
+
+class AdmissionControl:
+    def __init__(self, redis_connection: Redis):
+        self.__chunk_dal = AudioChunkDAL(redis_connection)
+
+    async def check_audio(self, user_id: UUID, connection_id: str, chunks: int = 1) -> None:
+        """Admits ``chunks`` audio chunks of the connection or raises.
+
+        Args:
+            user_id: ID of the user sending the chunks.
+            connection_id: Connection ID.
+            chunks: Number of chunks about to be added.
+
+        Raises:
+            IngestOverloadedError: A limit is crossed.
+
+        """
+        now, window = time.time(), settings.admission_rate_window_sec
+        queue_depth, backlog, user_rate = await self.__chunk_dal.get_ingest_load(
+            connection_id, str(user_id), chunks, window, now
+        )
+        try:
+            _check_load(queue_depth, backlog, user_rate, chunks, now)
+        except IngestOverloadedError:
+            # Only admitted chunks count toward the user's rate, refused ones are resent later
+            await self.__chunk_dal.uncount_ingest(str(user_id), chunks, window, now)
+            raise
+
+
+def _check_load(queue_depth: int, backlog: int, user_rate: int, chunks: int, now: float) -> None:
+    connection_load = _load(queue_depth + chunks, settings.admission_max_connection_queue)
+    backlog_load = _load(backlog + chunks, settings.admission_max_backlog)
+    if connection_load > 1 or backlog_load > 1:
+        reason = "connection queue is full" if connection_load > 1 else "service backlog is full"
+        raise IngestOverloadedError(
+            reason, settings.admission_retry_after_sec, _chunk_interval(max(connection_load, backlog_load))
+        )
+
+    rate_load = _load(user_rate, settings.admission_max_user_chunks)
+    if rate_load > 1:
+        window = settings.admission_rate_window_sec
+        retry_after_sec = math.ceil(window - now % window)
+        raise IngestOverloadedError("user rate limit exceeded", retry_after_sec, _chunk_interval(rate_load))
+
+
+def _load(value: int, limit: Optional[int]) -> float:
+    return value / limit if limit else 0.0
+
+
+def _chunk_interval(load: float) -> int:
+    return settings.audio_chunk_duration_sec * min(math.ceil(load), MAX_INTERVAL_FACTOR)
@@ -13,7 +13,7 @@ from shared_lib.redis.dals.audio_chunk_dal import AudioChunkDAL
 
 from shared_lib.redis.dals.speaker_dal import SpeakerDAL
 from streamqueue.settings import settings
-from shared_lib.redis.models import AudioChunkModel, SpeakerDataModel
+from shared_lib.redis.models import AudioChunkEnvelope, SpeakerDataModel
 
 logger = logging.getLogger(__name__)
 
@@ -24,32 +24,56 @@ class ExtensionProcessor:
         self.__speaker_dal = SpeakerDAL(redis_connection)
 
 
-    async def process_audio(
-        self,
+    @staticmethod
+    def build_audio_chunk(
         user_id: UUID,
-        connection_id: str,
         meeting_id: Optional[str],
         audio_chunk_number: int,
-        chunk: str,
-        server_datetime: datetime,
+        chunk: bytes,
+        server_timestamp_ms: int,
         user_timestamp: Optional[int] = None,
-    ) -> None:
-        user_timestamp = parser.parse(datetime.utcfromtimestamp(user_timestamp).isoformat()).astimezone(UTC).isoformat()
-        server_timestamp: str = server_datetime.isoformat()
+    ) -> AudioChunkEnvelope:
+        """Builds the queued chunk from values already validated by the endpoint.
+
+        Args:
+            user_id: ID of the user sending the chunk.
+            meeting_id: Meeting ID.
+            audio_chunk_number: Chunk number within the connection.
+            chunk: Raw audio bytes.
+            server_timestamp_ms: Time the chunk was received (epoch milliseconds).
+            user_timestamp: User's timestamp (epoch seconds), the server's one is used when it is missing.
 
-        logger.info(f"[PROCESS-{audio_chunk_number}] audio: {server_datetime}")
+        """
+        logger.debug(f"[PROCESS-{audio_chunk_number}] audio: {server_timestamp_ms}")
 
-        # Validate the data using Pydantic model
-        stream_item = AudioChunkModel(
+        return AudioChunkEnvelope(
             chunk=chunk,
-            user_timestamp=user_timestamp,
-            server_timestamp=server_timestamp,
+            user_id=str(user_id),
             meeting_id=meeting_id,
-            user_id=user_id,
-            audio_chunk_duration_sec=settings.audio_chunk_duration_sec,
             audio_chunk_number=audio_chunk_number,
+            user_timestamp_ms=user_timestamp * 1000 if user_timestamp is not None else server_timestamp_ms,
+            server_timestamp_ms=server_timestamp_ms,
+            audio_chunk_duration_ms=settings.audio_chunk_duration_sec * 1000,
+        )
+
+    async def process_audio(
+        self,
+        user_id: UUID,
+        connection_id: str,
+        meeting_id: Optional[str],
+        audio_chunk_number: int,
+        chunk: bytes,
+        server_timestamp_ms: int,
+        user_timestamp: Optional[int] = None,
+    ) -> None:
+        stream_item = self.build_audio_chunk(
+            user_id, meeting_id, audio_chunk_number, chunk, server_timestamp_ms, user_timestamp
         )
-        await self.__chunk_dal.add_chunk(connection_id, stream_item.model_dump())
+        await self.__chunk_dal.add_chunk(connection_id, stream_item)
+
+    async def process_audio_batch(self, connection_id: str, chunks: List[AudioChunkEnvelope]) -> None:
+        """Write chunks built by ``build_audio_chunk`` in one transaction (WebSocket ingest)."""
+        await self.__chunk_dal.add_chunks(connection_id, chunks)
 
     async def process_speakers_speech(
         self,
@@ -64,12 +88,11 @@ class ExtensionProcessor:
         user_timestamp = parser.parse(datetime.fromtimestamp(user_timestamp).isoformat()).astimezone(UTC).isoformat()
         server_timestamp: str = server_datetime.isoformat()
 
-        logger.info(f"[PROCESS] speakers_speech: {user_timestamp} (user-ts: {user_timestamp})")
+        logger.debug(f"[PROCESS] speakers_speech: {user_timestamp} (user-ts: {user_timestamp})")
 
-        for speaker_data in speakers_data:
-            speaker_name, meta = speaker_data
-            # Validate the data using Pydantic model
-            speaker_item = SpeakerDataModel(
+        # Validate the data once using Pydantic model, then write the whole batch in one round-trip
+        speaker_items = [
+            SpeakerDataModel(
                 speaker_name=speaker_name,
                 meta=meta,
                 user_timestamp=user_timestamp,
@@ -78,5 +101,7 @@ class ExtensionProcessor:
                 user_id=user_id,
                 speaker_delay_sec=settings.speaker_delay_sec,
             )
-            await self.__speaker_dal.add_speaker_data(speaker_item.model_dump())
+            for speaker_name, meta in speakers_data
+        ]
+        await self.__speaker_dal.add_speakers_data(speaker_items)
 
@@ -2,3 +2,12 @@ class MeetingIdFormatError(Exception):
     def __init__(self, wrong_meeting_id: str):
         self.message = f"Not allowed meeting_id format ({wrong_meeting_id})"
         super().__init__(self.message)
+
+
+class IngestOverloadedError(Exception):
+    def __init__(self, reason: str, retry_after_sec: int, suggested_chunk_interval_sec: int):
+        self.message = f"Ingest overloaded ({reason})"
+        self.reason = reason
+        self.retry_after_sec = retry_after_sec
+        self.suggested_chunk_interval_sec = suggested_chunk_interval_sec
+        super().__init__(self.message)
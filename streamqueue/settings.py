@@ -17,12 +17,36 @@ class Settings(BaseSettings):
     redis_port: int = int(os.getenv('REDIS_PORT'))
     redis_password: str | None = os.getenv('REDIS_PASSWORD')
     api_port: int = int(os.getenv('TRANSCRIPTION_SERVICE_API_PORT'))
+    api_debug: bool = os.getenv('API_DEBUG', 'false').lower() in ('1', 'true', 'yes')  # FastAPI debug + auto-reload
+    api_workers: int = int(os.getenv('API_WORKERS') or os.cpu_count() or 1)  # processes of the production server
+    api_graceful_timeout_sec: int = int(os.getenv('API_GRACEFUL_TIMEOUT_SEC', '30'))  # drain in-flight writes
     audio_chunk_duration_sec: int = int(os.getenv('AUDIO_CHUNK_DURATION_SEC'))
 
     service_token: str = os.getenv('TRANSCRIPTION_SERVICE_API_TOKEN')
     
     speaker_delay_sec: int = 1
 
+    # Process-wide Redis pools (one per DB), created in the app lifespan, i.e. per server worker
+    redis_pool_max_connections: int = int(os.getenv('REDIS_POOL_MAX_CONNECTIONS', '50'))
+    redis_pool_timeout_sec: float = float(os.getenv('REDIS_POOL_TIMEOUT_SEC', '5'))
+    redis_health_check_interval_sec: int = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL_SEC', '30'))
+    redis_socket_timeout_sec: float = float(os.getenv('REDIS_SOCKET_TIMEOUT_SEC', '5'))
+
+    # In-process cache of token -> user_id and user_id -> enabled (invalidated via Pub/Sub, TTL bounds staleness)
+    token_cache_ttl_sec: float = float(os.getenv('TOKEN_CACHE_TTL_SEC', '30'))
+    token_cache_max_size: int = int(os.getenv('TOKEN_CACHE_MAX_SIZE', '10000'))
+
+    # WebSocket ingest (/api/v1/extension/stream)
+    ws_batch_max_frames: int = int(os.getenv('WS_BATCH_MAX_FRAMES', '50'))  # frames written per Redis transaction
+    ws_max_pending_frames: int = int(os.getenv('WS_MAX_PENDING_FRAMES', '200'))  # stop reading the socket above it
+
+    # Admission control of audio chunks (0 disables a limit)
+    admission_max_connection_queue: int = int(os.getenv('ADMISSION_MAX_CONNECTION_QUEUE', '300'))  # chunks
+    admission_max_backlog: int = int(os.getenv('ADMISSION_MAX_BACKLOG', '20000'))  # chunks of all connections
+    admission_max_user_chunks: int = int(os.getenv('ADMISSION_MAX_USER_CHUNKS', '240'))  # per rate window
+    admission_rate_window_sec: int = int(os.getenv('ADMISSION_RATE_WINDOW_SEC', '60'))
+    admission_retry_after_sec: int = int(os.getenv('ADMISSION_RETRY_AFTER_SEC', '5'))  # when a queue is full
+
 
     model_config = {
         "env_nested_delimiter": "__",